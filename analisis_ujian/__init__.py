@@ -0,0 +1,56 @@
+# Modul analisis hasil ujian yang tidak bergantung pada antarmuka Streamlit.
+# Fungsi-fungsi di sini aman dipanggil dari proses pekerja (process pool).
+#
+# Nama-nama di bawah diekspor secara malas: submodul (dan pandas) baru
+# diimpor saat atributnya pertama kali diakses.
+import importlib
+
+_EXPORTS = {
+    'CLASS_COL': 'excel',
+    'read_excel_workbook': 'excel',
+    'CorrectMatrix': 'core',
+    'EncodedAnswers': 'core',
+    'analyze_difficulty': 'core',
+    'evaluate_answers': 'core',
+    'generate_topic_recommendations': 'core',
+    'get_difficulty_level': 'core',
+    'get_question_cols': 'core',
+    'memory_report': 'core',
+    'normalize_answers': 'core',
+    'preprocess_data': 'core',
+    'read_table': 'core',
+    'score_answer_matrix': 'core',
+    'score_answers': 'core',
+    'score_histogram': 'core',
+    'summarize_scores': 'core',
+    'analyze_items': 'item_analysis',
+    'item_statistics': 'item_analysis',
+    'distractor_table': 'item_analysis',
+    'ExamAnalysis': 'report',
+    'add_pass_status': 'report',
+    'analyze_exam': 'report',
+    'build_difficulty_table': 'report',
+    'build_recommendation_table': 'report',
+    'build_student_table': 'report',
+    'format_memory_report': 'report',
+    'KeySpec': 'scoring',
+    'credit_table': 'scoring',
+    'analyze_similarity': 'similarity',
+    'ResultStore': 'store',
+    'read_topic_mapping': 'topics',
+    'topic_mastery': 'topics',
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f'.{_EXPORTS[name]}', __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
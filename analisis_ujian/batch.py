@@ -0,0 +1,111 @@
+import os
+import zipfile
+from concurrent.futures import as_completed
+from io import BytesIO
+
+import pandas as pd
+
+from .core import (
+    analyze_difficulty,
+    get_question_cols,
+    preprocess_data,
+    read_table,
+    score_answers,
+    summarize_scores,
+)
+from .pool import process_pool
+from .report import build_student_table
+from .scoring import key_usecols
+
+# Ekstensi file hasil ujian yang diproses dalam mode batch
+BATCH_EXTENSIONS = ('.xlsx', '.csv')
+
+
+# Fungsi untuk menguraikan daftar file (termasuk arsip zip) menjadi pasangan (nama, bytes)
+def expand_batch_files(files):
+    sources = []
+    for name, data in files:
+        if name.lower().endswith('.zip'):
+            with zipfile.ZipFile(BytesIO(data)) as archive:
+                for member in archive.infolist():
+                    member_name = member.filename
+                    # Lewati folder dan file metadata macOS di dalam arsip
+                    if member.is_dir() or member_name.startswith('__MACOSX/'):
+                        continue
+                    if os.path.basename(member_name).startswith('.'):
+                        continue
+                    if member_name.lower().endswith(BATCH_EXTENSIONS):
+                        sources.append((member_name, archive.read(member)))
+        elif name.lower().endswith(BATCH_EXTENSIONS):
+            sources.append((name, data))
+    return sources
+
+
+# Fungsi pekerja: parsing, penilaian dan analisis kesulitan untuk satu file
+def analyze_file(name, data, student_col, has_key_column, key_name=None, key_data=None):
+    try:
+        # Pool bersarang dihindari: sheet dibaca berurutan di dalam proses pekerja
+        df_answers = read_table(data, name, key_in_first_row=has_key_column, max_workers=1)
+        df_key = None
+        if key_data is not None:
+            df_key = read_table(
+                key_data, key_name, usecols=key_usecols(df_answers.columns), all_sheets=False, max_workers=1
+            )
+
+        df_answers, key_answers = preprocess_data(df_answers, df_key, has_key_column)
+        if not key_answers:
+            return {'name': name, 'error': "Kunci jawaban tidak ditemukan."}
+
+        results, correct = score_answers(df_answers, key_answers, student_col)
+        question_cols = get_question_cols(df_answers, student_col)
+        difficulty_data = analyze_difficulty(correct, question_cols)
+
+        return {
+            'name': name,
+            'error': None,
+            'n_students': len(results),
+            'question_cols': question_cols,
+            'stats': summarize_scores(results['score']),
+            'difficulty_data': difficulty_data,
+            'student_table': build_student_table(results, student_col),
+        }
+    except Exception as e:
+        return {'name': name, 'error': str(e)}
+
+
+# Fungsi untuk menganalisis banyak file secara paralel.
+# Hasil dikembalikan satu per satu begitu selesai sehingga progres bisa ditampilkan.
+def run_batch(sources, student_col, has_key_column, key_name=None, key_data=None, max_workers=None):
+    if not sources:
+        return
+    max_workers = min(len(sources), max_workers or os.cpu_count() or 1)
+    with process_pool(max_workers) as executor:
+        futures = [
+            executor.submit(analyze_file, name, data, student_col, has_key_column, key_name, key_data)
+            for name, data in sources
+        ]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+# Fungsi untuk membandingkan tingkat kesulitan soal antar file/kelas
+def compare_difficulty(reports):
+    rates = {
+        report['name']: {q: data['correct_rate'] for q, data in report['difficulty_data'].items()}
+        for report in reports
+        if report.get('error') is None
+    }
+    comparison = pd.DataFrame(rates)
+    if comparison.empty:
+        return comparison
+
+    # Ringkasan lintas kelas: soal dengan selisih besar menandakan kesenjangan belajar
+    summary = pd.DataFrame({
+        'Rata-rata': comparison.mean(axis=1),
+        'Minimum': comparison.min(axis=1),
+        'Maksimum': comparison.max(axis=1),
+        'Selisih': comparison.max(axis=1) - comparison.min(axis=1),
+    })
+    comparison = pd.concat([comparison, summary], axis=1)
+    comparison.index.name = 'Soal'
+    return comparison.sort_values(by='Rata-rata')
@@ -0,0 +1,144 @@
+# Cache hasil analisis bersama untuk satu proses server. Semua sesi (guru) yang
+# membuka aplikasi memakai cache yang sama: entri dikunci dengan hash isi file
+# dan pengaturan, dibatasi total memori (LRU), dan perhitungan yang sama yang
+# diminta beberapa sesi sekaligus hanya dijalankan sekali.
+import sys
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+
+import numpy as np
+import pandas as pd
+
+# Penanda hasil perhitungan yang dibatalkan pemiliknya (misalnya sesi di-rerun);
+# sesi yang menunggu lalu menghitung sendiri
+_ABANDONED = object()
+
+
+# Fungsi untuk memperkirakan ukuran memori sebuah objek hasil analisis
+def estimate_size(obj):
+    if isinstance(obj, pd.DataFrame):
+        return int(obj.memory_usage(index=True, deep=True).sum())
+    if isinstance(obj, pd.Series):
+        return int(obj.memory_usage(index=True, deep=True))
+    # Array numpy dan matriks ringkas (EncodedAnswers, CorrectMatrix) melaporkan nbytes sendiri
+    if isinstance(obj, np.ndarray) or hasattr(obj, 'nbytes'):
+        return int(obj.nbytes)
+    if isinstance(obj, dict):
+        return sys.getsizeof(obj) + sum(estimate_size(k) + estimate_size(v) for k, v in obj.items())
+    if isinstance(obj, (list, tuple)):
+        return sys.getsizeof(obj) + sum(estimate_size(item) for item in obj)
+    return sys.getsizeof(obj)
+
+
+# Cache LRU yang dikunci dengan hash isi file dan dibatasi total memori.
+# Aman dipakai dari banyak thread (satu thread per sesi Streamlit).
+class AnalysisCache:
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.shared = 0
+        self._entries = OrderedDict()
+        self._pending = {}
+        self._lock = threading.Lock()
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._entries
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key not in self._entries:
+                return default
+            self._entries.move_to_end(key)
+            return self._entries[key][0]
+
+    def put(self, key, value):
+        size = estimate_size(value)
+        with self._lock:
+            self._store(key, value, size)
+        return value
+
+    def _store(self, key, value, size):
+        if key in self._entries:
+            self.total_bytes -= self._entries.pop(key)[1]
+        # Entri yang lebih besar dari batas tidak disimpan sama sekali
+        if size > self.max_bytes:
+            return
+        self._entries[key] = (value, size)
+        self.total_bytes += size
+        # Buang entri yang paling lama tidak dipakai sampai muat
+        while self.total_bytes > self.max_bytes:
+            _, (_, old_size) = self._entries.popitem(last=False)
+            self.total_bytes -= old_size
+
+    # Ambil nilai dari cache atau hitung sekali. Bila sesi lain sedang menghitung
+    # kunci yang sama, tunggu hasilnya alih-alih menghitung ulang.
+    # Mengembalikan (nilai, status) dengan status 'hit', 'miss' atau 'shared'.
+    def get_or_compute(self, key, compute):
+        while True:
+            with self._lock:
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return self._entries[key][0], 'hit'
+                future = self._pending.get(key)
+                owner = future is None
+                if owner:
+                    future = self._pending[key] = Future()
+                    self.misses += 1
+
+            if not owner:
+                value = future.result()
+                if value is _ABANDONED:
+                    continue
+                with self._lock:
+                    self.shared += 1
+                return value, 'shared'
+
+            try:
+                value = compute()
+            except Exception as e:
+                self._finish(key, future, exception=e)
+                raise
+            except BaseException:
+                # Bukan kesalahan perhitungan (mis. rerun/stop sesi): sesi lain menghitung sendiri
+                self._finish(key, future, value=_ABANDONED)
+                raise
+            self._finish(key, future, value=value, size=estimate_size(value))
+            return value, 'miss'
+
+    # Simpan hasil (sebelum kunci dilepas dari daftar tunggu, agar tidak dihitung dua kali)
+    # lalu bangunkan sesi yang menunggu
+    def _finish(self, key, future, value=None, exception=None, size=None):
+        with self._lock:
+            if size is not None:
+                self._store(key, value, size)
+            self._pending.pop(key, None)
+        if exception is not None:
+            future.set_exception(exception)
+        else:
+            future.set_result(value)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'total_bytes': self.total_bytes,
+                'max_bytes': self.max_bytes,
+                'in_flight': len(self._pending),
+                'hits': self.hits,
+                'misses': self.misses,
+                'shared': self.shared,
+            }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.total_bytes = 0
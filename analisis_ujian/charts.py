@@ -0,0 +1,116 @@
+# Grafik laporan analisis. matplotlib dan seaborn baru diimpor ketika sebuah
+# grafik benar-benar dibuat, sehingga impor modul analisis tetap ringan.
+#
+# Figure dibuat langsung lewat matplotlib.figure.Figure (bukan pyplot), sehingga
+# tidak pernah tercatat di registry global pyplot dan ikut terbuang bersama
+# referensinya. Ini mencegah memori server terus bertambah selama berhari-hari.
+from io import BytesIO
+
+import numpy as np
+
+# Resolusi (dpi) saat grafik dirender menjadi PNG dan jumlah batang histogram
+CHART_DPI = 100
+DISPLAY_BINS = 10
+
+
+# Fungsi untuk membuat figure baru di luar registry pyplot
+def _new_figure(figsize):
+    from matplotlib.figure import Figure
+    return Figure(figsize=figsize)
+
+
+# Fungsi untuk merender figure menjadi bytes PNG lalu melepaskan isinya
+def figure_to_png(fig, dpi=CHART_DPI):
+    buffer = BytesIO()
+    try:
+        fig.savefig(buffer, format='png', dpi=dpi)
+    finally:
+        fig.clear()
+    return buffer.getvalue()
+
+
+# Fungsi untuk menghitung KDE gaussian dari histogram halus (binned KDE).
+# Bandwidth memakai aturan Scott seperti seaborn, tetapi dihitung dari bin
+# sehingga biayanya tidak bergantung pada jumlah siswa.
+def binned_kde(score_hist, bin_width):
+    counts = np.asarray(score_hist, dtype=np.float64)
+    n = counts.sum()
+    if n < 2:
+        return None
+    centers = (np.arange(len(counts)) + 0.5) * bin_width
+    mean = (counts * centers).sum() / n
+    std = np.sqrt((counts * (centers - mean) ** 2).sum() / (n - 1))
+    if std == 0:
+        return None
+
+    sigma_bins = std * n ** (-1 / 5) / bin_width
+    half_width = int(np.ceil(4 * sigma_bins))
+    offsets = np.arange(-half_width, half_width + 1)
+    kernel = np.exp(-0.5 * (offsets / sigma_bins) ** 2) / (np.sqrt(2 * np.pi) * sigma_bins)
+    # Hasil: perkiraan jumlah siswa per bin halus
+    return np.convolve(counts, kernel, mode='full')[half_width:half_width + len(counts)]
+
+
+# Fungsi untuk grafik distribusi nilai (histogram + KDE) dari histogram skor halus
+def score_distribution_figure(score_hist, pass_threshold, bins=DISPLAY_BINS, figsize=(10, 6)):
+    score_hist = np.asarray(score_hist)
+    fine_width = 100 / len(score_hist)
+    counts = score_hist.reshape(bins, -1).sum(axis=1)
+    edges = np.linspace(0, 100, bins + 1)
+
+    fig = _new_figure(figsize)
+    ax = fig.subplots()
+    ax.bar(edges[:-1], counts, width=np.diff(edges), align='edge', edgecolor='white', alpha=0.75)
+
+    kde = binned_kde(score_hist, fine_width)
+    if kde is not None:
+        # Skalakan agar sebanding dengan tinggi batang histogram
+        centers = (np.arange(len(score_hist)) + 0.5) * fine_width
+        ax.plot(centers, kde * (100 / bins) / fine_width)
+
+    ax.axvline(x=pass_threshold, color='red', linestyle='--', label=f'Batas Lulus ({pass_threshold})')
+    ax.set_xlim(0, 100)
+    ax.set_xlabel('Nilai')
+    ax.set_ylabel('Jumlah Siswa')
+    ax.legend()
+    return fig
+
+
+# Fungsi untuk grafik persentase jawaban benar per soal (diurutkan dari yang tersulit)
+def difficulty_figure(difficulty_data, figsize=(10, 6)):
+    difficulty_data_sorted = {k: v for k, v in sorted(difficulty_data.items(), key=lambda item: item[1]['correct_rate'])}
+    questions = [str(q) for q in difficulty_data_sorted.keys()]
+    correct_rates = [data['correct_rate'] for data in difficulty_data_sorted.values()]
+    colors = ['#D32F2F' if rate < 50 else '#388E3C' for rate in correct_rates]
+
+    fig = _new_figure(figsize)
+    ax = fig.subplots()
+    ax.bar(questions, correct_rates, color=colors)
+    ax.set_ylabel('Persentase Jawaban Benar (%)')
+    ax.set_xlabel('Soal')
+    ax.set_ylim(0, 100)
+    ax.axhline(y=50, color='gray', linestyle='--', alpha=0.7)
+
+    # Rotasi label sumbu x jika terlalu banyak soal
+    if len(questions) > 5:
+        for label in ax.get_xticklabels():
+            label.set_rotation(45)
+            label.set_horizontalalignment('right')
+
+    fig.tight_layout()
+    return fig
+
+
+# Fungsi untuk heatmap persentase benar per soal (atau penguasaan per topik) di setiap kelas/file
+def class_heatmap_figure(comparison, class_cols, xlabel='File / Kelas', ylabel='Soal',
+                         value_label='Persentase Benar (%)'):
+    import seaborn as sns
+
+    fig = _new_figure((max(6, len(class_cols) * 0.8 + 4), max(4, len(comparison) * 0.3)))
+    ax = fig.subplots()
+    sns.heatmap(comparison[class_cols], annot=len(class_cols) * len(comparison) <= 400, fmt='.0f',
+                cmap='RdYlGn', vmin=0, vmax=100, ax=ax, cbar_kws={'label': value_label})
+    ax.set_xlabel(xlabel)
+    ax.set_ylabel(ylabel)
+    fig.tight_layout()
+    return fig
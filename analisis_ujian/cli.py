@@ -0,0 +1,117 @@
+import argparse
+import os
+import sys
+
+
+# Fungsi untuk menyusun parser argumen baris perintah
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog='python -m analisis_ujian',
+        description="Analisis hasil ujian tanpa antarmuka: menulis tabel hasil per siswa, "
+                    "analisis soal, analisis butir dan rekomendasi remedial sebagai CSV."
+    )
+    parser.add_argument('jawaban', help="File hasil ujian (.xlsx atau .csv)")
+    parser.add_argument('--kunci', help="File kunci jawaban terpisah, atau spesifikasi kunci dengan kolom Soal, Kunci, Bobot, Tipe. "
+                                         "Bila tidak diisi, baris pertama file jawaban adalah kunci.")
+    parser.add_argument('--topik', help="File pemetaan soal ke topik/kompetensi (kolom Soal, Topik; beberapa topik dipisah ';')")
+    parser.add_argument('--kolom-siswa', default='Nama', help="Nama kolom untuk nama siswa (default: Nama)")
+    parser.add_argument('--batas', type=float, default=70, help="Batas nilai kelulusan (default: 70)")
+    parser.add_argument('--output', '-o', default='.', help="Folder tujuan file hasil (default: folder saat ini)")
+    parser.add_argument('--kemiripan', action='store_true',
+                        help="Deteksi pasangan siswa dengan jawaban salah identik yang mencurigakan (kemiripan_jawaban.csv)")
+    parser.add_argument('--grafik', action='store_true', help="Simpan juga grafik distribusi nilai dan kesulitan soal (PNG)")
+    parser.add_argument('--simpan', metavar='NAMA_UJIAN', help="Simpan hasil ke riwayat ujian (SQLite) dengan nama ini")
+    parser.add_argument('--kelas', default='', help="Nama kelas untuk riwayat ujian (opsional)")
+    parser.add_argument('--tanggal', help="Tanggal ujian YYYY-MM-DD untuk riwayat ujian (default: hari ini)")
+    parser.add_argument('--basis-data', help="Lokasi file riwayat ujian (default: $ANALISIS_STORE_PATH atau hasil_ujian.sqlite)")
+    return parser
+
+
+# Fungsi utama CLI; mengembalikan kode keluar
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+
+    # pandas dan modul analisis baru diimpor setelah argumen valid (--help tetap cepat)
+    from .core import read_table
+    from .report import analyze_exam, format_memory_report
+    from .scoring import key_usecols
+
+    with open(args.jawaban, 'rb') as f:
+        answer_data = f.read()
+    has_key_column = args.kunci is None
+    df_answers = read_table(answer_data, args.jawaban, key_in_first_row=has_key_column)
+
+    df_key = None
+    if args.kunci is not None:
+        with open(args.kunci, 'rb') as f:
+            df_key = read_table(f.read(), args.kunci, usecols=key_usecols(df_answers.columns), all_sheets=False)
+
+    topic_mapping = None
+    if args.topik is not None:
+        from .topics import read_topic_mapping
+
+        with open(args.topik, 'rb') as f:
+            topic_mapping = read_topic_mapping(read_table(f.read(), args.topik, all_sheets=False))
+
+    analysis = analyze_exam(df_answers, df_key, has_key_column, args.kolom_siswa, args.batas, topic_mapping)
+    if analysis is None:
+        print("Terjadi masalah dalam memproses kunci jawaban. Pastikan format kunci jawaban sesuai.", file=sys.stderr)
+        return 2
+
+    os.makedirs(args.output, exist_ok=True)
+    outputs = {
+        'hasil_siswa.csv': analysis['student_results'],
+        'analisis_soal.csv': analysis['difficulty_df'],
+        'rekomendasi_remedial.csv': analysis['recom_df'],
+        'analisis_butir.csv': analysis['item_analysis']['items'],
+        'analisis_distraktor.csv': analysis['item_analysis']['distractors'],
+    }
+    if analysis['topics'] is not None:
+        outputs['penguasaan_topik_kelas.csv'] = analysis['topics']['class_mastery'].reset_index()
+        outputs['penguasaan_topik_siswa.csv'] = analysis['topics']['student_mastery']
+    for filename, df in outputs.items():
+        df.to_csv(os.path.join(args.output, filename), index=False)
+
+    if args.kemiripan:
+        from .similarity import analyze_similarity
+
+        similarity = analyze_similarity(
+            analysis['df_answers'], analysis['correct'], analysis['question_cols'], args.kolom_siswa
+        )
+        similarity['pairs'].to_csv(os.path.join(args.output, 'kemiripan_jawaban.csv'), index=False)
+        print(f"Pasangan mencurigakan (Z >= {similarity['z_threshold']:g}): "
+              f"{similarity['n_flagged']} dari {similarity['n_pairs']} pasangan")
+
+    if args.grafik:
+        # matplotlib/seaborn hanya dimuat bila grafik diminta
+        from .charts import difficulty_figure, figure_to_png, score_distribution_figure
+        from .core import score_histogram
+
+        figures = {
+            'distribusi_nilai.png': lambda: score_distribution_figure(
+                score_histogram(analysis['results']['score']), args.batas
+            ),
+            'kesulitan_soal.png': lambda: difficulty_figure(analysis['difficulty_data']),
+        }
+        for filename, build_figure in figures.items():
+            with open(os.path.join(args.output, filename), 'wb') as f:
+                f.write(figure_to_png(build_figure()))
+
+    if args.simpan:
+        from .store import DEFAULT_STORE_PATH, ResultStore
+
+        with ResultStore(args.basis_data or DEFAULT_STORE_PATH) as store:
+            store.save_exam(
+                args.simpan, analysis['results'], analysis['difficulty_data'], args.kolom_siswa,
+                exam_date=args.tanggal, class_name=args.kelas
+            )
+            print(f"Hasil disimpan ke riwayat ujian: {os.path.abspath(store.path)}")
+
+    stats = analysis['stats']
+    print(f"Jumlah siswa: {len(analysis['results'])}")
+    print(f"Nilai rata-rata: {stats['avg_score']:.2f} | Nilai tengah: {stats['median_score']:.2f}")
+    print(f"Persentase kelulusan: {analysis['pass_rate']:.2f}% (Batas {args.batas:g})")
+    print(f"Reliabilitas (KR-20): {analysis['item_analysis']['reliability']['kr20']:.3f}")
+    print(f"Memori jawaban: {format_memory_report(analysis['memory'])}")
+    print(f"Hasil ditulis ke: {os.path.abspath(args.output)}")
+    return 0
@@ -0,0 +1,363 @@
+import sys
+
+import numpy as np
+import pandas as pd
+from io import BytesIO
+
+from .excel import CLASS_COL, read_excel_workbook
+
+# Jumlah bin halus (lebar 0,1 poin) untuk histogram skor 0-100
+SCORE_HIST_BINS = 1000
+
+# Kode opsi untuk jawaban kosong/tidak valid; opsi sebenarnya mulai dari kode 1
+BLANK_CODE = 0
+# Jumlah bit bernilai 1 pada setiap byte (0-255), untuk menghitung jawaban benar dari matriks terkemas
+POPCOUNT = np.array([bin(value).count('1') for value in range(256)], dtype=np.uint8)
+
+
+# Fungsi untuk mendapatkan kolom soal (semua kolom selain nama siswa dan kelas)
+def get_question_cols(df, student_col):
+    return [col for col in df.columns if col not in (student_col, CLASS_COL)]
+
+
+# Fungsi untuk menormalkan satu jawaban: huruf besar tanpa spasi di tepi.
+# Sel kosong, NaN dan teks kosong menjadi None; angka bulat 1.0 menjadi "1".
+def normalize_answer(value):
+    if value is None or (np.ndim(value) == 0 and pd.isna(value)):
+        return None
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    text = str(value).strip().upper()
+    return text or None
+
+
+# Fungsi untuk memilih tipe kode opsi terkecil yang cukup (uint8 untuk <= 256 opsi)
+def _code_dtype(n_options):
+    if n_options <= np.iinfo(np.uint8).max + 1:
+        return np.uint8
+    return np.uint16 if n_options <= np.iinfo(np.uint16).max + 1 else np.uint32
+
+
+# Fungsi untuk mendapatkan CategoricalDtype bersama kolom soal bila semua kolom
+# sudah dinormalkan oleh normalize_answers; selain itu None
+def _shared_answer_dtype(df, question_cols):
+    if not question_cols:
+        return None
+    dtype = df[question_cols[0]].dtype
+    if not isinstance(dtype, pd.CategoricalDtype):
+        return None
+    if any(df[col].dtype != dtype for col in question_cols[1:]):
+        return None
+    if any(normalize_answer(option) != option for option in dtype.categories):
+        return None
+    return dtype
+
+
+# Matriks jawaban ringkas (siswa x soal) berisi kode opsi uint8.
+# options[kode] adalah label opsi; options[BLANK_CODE] adalah None (kosong/tidak valid).
+class EncodedAnswers:
+    def __init__(self, codes, options, question_cols):
+        self.codes = codes
+        self.options = options
+        self.question_cols = list(question_cols)
+
+    # Semua sel dikodekan sekaligus; normalisasi hanya dijalankan pada nilai unik
+    @classmethod
+    def from_values(cls, values, question_cols):
+        values = np.asarray(values, dtype=object)
+        n_students, n_items = values.shape
+        raw_codes, uniques = pd.factorize(values.ravel(order='C'), use_na_sentinel=True)
+        normalized = [normalize_answer(value) for value in uniques]
+        options = [None] + sorted({label for label in normalized if label is not None})
+        index = {label: code for code, label in enumerate(options)}
+        # Kode -1 dari factorize (sel kosong) mengambil elemen terakhir, yaitu kode kosong
+        lookup = np.array([index[label] for label in normalized] + [BLANK_CODE], dtype=_code_dtype(len(options)))
+        return cls(lookup[raw_codes].reshape(n_students, n_items), options, question_cols)
+
+    # Kolom kategorikal hasil normalize_answers cukup disalin kodenya, tanpa normalisasi ulang
+    @classmethod
+    def from_frame(cls, df, question_cols):
+        dtype = _shared_answer_dtype(df, question_cols)
+        if dtype is None:
+            return cls.from_values(df[question_cols].to_numpy(dtype=object), question_cols)
+        options = [None] + list(dtype.categories)
+        codes = np.empty((len(df), len(question_cols)), dtype=_code_dtype(len(options)))
+        for idx, col in enumerate(question_cols):
+            codes[:, idx] = df[col].cat.codes.to_numpy() + 1
+        return cls(codes, options, question_cols)
+
+    @property
+    def nbytes(self):
+        return self.codes.nbytes
+
+    # Kode kunci per soal; kunci kosong atau yang tidak pernah dipilih siswa diberi -1
+    def key_codes(self, key_answers):
+        index = {label: code for code, label in enumerate(self.options) if label is not None}
+        return np.array(
+            [index.get(normalize_answer(key_answers[col]), -1) for col in self.question_cols], dtype=np.int64
+        )
+
+    # Matriks benar/salah (bool) dalam satu perbandingan kode dengan kunci
+    def match(self, key_answers):
+        return self.codes == self.key_codes(key_answers)[np.newaxis, :]
+
+    # Kolom kategorikal (kategori bersama untuk semua soal) untuk disimpan di DataFrame
+    def to_categoricals(self):
+        dtype = pd.CategoricalDtype(self.options[1:])
+        return {
+            col: pd.Categorical.from_codes(self.codes[:, idx].astype(np.int32) - 1, dtype=dtype)
+            for idx, col in enumerate(self.question_cols)
+        }
+
+
+# Matriks benar/salah yang dikemas 8 siswa per byte (np.packbits sepanjang sumbu siswa)
+class CorrectMatrix:
+    def __init__(self, bits, n_students, question_cols):
+        self.bits = bits
+        self.n_students = n_students
+        self.question_cols = list(question_cols)
+
+    @classmethod
+    def pack(cls, matrix, question_cols):
+        matrix = np.asarray(matrix, dtype=bool)
+        return cls(np.packbits(matrix, axis=0), matrix.shape[0], question_cols)
+
+    @property
+    def shape(self):
+        return self.n_students, len(self.question_cols)
+
+    @property
+    def nbytes(self):
+        return self.bits.nbytes
+
+    # Matriks bool (siswa x soal) utuh, untuk analisis yang butuh nilai per siswa
+    def unpack(self):
+        return np.unpackbits(self.bits, axis=0, count=self.n_students).view(bool)
+
+    # Jumlah jawaban benar per soal langsung dari byte terkemas
+    def column_counts(self):
+        return POPCOUNT[self.bits].sum(axis=0, dtype=np.int64)
+
+
+# Fungsi untuk mengambil matriks benar/salah dari CorrectMatrix atau dari kolom
+# *_correct hasil evaluate_answers
+def correct_values(correct, question_cols):
+    if isinstance(correct, CorrectMatrix):
+        return correct.unpack()
+    return correct[[f"{col}_correct" for col in question_cols]].to_numpy(dtype=bool)
+
+
+# Fungsi untuk menormalkan kolom soal (huruf besar, tanpa spasi tepi) saat data dimuat.
+# Kolom soal disimpan sebagai kategorikal dengan kategori bersama (kode 1 byte per sel).
+def normalize_answers(df, question_cols=None):
+    if question_cols is None:
+        question_cols = get_question_cols(df, df.columns[0]) if len(df.columns) else []
+    if not question_cols or _shared_answer_dtype(df, question_cols) is not None:
+        return df
+    normalized = EncodedAnswers.from_values(df[question_cols].to_numpy(dtype=object), question_cols).to_categoricals()
+    return pd.DataFrame(
+        {col: normalized.get(col, df[col]) for col in df.columns}, index=df.index
+    )
+
+
+# Fungsi untuk preprocessing data
+def preprocess_data(df_answers, df_key=None, has_key_column=False):
+    # Jawaban (termasuk baris kunci bila ada) dinormalkan dan dikodekan sekali di sini
+    df_answers = normalize_answers(df_answers)
+    
+    # Jika key ada dalam dataframe jawaban siswa (kolom pertama)
+    if has_key_column and df_key is None:
+        key_row = df_answers.iloc[0].copy()
+        df_answers = df_answers.iloc[1:].copy()
+        # Konversi key_row menjadi DataFrame untuk format yang konsisten
+        df_key = pd.DataFrame([key_row.values], columns=key_row.index)
+    
+    # Bersihkan nama kolom jika diperlukan
+    if df_key is not None:
+        from .scoring import KeySpec, is_key_spec_frame
+        
+        # Pastikan kolom pertama adalah nama siswa
+        student_col = df_answers.columns[0]
+        question_cols = get_question_cols(df_answers, student_col)
+        
+        # File spesifikasi kunci (kolom Soal, Kunci, Bobot, Tipe) memuat kunci ganda, bobot dan nilai parsial
+        if is_key_spec_frame(df_key):
+            return df_answers, KeySpec.from_frame(df_key)
+        
+        # Ekstrak kunci jawaban (dinormalkan dengan aturan yang sama seperti jawaban)
+        key_answers = {}
+        for col in question_cols:
+            key_answers[col] = normalize_answer(df_key[col].iloc[0])
+    
+    return df_answers, key_answers if df_key is not None else None
+
+
+# Fungsi untuk mencocokkan seluruh blok jawaban (siswa x soal) dengan kunci sekaligus
+def score_answer_matrix(df_answers, key_answers, question_cols):
+    from .scoring import score_frame
+    
+    # Matriks benar/salah (nilai penuh) berbentuk (jumlah siswa, jumlah soal) dengan tipe bool
+    return score_frame(df_answers, key_answers, question_cols)[1]
+
+
+# Fungsi untuk menilai jawaban. Hasilnya tabel per siswa (identitas, jumlah benar,
+# poin, nilai) dan matriks benar/salah terkemas bit untuk analisis per soal.
+# key_answers boleh berupa dict {soal: kunci} atau KeySpec (kunci ganda, bobot, parsial).
+# check_cancelled (opsional) dipanggil per blok siswa saat penilaian.
+def score_answers(df_answers, key_answers, student_col, check_cancelled=None):
+    from .scoring import as_key_spec, score_frame
+    
+    question_cols = get_question_cols(df_answers, student_col)
+    key_spec = as_key_spec(key_answers)
+    
+    # Poin dan jawaban benar/salah dihitung dalam satu lintasan array
+    points, correct_matrix = score_frame(df_answers, key_spec, question_cols, check_cancelled)
+    total_correct = correct_matrix.sum(axis=1, dtype=np.int64)
+    
+    id_cols = [student_col] + ([CLASS_COL] if CLASS_COL in df_answers.columns else [])
+    results = df_answers[id_cols].copy()
+    results['total_correct'] = total_correct
+    results['total_points'] = points
+    results['score'] = (points / key_spec.max_points(question_cols)) * 100
+    
+    return results, CorrectMatrix.pack(correct_matrix, question_cols)
+
+
+# Fungsi untuk menilai jawaban dengan kolom *_correct per soal (bentuk tabel lebar)
+def evaluate_answers(df_answers, key_answers, student_col):
+    results, correct = score_answers(df_answers, key_answers, student_col)
+    
+    # Susun dataframe hasil sekaligus agar tidak terfragmentasi
+    correct_df = pd.DataFrame(
+        correct.unpack(),
+        index=results.index,
+        columns=[f"{col}_correct" for col in correct.question_cols]
+    )
+    summary_cols = ['total_correct', 'total_points', 'score']
+    id_cols = [col for col in results.columns if col not in summary_cols]
+    return pd.concat([results[id_cols], correct_df, results[summary_cols]], axis=1)
+
+
+# Fungsi untuk membandingkan memori representasi ringkas dengan representasi lama:
+# kolom object berisi string per sel dan kolom *_correct int64 per soal
+def memory_report(df_answers, correct, question_cols):
+    encoded = EncodedAnswers.from_frame(df_answers, question_cols)
+    n_cells = encoded.codes.size
+    
+    # Ukuran objek Python per sel seperti dihitung memory_usage(deep=True); sel kosong berupa NaN
+    counts = np.bincount(encoded.codes.ravel(), minlength=len(encoded.options))
+    label_sizes = np.array([sys.getsizeof(np.nan)] + [sys.getsizeof(label) for label in encoded.options[1:]])
+    answers_before = n_cells * 8 + int(counts @ label_sizes)
+    answers_after = int(df_answers[question_cols].memory_usage(index=False, deep=True).sum())
+    correct_before = n_cells * 8
+    correct_after = correct.nbytes
+    
+    before = answers_before + correct_before
+    after = answers_after + correct_after
+    return {
+        'answers_object_bytes': answers_before,
+        'answers_encoded_bytes': answers_after,
+        'correct_int64_bytes': correct_before,
+        'correct_packed_bytes': correct_after,
+        'saved_bytes': before - after,
+        'saved_pct': (1 - after / before) * 100 if before else 0.0,
+    }
+
+
+# Fungsi untuk menganalisis kesulitan soal dari CorrectMatrix atau hasil evaluate_answers
+def analyze_difficulty(results, question_cols):
+    if isinstance(results, CorrectMatrix):
+        if not question_cols:
+            return {}
+        correct_rates = results.column_counts() / max(results.n_students, 1) * 100
+    else:
+        question_cols = [col for col in question_cols if f"{col}_correct" in results.columns]
+        if not question_cols:
+            return {}
+        
+        # Rata-rata per kolom langsung dari matriks benar/salah
+        correct_matrix = results[[f"{col}_correct" for col in question_cols]].to_numpy(dtype=np.int8)
+        correct_rates = correct_matrix.mean(axis=0) * 100
+    
+    difficulty = {}
+    for col, correct_rate in zip(question_cols, correct_rates):
+        difficulty[col] = {
+            'correct_rate': float(correct_rate),
+            'difficulty_level': get_difficulty_level(correct_rate)
+        }
+    return difficulty
+
+
+# Fungsi untuk menentukan level kesulitan
+def get_difficulty_level(correct_rate):
+    if correct_rate < 30:
+        return "Sangat Sulit"
+    elif correct_rate < 50:
+        return "Sulit"
+    elif correct_rate < 70:
+        return "Sedang"
+    elif correct_rate < 90:
+        return "Mudah"
+    else:
+        return "Sangat Mudah"
+        
+# Fungsi untuk membuat rekomendasi topik
+def generate_topic_recommendations(difficulty_data, topic_mapping=None):
+    recommendations = []
+    
+    # Jika tidak ada pemetaan topik, gunakan soal secara langsung
+    if topic_mapping is None:
+        topic_mapping = {q: f"Materi pada {q}" for q in difficulty_data.keys()}
+    
+    for question, data in difficulty_data.items():
+        if data['correct_rate'] < 50:
+            if question in topic_mapping:
+                topic = topic_mapping[question]
+                # Soal yang masuk beberapa topik
+                if isinstance(topic, (list, tuple)):
+                    topic = ', '.join(topic)
+                recommendations.append({
+                    'question': question,
+                    'topic': topic,
+                    'correct_rate': data['correct_rate'],
+                    'recommendation': f"Perlu review pada topik '{topic}'"
+                })
+            else:
+                recommendations.append({
+                    'question': question,
+                    'topic': f"Materi pada {question}",
+                    'correct_rate': data['correct_rate'],
+                    'recommendation': f"Perlu review pada materi di {question}"
+                })
+    
+    return recommendations
+
+
+# Fungsi untuk membaca file Excel/CSV dari bytes.
+# File Excel dibaca semua sheet-nya (satu sheet per kelas) kecuali all_sheets=False.
+def read_table(data, filename, usecols=None, all_sheets=True, key_in_first_row=False, max_workers=None,
+               check_cancelled=None):
+    if filename.endswith('.xlsx'):
+        return read_excel_workbook(
+            data, usecols=usecols, all_sheets=all_sheets,
+            key_in_first_row=key_in_first_row, max_workers=max_workers, check_cancelled=check_cancelled
+        )
+    return pd.read_csv(BytesIO(data))
+
+
+# Fungsi untuk meringkas statistik nilai kelas
+def summarize_scores(scores):
+    return {
+        'avg_score': scores.mean(),
+        'median_score': scores.median(),
+        'min_score': scores.min(),
+        'max_score': scores.max(),
+    }
+
+
+# Fungsi untuk menghitung histogram skor halus (0-100) dengan bin tetap.
+# Skor tepat 100 masuk ke bin terakhir.
+def score_histogram(scores, n_bins=SCORE_HIST_BINS):
+    scores = np.asarray(scores, dtype=np.float64)
+    bins = np.clip((scores * n_bins / 100).astype(np.int64), 0, n_bins - 1)
+    return np.bincount(bins, minlength=n_bins)
@@ -0,0 +1,168 @@
+import json
+import logging
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+logger = logging.getLogger(__name__)
+
+# Diagnostik (waktu per tahap + log terstruktur) aktif secara default bila variabel ini diisi
+DIAGNOSTICS_ENV = 'ANALISIS_DIAGNOSTIK'
+
+_DISABLED = nullcontext()
+
+
+# Fungsi untuk membaca memori proses saat ini (RSS) dalam MB; None bila tidak didukung (non-Linux)
+def current_rss_mb():
+    try:
+        with open('/proc/self/statm') as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf('SC_PAGE_SIZE') / 1024 ** 2
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+# Fungsi untuk membaca puncak memori proses (RSS) sejak proses dimulai, dalam MB.
+# Ini angka seumur proses, bukan per tahap; murah, tanpa tracemalloc.
+def peak_rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux melaporkan KB, macOS melaporkan byte
+    return peak / 1024 ** 2 if sys.platform == 'darwin' else peak / 1024
+
+
+# Fungsi untuk mengambil jumlah baris dan kolom dari hasil sebuah tahap (bila berupa tabel)
+def describe_shape(value):
+    if isinstance(value, dict):
+        value = tuple(value.values())
+    if isinstance(value, tuple):
+        value = next((item for item in value if getattr(item, 'ndim', 0) > 0), None)
+    shape = getattr(value, 'shape', None)
+    if not shape:
+        return None, None
+    return int(shape[0]), int(shape[1]) if len(shape) > 1 else None
+
+
+# Pelacak tracemalloc bersama untuk satu proses. tracemalloc bersifat global,
+# sedangkan tahap bisa bersarang dan berjalan bersamaan (sesi lain, thread
+# pekerjaan latar belakang). Pelacak menghitung pengukuran yang aktif: tracing
+# dimulai oleh pengukuran pertama dan dihentikan setelah yang terakhir selesai.
+# Setiap kali pengukuran dimulai atau selesai, puncak global dibagikan ke semua
+# pengukuran aktif; saat pengukuran baru dimulai puncak global di-reset, sehingga
+# puncak sebelum sebuah tahap dimulai tidak ikut terhitung pada tahap itu.
+class _MemoryTracer:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._active = {}
+        self._next_token = 0
+        self._started = False
+
+    def begin(self):
+        with self._lock:
+            if not self._active and not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._started = True
+            self._share_peak()
+            tracemalloc.reset_peak()
+            current = tracemalloc.get_traced_memory()[0]
+            token = self._next_token
+            self._next_token += 1
+            self._active[token] = [current, current]
+            return token
+
+    # Mengembalikan puncak alokasi (byte) selama pengukuran, relatif terhadap awalnya
+    def end(self, token):
+        with self._lock:
+            self._share_peak()
+            baseline, peak = self._active.pop(token)
+            if not self._active and self._started:
+                tracemalloc.stop()
+                self._started = False
+            return max(0, peak - baseline)
+
+    def _share_peak(self):
+        peak = tracemalloc.get_traced_memory()[1]
+        for measurement in self._active.values():
+            measurement[1] = max(measurement[1], peak)
+
+
+_TRACER = _MemoryTracer()
+
+
+# Pencatat waktu dan memori per tahap. Bila tidak aktif, stage() mengembalikan
+# context manager kosong sehingga biayanya hanya satu pemeriksaan boolean.
+class Diagnostics:
+    def __init__(self, enabled=False, trace_memory=False):
+        self.enabled = enabled
+        self.trace_memory = trace_memory
+        self.records = []
+        self._depth = 0
+
+    def stage(self, name, **info):
+        if not self.enabled:
+            return _DISABLED
+        return self._measure(name, info)
+
+    @contextmanager
+    def _measure(self, name, info):
+        # Tahap bersarang (misalnya query tabel di dalam render tabel) dicatat dengan kedalamannya
+        record = {'stage': name, 'depth': self._depth, **info}
+        self._depth += 1
+        token = _TRACER.begin() if self.trace_memory else None
+        rss_before = current_rss_mb()
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            self._depth -= 1
+            record['seconds'] = round(time.perf_counter() - start, 6)
+            if token is not None:
+                record['peak_mb'] = round(_TRACER.end(token) / 1024 ** 2, 3)
+            rss_after = current_rss_mb()
+            # Perubahan RSS selama tahap; tahap lain yang berjalan bersamaan ikut terhitung
+            record['rss_delta_mb'] = (
+                round(rss_after - rss_before, 1) if rss_before is not None and rss_after is not None else None
+            )
+            # Puncak RSS seumur proses (bukan per tahap), sebagai pembanding
+            process_peak = peak_rss_mb()
+            record['process_rss_peak_mb'] = round(process_peak, 1) if process_peak is not None else None
+            self.records.append(record)
+            logger.info(json.dumps(record, default=str))
+
+    # Catat baris/kolom hasil tahap; dipanggil di dalam blok stage()
+    @staticmethod
+    def set_shape(record, value):
+        if record is not None:
+            record['rows'], record['cols'] = describe_shape(value)
+
+    def total_seconds(self):
+        return sum(record['seconds'] for record in self.records if record['depth'] == 0)
+
+    def to_json(self):
+        return json.dumps({
+            'trace_memory': self.trace_memory,
+            'total_seconds': round(self.total_seconds(), 6),
+            'stages': self.records,
+        }, indent=2, default=str)
+
+
+def diagnostics_enabled_by_default():
+    return os.environ.get(DIAGNOSTICS_ENV, '').lower() in ('1', 'true', 'ya', 'on')
+
+
+# Fungsi untuk menulis log diagnostik (satu baris JSON per tahap) ke stderr
+def configure_logging(level=logging.INFO):
+    if not logger.handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter('%(asctime)s %(name)s %(message)s'))
+        logger.addHandler(handler)
+    logger.setLevel(level)
@@ -0,0 +1,133 @@
+import os
+from io import BytesIO
+
+import pandas as pd
+
+from .pool import process_pool
+
+# Nama kolom penanda kelas saat workbook berisi lebih dari satu sheet
+CLASS_COL = 'Kelas'
+
+# python-calamine (opsional) jauh lebih cepat dari openpyxl untuk membaca .xlsx
+try:
+    from python_calamine import CalamineWorkbook
+except ImportError:
+    CalamineWorkbook = None
+
+
+# Fungsi untuk mendapatkan daftar nama sheet tanpa memuat isinya
+def list_sheet_names(data):
+    if CalamineWorkbook is not None:
+        return list(CalamineWorkbook.from_filelike(BytesIO(data)).sheet_names)
+    import openpyxl
+    workbook = openpyxl.load_workbook(BytesIO(data), read_only=True, data_only=True)
+    try:
+        return list(workbook.sheetnames)
+    finally:
+        workbook.close()
+
+
+# Fungsi untuk mengiterasi baris sebuah sheet sebagai tuple nilai mentah
+def _iter_sheet_rows(data, sheet_name):
+    if CalamineWorkbook is not None:
+        sheet = CalamineWorkbook.from_filelike(BytesIO(data)).get_sheet_by_name(sheet_name)
+        yield from sheet.to_python(skip_empty_area=False)
+        return
+    import openpyxl
+    # Mode read-only membaca XML sheet secara streaming tanpa membuat objek Cell
+    workbook = openpyxl.load_workbook(BytesIO(data), read_only=True, data_only=True)
+    try:
+        yield from workbook[sheet_name].iter_rows(values_only=True)
+    finally:
+        workbook.close()
+
+
+# Fungsi untuk membaca satu sheet, hanya mengonversi kolom yang dibutuhkan
+def read_sheet(data, sheet_name, usecols=None):
+    rows = _iter_sheet_rows(data, sheet_name)
+    header = next(rows, None)
+    if header is None:
+        return pd.DataFrame(columns=list(usecols or []))
+    
+    # Kolom tanpa judul (misalnya sel kosong di ujung kanan) dilewati
+    wanted = None if usecols is None else {str(col) for col in usecols}
+    positions = []
+    columns = []
+    for idx, name in enumerate(header):
+        if name is None:
+            continue
+        name = str(name).strip() if isinstance(name, str) else name
+        if wanted is not None and str(name) not in wanted:
+            continue
+        positions.append(idx)
+        columns.append(name)
+    
+    records = []
+    for row in rows:
+        values = tuple(_clean_cell(row[idx]) if idx < len(row) else None for idx in positions)
+        if any(value is not None for value in values):
+            records.append(values)
+    
+    return pd.DataFrame.from_records(records, columns=columns)
+
+
+# Fungsi untuk menyamakan nilai sel dengan hasil pd.read_excel:
+# sel kosong jadi None dan angka bulat yang tersimpan sebagai float jadi int
+def _clean_cell(value):
+    if value == "":
+        return None
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+# Fungsi untuk membaca workbook Excel; setiap sheet diparse paralel di process pool.
+# check_cancelled (opsional) dipanggil setiap satu sheet selesai dibaca dan boleh
+# melempar exception untuk menghentikan pembacaan; sheet yang belum mulai dibatalkan.
+def read_excel_workbook(data, usecols=None, all_sheets=True, key_in_first_row=False, max_workers=None,
+                        check_cancelled=None):
+    sheet_names = list_sheet_names(data)
+    if not all_sheets:
+        sheet_names = sheet_names[:1]
+    
+    if len(sheet_names) <= 1:
+        return read_sheet(data, sheet_names[0], usecols) if sheet_names else pd.DataFrame()
+    
+    max_workers = min(len(sheet_names), max_workers or os.cpu_count() or 1)
+    frames = []
+    if max_workers == 1:
+        # Dipakai juga di dalam proses pekerja lain, tempat pool bersarang dihindari
+        for sheet_name in sheet_names:
+            frames.append(read_sheet(data, sheet_name, usecols))
+            if check_cancelled is not None:
+                check_cancelled()
+    else:
+        executor = process_pool(max_workers)
+        try:
+            for frame in executor.map(
+                read_sheet,
+                [data] * len(sheet_names),
+                sheet_names,
+                [usecols] * len(sheet_names)
+            ):
+                frames.append(frame)
+                if check_cancelled is not None:
+                    check_cancelled()
+        finally:
+            executor.shutdown(cancel_futures=True)
+    
+    # Bila baris pertama adalah kunci, cukup sheet pertama yang menyimpannya;
+    # baris kunci yang diulang di sheet lain (label sama) dibuang
+    if key_in_first_row and not frames[0].empty:
+        key_label = frames[0].iloc[0, 0]
+        for idx in range(1, len(frames)):
+            if not frames[idx].empty and frames[idx].iloc[0, 0] == key_label:
+                frames[idx] = frames[idx].iloc[1:]
+    
+    # Tandai asal kelas tepat setelah kolom nama siswa
+    tagged = []
+    for sheet_name, frame in zip(sheet_names, frames):
+        frame = frame.copy()
+        frame.insert(min(1, len(frame.columns)), CLASS_COL, sheet_name)
+        tagged.append(frame)
+    return pd.concat(tagged, ignore_index=True)
@@ -0,0 +1,87 @@
+import zipfile
+from io import BytesIO
+
+import numpy as np
+import pandas as pd
+
+# Jumlah baris yang diserialisasi sekaligus; teks CSV dibuat per potongan
+EXPORT_CHUNK_ROWS = 50_000
+
+# pyarrow (opsional) dibutuhkan untuk ekspor Parquet
+try:
+    import pyarrow  # noqa: F401
+    PARQUET_AVAILABLE = True
+except ImportError:
+    PARQUET_AVAILABLE = False
+
+MIME_CSV = 'text/csv'
+MIME_XLSX = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+MIME_ZIP = 'application/zip'
+
+
+# Fungsi untuk menulis DataFrame sebagai CSV per potongan ke file biner
+def write_csv(df, fileobj, chunk_rows=EXPORT_CHUNK_ROWS):
+    if len(df) == 0:
+        fileobj.write(df.to_csv(index=False).encode('utf-8'))
+        return
+    for start in range(0, len(df), chunk_rows):
+        chunk = df.iloc[start:start + chunk_rows]
+        fileobj.write(chunk.to_csv(index=False, header=(start == 0)).encode('utf-8'))
+
+
+# Fungsi untuk membangun isi file CSV (bytes); dipanggil hanya saat unduhan diminta.
+# st.download_button hanya menerima str, bytes atau buffer di memori, bukan file di disk.
+def build_csv(df, chunk_rows=EXPORT_CHUNK_ROWS):
+    buffer = BytesIO()
+    write_csv(df, buffer, chunk_rows)
+    return buffer.getvalue()
+
+
+# Fungsi untuk mengubah nilai sel menjadi tipe yang dapat ditulis openpyxl
+def _excel_value(value):
+    if value is None or (isinstance(value, float) and np.isnan(value)):
+        return None
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+# Fungsi untuk membangun satu workbook XLSX (bytes) berisi beberapa sheet.
+# Mode write-only openpyxl menulis baris tanpa menyimpan objek sel per sel.
+def build_xlsx(sheets):
+    import openpyxl
+
+    workbook = openpyxl.Workbook(write_only=True)
+    for sheet_name, df in sheets.items():
+        # Nama sheet Excel maksimal 31 karakter
+        worksheet = workbook.create_sheet(title=str(sheet_name)[:31])
+        worksheet.append([str(col) for col in df.columns])
+        for row in df.itertuples(index=False, name=None):
+            worksheet.append([_excel_value(value) for value in row])
+
+    buffer = BytesIO()
+    workbook.save(buffer)
+    return buffer.getvalue()
+
+
+# Fungsi untuk menyiapkan tabel agar valid sebagai Parquet: nama kolom berupa teks
+# dan kolom object bertipe campuran (misalnya jawaban angka dan huruf) dijadikan teks
+def _parquet_safe(df):
+    df = df.rename(columns=str)
+    for col in df.columns[df.dtypes == object]:
+        df[col] = df[col].map(lambda value: value if pd.isna(value) or isinstance(value, str) else str(value))
+    return df
+
+
+# Fungsi untuk membangun arsip zip (bytes) berisi satu file Parquet per tabel
+def build_parquet_bundle(sheets):
+    if not PARQUET_AVAILABLE:
+        raise ImportError("Ekspor Parquet membutuhkan paket pyarrow.")
+
+    buffer = BytesIO()
+    # Parquet sudah terkompresi, jadi isi zip cukup disimpan apa adanya
+    with zipfile.ZipFile(buffer, 'w', compression=zipfile.ZIP_STORED) as archive:
+        for name, df in sheets.items():
+            with archive.open(f"{name}.parquet", 'w') as entry:
+                _parquet_safe(df).to_parquet(entry, index=False)
+    return buffer.getvalue()
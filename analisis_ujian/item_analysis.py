@@ -0,0 +1,139 @@
+import numpy as np
+import pandas as pd
+
+from .core import EncodedAnswers, correct_values
+from .scoring import as_key_spec, credit_table
+
+# Proporsi siswa pada kelompok atas dan bawah untuk indeks daya beda (kriteria Kelley)
+GROUP_FRACTION = 0.27
+# Distraktor dianggap tidak berfungsi bila dipilih kurang dari 5% siswa
+DISTRACTOR_MIN_RATE = 5.0
+
+
+# Fungsi untuk menentukan kategori daya beda soal
+def get_discrimination_level(discrimination):
+    if np.isnan(discrimination):
+        return "Tidak Terdefinisi"
+    elif discrimination < 0:
+        return "Negatif (Periksa Kunci)"
+    elif discrimination < 0.2:
+        return "Jelek (Ganti)"
+    elif discrimination < 0.3:
+        return "Cukup (Revisi)"
+    elif discrimination < 0.4:
+        return "Baik"
+    else:
+        return "Sangat Baik"
+
+
+# Fungsi untuk mendapatkan indeks siswa kelompok bawah dan atas berdasarkan skor total
+def split_groups(totals, group_fraction=GROUP_FRACTION):
+    n_students = len(totals)
+    group_size = max(1, int(np.ceil(n_students * group_fraction))) if n_students else 0
+    order = np.argsort(totals, kind='stable')
+    return order[:group_size], order[n_students - group_size:]
+
+
+# Fungsi untuk menghitung statistik butir soal dari matriks benar/salah (siswa x soal).
+# Semua statistik diturunkan dari beberapa lintasan matriks: rata-rata kolom,
+# satu perkalian matriks-vektor X^T.T dan jumlah kolom pada kelompok atas/bawah.
+def item_statistics(correct_matrix, question_cols, group_fraction=GROUP_FRACTION):
+    X = np.asarray(correct_matrix, dtype=np.float32)
+    n_students, n_items = X.shape
+    totals = X.sum(axis=1, dtype=np.float64)
+
+    p = X.mean(axis=0, dtype=np.float64)
+    item_var = p * (1 - p)
+    total_var = totals.var()
+    cov_item_total = (X.T @ totals.astype(np.float32)).astype(np.float64) / max(n_students, 1) - p * totals.mean()
+
+    # Daya beda: selisih proporsi benar kelompok atas dan kelompok bawah
+    lower, upper = split_groups(totals, group_fraction)
+    discrimination = X[upper].mean(axis=0, dtype=np.float64) - X[lower].mean(axis=0, dtype=np.float64)
+
+    # Varians skor sisa (skor total tanpa butir itu sendiri) tanpa membentuk matriks skor sisa
+    rest_var = total_var + item_var - 2 * cov_item_total
+    with np.errstate(divide='ignore', invalid='ignore'):
+        point_biserial = (cov_item_total - item_var) / np.sqrt(item_var * rest_var)
+
+        # KR-20 (sama dengan Cronbach's alpha untuk butir dikotomus) dan alpha jika butir dihapus
+        sum_item_var = item_var.sum()
+        kr20 = n_items / (n_items - 1) * (1 - sum_item_var / total_var) if n_items > 1 else np.nan
+        k_deleted = n_items - 1
+        alpha_if_deleted = k_deleted / (k_deleted - 1) * (1 - (sum_item_var - item_var) / rest_var) \
+            if k_deleted > 1 else np.full(n_items, np.nan)
+
+    items = pd.DataFrame({
+        'Soal': question_cols,
+        'Tingkat Kesukaran (p)': p,
+        'Daya Beda (D)': discrimination,
+        'Korelasi Point-Biserial': point_biserial,
+        'Alpha Jika Soal Dihapus': alpha_if_deleted,
+    })
+    items['Kategori Daya Beda'] = [get_discrimination_level(d) for d in discrimination]
+
+    sem = np.sqrt(total_var * (1 - kr20)) if np.isfinite(kr20) and kr20 <= 1 else np.nan
+    reliability = {
+        'n_students': n_students,
+        'n_items': n_items,
+        'kr20': float(kr20),
+        'cronbach_alpha': float(kr20),
+        'total_variance': float(total_var),
+        'sem': float(sem),
+    }
+    return items, reliability, (lower, upper)
+
+
+# Fungsi untuk menghitung tabel distraktor: berapa siswa memilih setiap opsi,
+# secara keseluruhan serta di kelompok atas dan bawah.
+# answers boleh berupa EncodedAnswers atau matriks nilai mentah (siswa x soal).
+def distractor_table(answers, key_answers, question_cols, lower, upper):
+    if not isinstance(answers, EncodedAnswers):
+        answers = EncodedAnswers.from_values(answers, question_cols)
+    n_students, n_items = answers.codes.shape
+    n_options = len(answers.options)
+    options = answers.options
+
+    # Satu bincount per kelompok: indeks gabungan (soal, opsi) langsung dari kode opsi
+    flat = answers.codes.astype(np.int32) + np.arange(n_items, dtype=np.int32)[np.newaxis, :] * n_options
+    counts = np.bincount(flat.ravel(), minlength=n_items * n_options).reshape(n_items, n_options)
+    upper_counts = np.bincount(flat[upper].ravel(), minlength=n_items * n_options).reshape(n_items, n_options)
+    lower_counts = np.bincount(flat[lower].ravel(), minlength=n_items * n_options).reshape(n_items, n_options)
+
+    item_idx, option_idx = np.nonzero(counts)
+    # Opsi kunci: opsi yang bernilai penuh (termasuk kunci ganda dan jawaban lengkap pilihan ganda kompleks)
+    credit = credit_table(options, question_cols, as_key_spec(key_answers))
+    rows = pd.DataFrame({
+        'Soal': [question_cols[i] for i in item_idx],
+        'Opsi': ['(kosong)' if options[o] is None else options[o] for o in option_idx],
+        'Kunci': credit[item_idx, option_idx] >= 1,
+        'Jumlah Pemilih': counts[item_idx, option_idx],
+        'Persentase Pemilih': counts[item_idx, option_idx] / max(n_students, 1) * 100,
+        'Kelompok Atas': upper_counts[item_idx, option_idx],
+        'Kelompok Bawah': lower_counts[item_idx, option_idx],
+    })
+
+    rows = rows.iloc[np.lexsort((rows['Opsi'].astype(str).to_numpy(), item_idx))].reset_index(drop=True)
+
+    # Distraktor berfungsi bila cukup banyak dipilih dan lebih menarik bagi kelompok bawah
+    is_distractor = ~rows['Kunci']
+    rows['Keterangan'] = ''
+    rows.loc[rows['Kunci'], 'Keterangan'] = 'Kunci'
+    rows.loc[is_distractor, 'Keterangan'] = 'Berfungsi'
+    rows.loc[is_distractor & (rows['Persentase Pemilih'] < DISTRACTOR_MIN_RATE), 'Keterangan'] = 'Tidak Berfungsi'
+    rows.loc[is_distractor & (rows['Kelompok Atas'] > rows['Kelompok Bawah']), 'Keterangan'] = 'Menyesatkan Kelompok Atas'
+    return rows
+
+
+# Fungsi untuk menjalankan analisis butir lengkap dari CorrectMatrix (score_answers)
+# atau dari hasil evaluate_answers
+def analyze_items(results, question_cols, df_answers=None, key_answers=None, group_fraction=GROUP_FRACTION):
+    correct_matrix = correct_values(results, question_cols)
+    items, reliability, (lower, upper) = item_statistics(correct_matrix, question_cols, group_fraction)
+
+    distractors = None
+    if df_answers is not None and key_answers is not None:
+        distractors = distractor_table(
+            EncodedAnswers.from_frame(df_answers, question_cols), key_answers, question_cols, lower, upper
+        )
+    return {'items': items, 'reliability': reliability, 'distractors': distractors}
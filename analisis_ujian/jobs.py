@@ -0,0 +1,177 @@
+# Pekerjaan analisis di latar belakang. Tahap-tahap analisis yang lama
+# (baca file, penilaian, analisis butir, persiapan grafik) dijalankan di thread
+# pool milik proses server, sehingga halaman tetap responsif dan hanya
+# memeriksa kemajuan. Pekerjaan disimpan per id (hash input), sehingga rerun
+# halaman mengambil pekerjaan yang sudah berjalan/selesai alih-alih mengulang.
+#
+# Dipakai thread, bukan proses: tahap-tahapnya berbagi AnalysisCache di memori,
+# dan bagian terberat (numpy, pool proses batch/kemiripan) tidak menahan GIL.
+# Pembatalan bersifat kooperatif: diperiksa sebelum setiap tahap dimulai, dan
+# tahap yang panjang memanggil check_cancelled di antara potongan kerjanya
+# (per sheet saat membaca workbook, per blok saat menilai). Satu pekerjaan bisa
+# ditampilkan beberapa sesi sekaligus; pekerjaan baru dihentikan bila semua
+# sesi yang menampilkannya sudah membatalkan.
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+# Status satu tahap atau satu pekerjaan
+STATUS_WAITING = 'menunggu'
+STATUS_RUNNING = 'berjalan'
+STATUS_DONE = 'selesai'
+STATUS_FAILED = 'gagal'
+STATUS_CANCELLED = 'dibatalkan'
+FINISHED_STATUSES = (STATUS_DONE, STATUS_FAILED, STATUS_CANCELLED)
+
+# Jumlah pekerjaan selesai yang tetap disimpan (yang paling lama tidak dipakai dibuang)
+JOB_HISTORY = 32
+
+
+# Turunan BaseException (seperti kontrol skrip Streamlit): pembatalan bukan kesalahan
+# perhitungan, sehingga AnalysisCache tidak meneruskannya ke sesi lain yang menunggu
+# hasil yang sama; sesi itu menghitung sendiri.
+class JobCancelled(BaseException):
+    pass
+
+
+# Satu pekerjaan analisis: daftar tahap berurutan beserta status, durasi dan hasilnya.
+# Hasil tahap yang sudah selesai bisa dibaca (dan ditampilkan) sebelum pekerjaan selesai.
+# diagnostics (opsional) adalah pencatat Diagnostics yang dipakai tahap-tahapnya.
+class Job:
+    def __init__(self, job_id, stage_names, diagnostics=None):
+        self.id = job_id
+        self.diagnostics = diagnostics
+        self.stages = OrderedDict(
+            (name, {'status': STATUS_WAITING, 'seconds': None}) for name in stage_names
+        )
+        self.results = {}
+        self.error = None
+        self.submitted_at = time.time()
+        self._cancel = threading.Event()
+        self._subscribers = set()
+        self._lock = threading.Lock()
+
+    @property
+    def status(self):
+        statuses = [stage['status'] for stage in self.stages.values()]
+        for status in (STATUS_FAILED, STATUS_CANCELLED, STATUS_RUNNING):
+            if status in statuses:
+                return status
+        if all(status == STATUS_DONE for status in statuses):
+            return STATUS_DONE
+        return STATUS_RUNNING if STATUS_DONE in statuses else STATUS_WAITING
+
+    @property
+    def finished(self):
+        return self.status in FINISHED_STATUSES
+
+    @property
+    def cancel_requested(self):
+        return self._cancel.is_set()
+
+    # Fraksi tahap yang sudah selesai (0-1)
+    def progress(self):
+        done = sum(stage['status'] == STATUS_DONE for stage in self.stages.values())
+        return done / len(self.stages) if self.stages else 1.0
+
+    def completed_stages(self):
+        return [name for name, stage in self.stages.items() if stage['status'] == STATUS_DONE]
+
+    # Catat sesi yang menampilkan pekerjaan ini
+    def subscribe(self, subscriber):
+        with self._lock:
+            self._subscribers.add(subscriber)
+
+    # Batalkan untuk satu sesi. Pekerjaan benar-benar dihentikan bila tidak ada
+    # sesi lain yang masih menampilkannya (atau bila subscriber tidak diberikan).
+    # Mengembalikan True bila pekerjaan dihentikan.
+    def cancel(self, subscriber=None):
+        with self._lock:
+            self._subscribers.discard(subscriber)
+            if subscriber is None or not self._subscribers:
+                self._cancel.set()
+        return self._cancel.is_set()
+
+    # Dipanggil tahap di antara potongan kerjanya; menghentikan tahap yang sedang berjalan
+    def check_cancelled(self):
+        if self._cancel.is_set():
+            raise JobCancelled()
+
+    def run(self, stage_funcs):
+        for name, func in stage_funcs:
+            stage = self.stages[name]
+            if self._cancel.is_set():
+                self._mark_remaining(STATUS_CANCELLED)
+                return
+            stage['status'] = STATUS_RUNNING
+            start = time.perf_counter()
+            try:
+                # Tahap menerima hasil tahap-tahap sebelumnya dan fungsi pemeriksa pembatalan
+                value = func(self.results, self.check_cancelled)
+            except JobCancelled:
+                self._mark_remaining(STATUS_CANCELLED)
+                return
+            except Exception as e:
+                # Traceback dilepas agar frame tahap (beserta datanya) tidak ikut tertahan
+                self.error = e.with_traceback(None)
+                stage['status'] = STATUS_FAILED
+                self._mark_remaining(STATUS_CANCELLED)
+                return
+            finally:
+                stage['seconds'] = round(time.perf_counter() - start, 3)
+            # Hasil dicatat sebelum status, agar pembaca tidak melihat tahap selesai tanpa hasil
+            self.results[name] = value
+            stage['status'] = STATUS_DONE
+
+    def _mark_remaining(self, status):
+        for stage in self.stages.values():
+            if stage['status'] in (STATUS_WAITING, STATUS_RUNNING):
+                stage['status'] = status
+
+
+# Pengelola pekerjaan untuk satu proses server (dipakai bersama semua sesi)
+class JobManager:
+    def __init__(self, max_workers=None, history=JOB_HISTORY):
+        self.history = history
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='analisis-job')
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                self._jobs.move_to_end(job_id)
+            return job
+
+    # Kirim pekerjaan dengan id tertentu. Bila pekerjaan dengan id yang sama sudah ada,
+    # pekerjaan itu yang dikembalikan; pekerjaan yang sudah selesai hanya diulang bila restart=True.
+    # stage_funcs berupa daftar (nama tahap, fungsi(hasil_sebelumnya, check_cancelled) -> hasil).
+    def submit(self, job_id, stage_funcs, restart=False, diagnostics=None):
+        stage_funcs = list(stage_funcs)
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None and not (restart and job.finished):
+                self._jobs.move_to_end(job_id)
+                return job
+            job = self._jobs[job_id] = Job(job_id, [name for name, _ in stage_funcs], diagnostics)
+            self._evict()
+        self._executor.submit(job.run, stage_funcs)
+        return job
+
+    # Batalkan pekerjaan untuk satu sesi (subscriber); lihat Job.cancel
+    def cancel(self, job_id, subscriber=None):
+        job = self.get(job_id)
+        return job is not None and job.cancel(subscriber)
+
+    # Buang pekerjaan selesai yang paling lama tidak dipakai; yang masih berjalan tidak dibuang
+    def _evict(self):
+        finished = [job_id for job_id, job in self._jobs.items() if job.finished]
+        for job_id in finished[:max(0, len(self._jobs) - self.history)]:
+            del self._jobs[job_id]
+
+    def stats(self):
+        with self._lock:
+            statuses = [job.status for job in self._jobs.values()]
+        return {status: statuses.count(status) for status in set(statuses)}
@@ -0,0 +1,21 @@
+# Process pool untuk pekerjaan paralel (baca workbook, batch, kemiripan jawaban).
+#
+# Pool dibuat dari dalam server Streamlit yang menjalankan banyak thread. Proses
+# hasil fork dari proses seperti itu bisa mewarisi lock yang sedang dipegang
+# thread lain (logging, cache, pustaka numerik) sehingga pekerja macet. Karena
+# itu pekerja dimulai lewat 'forkserver', atau 'spawn' bila tidak tersedia
+# (misalnya di Windows). Fungsi yang dijalankan pekerja harus bisa diimpor dari
+# modul paket ini, bukan didefinisikan di skrip utama.
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+
+# Fungsi untuk memilih cara memulai proses pekerja
+def process_pool_context():
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+
+
+# Fungsi untuk membuat ProcessPoolExecutor dengan cara mulai yang aman untuk server multithread
+def process_pool(max_workers, **kwargs):
+    return ProcessPoolExecutor(max_workers=max_workers, mp_context=process_pool_context(), **kwargs)
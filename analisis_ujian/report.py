@@ -0,0 +1,212 @@
+import numpy as np
+import pandas as pd
+
+from .core import (
+    analyze_difficulty,
+    generate_topic_recommendations,
+    get_question_cols,
+    memory_report,
+    preprocess_data,
+    score_answers,
+    score_histogram,
+    summarize_scores,
+)
+from .excel import CLASS_COL
+from .item_analysis import analyze_items
+from .topics import topic_mastery, topic_recommendations
+
+
+# Fungsi untuk menyusun tabel hasil per siswa, diurutkan dari nilai tertinggi.
+# Kolom Poin hanya ditampilkan bila poin berbeda dari jumlah benar (soal berbobot/parsial).
+def build_student_table(results, student_col):
+    id_cols = [student_col] + ([CLASS_COL] if CLASS_COL in results.columns else [])
+    value_cols = ['total_correct', 'score']
+    value_names = ['Jumlah Benar', 'Nilai']
+    if 'total_points' in results.columns and \
+            not np.array_equal(results['total_points'].to_numpy(), results['total_correct'].to_numpy()):
+        value_cols.insert(1, 'total_points')
+        value_names.insert(1, 'Poin')
+    student_table = results[id_cols + value_cols].copy()
+    student_table.columns = ['Nama Siswa'] + id_cols[1:] + value_names
+    return student_table.sort_values(by='Nilai', ascending=False)
+
+
+# Fungsi untuk menambahkan kolom status Lulus/Tidak Lulus berdasarkan batas nilai
+def add_pass_status(student_table, pass_threshold):
+    student_results = student_table.copy()
+    passed = student_results['Nilai'].to_numpy() >= pass_threshold
+    student_results['Status'] = np.where(passed, 'Lulus', 'Tidak Lulus')
+    return student_results
+
+
+# Fungsi untuk mengubah difficulty_data menjadi tabel tampilan
+def build_difficulty_table(difficulty_data):
+    # Urutkan berdasarkan tingkat kesulitan (persentase benar paling rendah).
+    # Pengurutan memakai angka, bukan teks persentase, agar "100.00%" tidak dianggap terkecil.
+    items = sorted(difficulty_data.items(), key=lambda item: item[1]['correct_rate'])
+    return pd.DataFrame([
+        {
+            'Soal': q,
+            'Persentase Benar': f"{data['correct_rate']:.2f}%",
+            'Tingkat Kesulitan': data['difficulty_level']
+        }
+        for q, data in items
+    ], columns=['Soal', 'Persentase Benar', 'Tingkat Kesulitan'])
+
+
+# Fungsi untuk mengubah daftar rekomendasi menjadi tabel
+def build_recommendation_table(recommendations):
+    return pd.DataFrame(recommendations, columns=['question', 'topic', 'correct_rate', 'recommendation'])
+
+
+# Fungsi untuk meringkas hasil memory_report menjadi satu baris teks
+def format_memory_report(memory):
+    before = memory['answers_object_bytes'] + memory['correct_int64_bytes']
+    after = memory['answers_encoded_bytes'] + memory['correct_packed_bytes']
+    return f"{before / 1024 ** 2:.1f} MB → {after / 1024 ** 2:.1f} MB (hemat {memory['saved_pct']:.0f}%)"
+
+
+# Hasil analisis satu ujian. Hanya penilaian yang dihitung saat objek dibuat;
+# bagian lain (statistik, kesulitan soal, rekomendasi, analisis butir, ...) baru
+# dihitung saat pertama kali diminta, lalu disimpan di objek. memo (opsional)
+# berupa fungsi memo(nama, input, compute) untuk menyimpan bagian di cache luar,
+# misalnya cache bersama aplikasi, agar tetap tersimpan setelah objek dibuang.
+class ExamAnalysis:
+    def __init__(self, df_answers, key_answers, results, correct, student_col='Nama', topic_mapping=None,
+                 memo=None):
+        self.df_answers = df_answers
+        self.key_answers = key_answers
+        self.results = results
+        self.correct = correct
+        self.student_col = student_col
+        self.topic_mapping = topic_mapping or None
+        self.question_cols = get_question_cols(df_answers, student_col)
+        self._memo = memo
+        self._sections = {}
+
+    # Baca dan nilai jawaban; mengembalikan None bila kunci jawaban tidak ditemukan
+    @classmethod
+    def from_answers(cls, df_answers, df_key=None, has_key_column=False, student_col='Nama', topic_mapping=None,
+                     memo=None):
+        df_answers, key_answers = preprocess_data(df_answers, df_key, has_key_column)
+        if not key_answers:
+            return None
+        results, correct = score_answers(df_answers, key_answers, student_col)
+        return cls(df_answers, key_answers, results, correct, student_col, topic_mapping, memo)
+
+    # Salinan dengan memo lain, misalnya untuk menghitung bagian di thread pekerja
+    # dengan pencatat diagnostik sendiri; bagian yang sudah dihitung tidak ikut disalin
+    def with_memo(self, memo):
+        return type(self)(
+            self.df_answers, self.key_answers, self.results, self.correct, self.student_col,
+            self.topic_mapping, memo
+        )
+
+    # Hitung beberapa bagian (nama properti) tanpa memakai hasilnya, agar tersimpan di memo
+    def prepare(self, *names):
+        for name in names:
+            getattr(self, name)
+
+    # Hitung satu bagian sekali (per kombinasi input) lalu simpan
+    def section(self, name, compute, *inputs):
+        key = (name,) + inputs
+        if key not in self._sections:
+            if self._memo is not None:
+                self._sections[key] = self._memo(name, list(inputs), compute)
+            else:
+                self._sections[key] = compute()
+        return self._sections[key]
+
+    @property
+    def stats(self):
+        return self.section('stats', lambda: summarize_scores(self.results['score']))
+
+    @property
+    def score_hist(self):
+        return self.section('score_hist', lambda: score_histogram(self.results['score']))
+
+    @property
+    def memory(self):
+        return self.section('memory', lambda: memory_report(self.df_answers, self.correct, self.question_cols))
+
+    # Tabel per siswa diurutkan sekali; status lulus ditambahkan per batas nilai
+    @property
+    def student_table(self):
+        return self.section('student_table', lambda: build_student_table(self.results, self.student_col))
+
+    def pass_rate(self, pass_threshold):
+        return self.section('pass_rate', lambda: self.results['score'].ge(pass_threshold).mean() * 100, pass_threshold)
+
+    def student_results(self, pass_threshold):
+        return self.section(
+            'student_results', lambda: add_pass_status(self.student_table, pass_threshold), pass_threshold
+        )
+
+    @property
+    def difficulty_data(self):
+        return self.section('difficulty', lambda: analyze_difficulty(self.correct, self.question_cols))
+
+    @property
+    def difficulty_table(self):
+        return self.section('difficulty_table', lambda: build_difficulty_table(self.difficulty_data))
+
+    @property
+    def item_analysis(self):
+        return self.section(
+            'item_analysis',
+            lambda: analyze_items(self.correct, self.question_cols, self.df_answers, self.key_answers)
+        )
+
+    @property
+    def topics(self):
+        if self.topic_mapping is None:
+            return None
+        return self.section('topic_mastery', lambda: topic_mastery(
+            self.results, self.correct, self.question_cols, self.topic_mapping, self.student_col
+        ))
+
+    # Rekomendasi per topik bila ada pemetaan topik, selain itu per soal
+    @property
+    def recommendations(self):
+        if self.topics is not None:
+            return self.section('recommendations', lambda: topic_recommendations(self.topics['class_mastery']))
+        return self.section('recommendations', lambda: generate_topic_recommendations(self.difficulty_data))
+
+    @property
+    def recommendation_table(self):
+        return self.section('recommendation_table', lambda: build_recommendation_table(self.recommendations))
+
+    def similarity(self, **options):
+        from .similarity import analyze_similarity
+
+        return self.section('similarity', lambda: analyze_similarity(
+            self.df_answers, self.correct, self.question_cols, self.student_col, **options
+        ), *sorted(options.items()))
+
+    # Semua bagian sekaligus, dalam bentuk dict seperti keluaran analyze_exam
+    def to_dict(self, pass_threshold):
+        return {
+            'df_answers': self.df_answers,
+            'results': self.results,
+            'correct': self.correct,
+            'question_cols': self.question_cols,
+            'difficulty_data': self.difficulty_data,
+            'stats': self.stats,
+            'pass_rate': self.pass_rate(pass_threshold),
+            'student_results': self.student_results(pass_threshold),
+            'difficulty_df': self.difficulty_table,
+            'recom_df': self.recommendation_table,
+            'item_analysis': self.item_analysis,
+            'memory': self.memory,
+            'topics': self.topics,
+        }
+
+
+# Fungsi untuk menjalankan seluruh analisis satu ujian tanpa antarmuka.
+# Dengan topic_mapping ({soal: [topik, ...]}), rekomendasi remedial dibuat per topik.
+def analyze_exam(df_answers, df_key=None, has_key_column=False, student_col='Nama', pass_threshold=70,
+                 topic_mapping=None):
+    analysis = ExamAnalysis.from_answers(df_answers, df_key, has_key_column, student_col, topic_mapping)
+    if analysis is None:
+        return None
+    return analysis.to_dict(pass_threshold)
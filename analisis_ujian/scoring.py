@@ -0,0 +1,226 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+from .core import BLANK_CODE, POPCOUNT, EncodedAnswers, normalize_answer
+
+# Kolom file spesifikasi kunci: nama soal, kunci, bobot (opsional) dan tipe penilaian (opsional)
+KEY_SPEC_COLUMNS = ('Soal', 'Kunci', 'Bobot', 'Tipe')
+# Tipe penilaian per soal:
+#   satu    - pilihan tunggal; jawaban benar bila termasuk salah satu kunci yang diterima
+#   semua   - pilihan ganda kompleks; benar bila semua pilihan kunci dipilih tanpa pilihan lain
+#   parsial - pilihan ganda kompleks dengan nilai sebagian: (tepat - salah) / jumlah kunci, minimal 0
+SCORING_RULES = ('satu', 'semua', 'parsial')
+# Pemisah pilihan pada soal pilihan ganda kompleks (semua/parsial), misalnya "A, C" atau "A;C"
+CHOICE_SEPARATORS = re.compile(r'[,;|\s]+')
+# Pemisah beberapa kunci yang diterima pada soal pilihan tunggal, misalnya "B|D".
+# Koma, titik koma dan spasi tidak memisahkan kunci: "2,5" dan "Jawa Barat" adalah satu kunci.
+ALTERNATIVE_SEPARATOR = '|'
+# Jumlah baris siswa per blok penilaian; membatasi memori array sementara
+SCORE_BLOCK_ROWS = 32_768
+
+
+# Fungsi untuk memecah satu jawaban/kunci menjadi pilihan-pilihannya.
+# Tanpa pemisah, jawaban soal pilihan ganda kompleks dibaca per huruf ("AC" = A dan C).
+def split_choices(label, per_character=False):
+    if label is None:
+        return []
+    if CHOICE_SEPARATORS.search(label):
+        return [choice for choice in CHOICE_SEPARATORS.split(label) if choice]
+    return list(label) if per_character else [label]
+
+
+# Fungsi untuk memecah kunci soal pilihan tunggal menjadi kunci-kunci yang diterima
+def split_alternatives(label):
+    if label is None:
+        return []
+    return [choice.strip() for choice in label.split(ALTERNATIVE_SEPARATOR) if choice.strip()]
+
+
+# Spesifikasi kunci jawaban: kunci yang diterima, bobot dan tipe penilaian per soal.
+# Kunci disimpan per nama soal (sebagai teks) dalam bentuk yang sudah dinormalkan.
+class KeySpec:
+    def __init__(self, accepted, weights=None, rules=None):
+        self.accepted = {str(col): tuple(labels) for col, labels in accepted.items()}
+        self.weights = {col: 1.0 for col in self.accepted}
+        self.weights.update({str(col): float(weight) for col, weight in (weights or {}).items()})
+        self.rules = {col: 'satu' for col in self.accepted}
+        self.rules.update({str(col): rule for col, rule in (rules or {}).items()})
+
+        unknown = sorted({rule for rule in self.rules.values() if rule not in SCORING_RULES})
+        if unknown:
+            raise ValueError(f"Tipe penilaian tidak dikenal: {', '.join(unknown)}. Pilihan: {', '.join(SCORING_RULES)}")
+        if any(not np.isfinite(weight) or weight < 0 for weight in self.weights.values()):
+            raise ValueError("Bobot soal harus berupa angka tidak negatif.")
+        if self.weights and sum(self.weights.values()) == 0:
+            raise ValueError("Total bobot soal tidak boleh 0.")
+
+    # Kunci biasa {soal: jawaban}; setiap kunci dicocokkan utuh dengan jawaban siswa
+    @classmethod
+    def from_key_answers(cls, key_answers):
+        accepted = {}
+        for col, value in key_answers.items():
+            key = normalize_answer(value)
+            accepted[col] = (key,) if key is not None else ()
+        return cls(accepted)
+
+    # Tabel spesifikasi kunci dengan kolom Soal, Kunci dan opsional Bobot, Tipe
+    @classmethod
+    def from_frame(cls, df_spec):
+        df_spec = df_spec.dropna(subset=['Soal'])
+        questions = [str(col).strip() for col in df_spec['Soal']]
+        rules = {}
+        if 'Tipe' in df_spec.columns:
+            rules = {
+                col: (normalize_answer(rule) or 'SATU').lower()
+                for col, rule in zip(questions, df_spec['Tipe'])
+            }
+        weights = {}
+        if 'Bobot' in df_spec.columns:
+            weights = dict(zip(questions, pd.to_numeric(df_spec['Bobot'], errors='raise').fillna(1.0)))
+        accepted = {
+            col: tuple(
+                split_alternatives(normalize_answer(key)) if rules.get(col, 'satu') == 'satu'
+                else split_choices(normalize_answer(key), per_character=True)
+            )
+            for col, key in zip(questions, df_spec['Kunci'])
+        }
+        return cls(accepted, weights, rules)
+
+    def __len__(self):
+        return len(self.accepted)
+
+    # Kunci satu jawaban per soal, bobot 1: dinilai dengan perbandingan kode biasa
+    @property
+    def is_plain(self):
+        return all(
+            self.rules[col] == 'satu' and len(labels) == 1 and self.weights[col] == 1.0
+            for col, labels in self.accepted.items()
+        )
+
+    def check_questions(self, question_cols):
+        missing = [str(col) for col in question_cols if str(col) not in self.accepted]
+        if missing:
+            raise ValueError(f"Kunci jawaban tidak ditemukan untuk soal: {', '.join(missing)}")
+
+    def weight_vector(self, question_cols):
+        return np.array([self.weights[str(col)] for col in question_cols], dtype=np.float64)
+
+    def max_points(self, question_cols):
+        total = float(self.weight_vector(question_cols).sum())
+        if total <= 0:
+            raise ValueError("Total bobot soal yang dinilai tidak boleh 0.")
+        return total
+
+
+# Fungsi untuk mengubah kunci biasa (dict) menjadi KeySpec; KeySpec dikembalikan apa adanya
+def as_key_spec(key_answers):
+    if isinstance(key_answers, KeySpec):
+        return key_answers
+    return KeySpec.from_key_answers(key_answers)
+
+
+# Fungsi untuk mengenali tabel kunci yang berupa spesifikasi (kolom Soal dan Kunci)
+def is_key_spec_frame(df_key):
+    return df_key is not None and {'Soal', 'Kunci'} <= set(map(str, df_key.columns))
+
+
+# Fungsi untuk menentukan kolom yang dibaca dari file kunci: kolom soal pada file
+# jawaban ditambah kolom spesifikasi kunci bila file kunci berupa spesifikasi
+def key_usecols(answer_columns):
+    columns = list(answer_columns)
+    return columns + [col for col in KEY_SPEC_COLUMNS if col not in columns]
+
+
+# Fungsi untuk membuat matriks bit (baris x pilihan) dari daftar pilihan per baris
+def _choice_bits(choice_lists, choice_index):
+    incidence = np.zeros((len(choice_lists), max(len(choice_index), 1)), dtype=bool)
+    for row, choices in enumerate(choice_lists):
+        incidence[row, [choice_index[choice] for choice in choices]] = True
+    return np.packbits(incidence, axis=1)
+
+
+# Fungsi untuk menghitung nilai (0-1) setiap kombinasi (soal, kode opsi).
+# Opsi jawaban jauh lebih sedikit daripada sel jawaban, sehingga semua aturan
+# (kunci ganda, semua/parsial) cukup dievaluasi sekali pada tabel kecil ini:
+# himpunan kunci tiap soal adalah bitmask, dicocokkan dengan bitmask opsi
+# lewat AND dan popcount.
+def credit_table(options, question_cols, key_spec):
+    key_spec.check_questions(question_cols)
+    table = np.zeros((len(question_cols), len(options)), dtype=np.float32)
+    index = {label: code for code, label in enumerate(options) if label is not None}
+
+    multi = []
+    for idx, col in enumerate(question_cols):
+        col = str(col)
+        if key_spec.rules[col] == 'satu':
+            # Pilihan tunggal: opsi dicocokkan utuh dengan salah satu kunci yang diterima
+            table[idx, [index[label] for label in key_spec.accepted[col] if label in index]] = 1.0
+        else:
+            multi.append(idx)
+    if not multi:
+        return table
+
+    option_choices = [split_choices(label, per_character=True) for label in options]
+    key_choices = [key_spec.accepted[str(question_cols[idx])] for idx in multi]
+    choice_index = {
+        choice: bit for bit, choice in enumerate(sorted(
+            {choice for choices in option_choices + key_choices for choice in choices}
+        ))
+    }
+    option_bits = _choice_bits(option_choices, choice_index)
+    key_bits = _choice_bits(key_choices, choice_index)
+
+    hits = POPCOUNT[key_bits[:, np.newaxis, :] & option_bits[np.newaxis, :, :]].sum(axis=2, dtype=np.int32)
+    wrong = POPCOUNT[option_bits].sum(axis=1, dtype=np.int32)[np.newaxis, :] - hits
+    n_key = POPCOUNT[key_bits].sum(axis=1, dtype=np.int32)[:, np.newaxis]
+
+    partial = np.array([key_spec.rules[str(question_cols[idx])] == 'parsial' for idx in multi])[:, np.newaxis]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        credit = np.where(
+            partial,
+            np.clip((hits - wrong) / n_key, 0, 1),
+            (hits == n_key) & (wrong == 0),
+        )
+    table[multi] = np.nan_to_num(credit, nan=0.0)
+    # Jawaban kosong tidak pernah bernilai, termasuk pada soal dengan kunci kosong
+    table[:, BLANK_CODE] = 0.0
+    return table
+
+
+# Fungsi untuk menilai matriks jawaban terkode dalam satu lintasan per blok:
+# nilai per sel diambil dari credit_table lalu dikalikan dengan vektor bobot.
+# Hasilnya poin per siswa dan matriks bool jawaban benar penuh.
+# check_cancelled (opsional) dipanggil sebelum setiap blok dan boleh melempar exception.
+def score_encoded(encoded, key_spec, check_cancelled=None):
+    question_cols = encoded.question_cols
+    if key_spec.is_plain:
+        key_spec.check_questions(question_cols)
+        correct = encoded.match({col: key_spec.accepted[str(col)][0] for col in question_cols})
+        return correct.sum(axis=1, dtype=np.int64).astype(np.float64), correct
+
+    table = credit_table(encoded.options, question_cols, key_spec)
+    weights = key_spec.weight_vector(question_cols).astype(np.float32)
+    n_students, n_items = encoded.codes.shape
+    flat_table = table.ravel()
+    offsets = (np.arange(n_items, dtype=np.int32) * table.shape[1])[np.newaxis, :]
+
+    points = np.empty(n_students, dtype=np.float64)
+    correct = np.empty((n_students, n_items), dtype=bool)
+    for start in range(0, n_students, SCORE_BLOCK_ROWS):
+        if check_cancelled is not None:
+            check_cancelled()
+        block = slice(start, start + SCORE_BLOCK_ROWS)
+        credit = flat_table[encoded.codes[block].astype(np.int32) + offsets]
+        points[block] = credit @ weights
+        correct[block] = credit >= 1
+    return points, correct
+
+
+# Fungsi untuk menilai blok jawaban DataFrame; mengembalikan poin per siswa dan matriks benar/salah
+def score_frame(df_answers, key_answers, question_cols, check_cancelled=None):
+    encoded = EncodedAnswers.from_frame(df_answers, question_cols)
+    if check_cancelled is not None:
+        check_cancelled()
+    return score_encoded(encoded, as_key_spec(key_answers), check_cancelled)
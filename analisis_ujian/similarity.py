@@ -0,0 +1,175 @@
+# Deteksi kemiripan pola jawaban antar siswa (indikasi kerja sama/menyontek).
+#
+# Untuk setiap pasangan siswa dihitung jumlah jawaban yang sama dan jumlah
+# jawaban SALAH yang sama. Kesamaan jawaban salah dibandingkan dengan nilai
+# harapannya bila kedua siswa menjawab secara independen: pada soal yang
+# sama-sama dijawab salah, peluang keduanya memilih opsi salah yang sama adalah
+# s_t = jumlah kuadrat proporsi tiap opsi salah pada soal t. Skor Z =
+# (teramati - harapan) / sqrt(varians), dengan harapan dan varians berupa
+# jumlah Bernoulli atas soal yang sama-sama salah.
+#
+# Hitungan jawaban salah yang sama adalah perkalian matriks indikator (one-hot
+# opsi salah per soal); jumlah jawaban sama dihitung dari kode opsi (uint8) hanya
+# untuk pasangan yang lolos ambang. Matriks n x n tidak pernah dibentuk utuh: pasangan dihitung per blok
+# baris di process pool dan hanya k pasangan teratas di atas ambang yang disimpan.
+import os
+
+import numpy as np
+import pandas as pd
+
+from .core import BLANK_CODE, EncodedAnswers, correct_values
+from .pool import process_pool
+
+# Jumlah siswa per blok perkalian matriks (blok hasil berukuran blok x blok)
+SIMILARITY_BLOCK_ROWS = 1024
+# Jumlah pasangan paling mencurigakan yang disimpan
+SIMILARITY_TOP_K = 50
+# Ambang skor Z; tinggi karena jumlah pasangan yang diuji sangat banyak (n^2 / 2)
+SIMILARITY_Z_THRESHOLD = 5.0
+# Pasangan baru dilaporkan bila jumlah jawaban salah yang sama paling sedikit sebanyak ini
+SIMILARITY_MIN_SHARED_WRONG = 3
+
+# Matriks indikator milik proses pekerja; dikirim sekali lewat initializer pool
+_WORKER_MATRICES = {}
+
+
+# Fungsi untuk menyusun matriks yang dipakai pemindaian pasangan: kode opsi (uint8),
+# one-hot jawaban salah dan indikator salah per soal (float32) beserta bobot
+# harapan (s_t) dan varians (s_t * (1 - s_t)) kesamaan jawaban salah
+def similarity_matrices(codes, correct_matrix, n_options):
+    n_students, n_items = codes.shape
+    answered = codes != BLANK_CODE
+    wrong = answered & ~np.asarray(correct_matrix, dtype=bool)
+    flat = codes.astype(np.int64) + np.arange(n_items, dtype=np.int64)[np.newaxis, :] * n_options
+
+    wrong_onehot = np.zeros((n_students, n_items * n_options), dtype=np.float32)
+    rows, cols = np.nonzero(wrong)
+    wrong_onehot[rows, flat[rows, cols]] = 1
+
+    # Peluang dua jawaban salah pada soal yang sama kebetulan memilih opsi yang sama
+    wrong_counts = wrong_onehot.sum(axis=0, dtype=np.float64).reshape(n_items, n_options)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        shares = wrong_counts / wrong_counts.sum(axis=1, keepdims=True)
+    coincidence = np.nan_to_num((shares ** 2).sum(axis=1), nan=0.0)
+
+    wrong = wrong.astype(np.float32)
+    return {
+        'codes': codes,
+        'wrong_options': wrong_onehot,
+        'wrong': wrong,
+        'expected': wrong * coincidence.astype(np.float32),
+        'variance': wrong * (coincidence * (1 - coincidence)).astype(np.float32),
+    }
+
+
+# Fungsi untuk memilih maksimal top_k kandidat dengan skor Z tertinggi
+def _keep_top(candidates, top_k):
+    if len(candidates['z']) <= top_k:
+        return candidates
+    keep = np.argpartition(-candidates['z'], top_k - 1)[:top_k]
+    return {name: values[keep] for name, values in candidates.items()}
+
+
+# Fungsi untuk memindai satu pita baris [start, stop) terhadap semua siswa setelahnya,
+# blok demi blok. Mengembalikan kandidat pasangan teratas dan jumlah pasangan di atas ambang.
+def scan_band(matrices, start, stop, block_rows, top_k, z_threshold, min_shared_wrong):
+    n_students = matrices['codes'].shape[0]
+    rows = slice(start, stop)
+    found = []
+    n_flagged = 0
+    for col_start in range(start, n_students, block_rows):
+        cols = slice(col_start, min(col_start + block_rows, n_students))
+        shared_wrong = matrices['wrong_options'][rows] @ matrices['wrong_options'][cols].T
+        expected = matrices['expected'][rows] @ matrices['wrong'][cols].T
+        variance = matrices['variance'][rows] @ matrices['wrong'][cols].T
+        with np.errstate(divide='ignore', invalid='ignore'):
+            z = np.where(variance > 0, (shared_wrong - expected) / np.sqrt(variance), 0)
+
+        mask = (z >= z_threshold) & (shared_wrong >= min_shared_wrong)
+        if col_start == start:
+            # Blok diagonal: hanya pasangan (i, j) dengan i < j
+            mask &= np.triu(np.ones(mask.shape, dtype=bool), k=1)
+        row_idx, col_idx = np.nonzero(mask)
+        if not len(row_idx):
+            continue
+        n_flagged += len(row_idx)
+
+        a = row_idx + start
+        b = col_idx + col_start
+        found.append(_keep_top({
+            'a': a,
+            'b': b,
+            'agree': _count_agreement(matrices['codes'], a, b),
+            'both_wrong': np.einsum('ij,ij->i', matrices['wrong'][a], matrices['wrong'][b]),
+            'shared_wrong': shared_wrong[row_idx, col_idx],
+            'expected': expected[row_idx, col_idx],
+            'z': z[row_idx, col_idx],
+        }, top_k))
+
+    if not found:
+        return None, 0
+    merged = {name: np.concatenate([part[name] for part in found]) for name in found[0]}
+    return _keep_top(merged, top_k), n_flagged
+
+
+# Fungsi untuk menghitung jumlah soal yang dijawab (tidak kosong) sama oleh pasangan (a, b)
+def _count_agreement(codes, a, b):
+    codes_a = codes[a]
+    return ((codes_a == codes[b]) & (codes_a != BLANK_CODE)).sum(axis=1)
+
+
+def _init_worker(matrices):
+    _WORKER_MATRICES.update(matrices)
+
+
+def _scan_band_worker(*args):
+    return scan_band(_WORKER_MATRICES, *args)
+
+
+# Fungsi untuk mendeteksi pasangan siswa dengan pola jawaban (terutama jawaban salah)
+# yang identik secara mencurigakan. correct berupa CorrectMatrix dari score_answers
+# atau hasil evaluate_answers.
+def analyze_similarity(df_answers, correct, question_cols, student_col, top_k=SIMILARITY_TOP_K,
+                       z_threshold=SIMILARITY_Z_THRESHOLD, min_shared_wrong=SIMILARITY_MIN_SHARED_WRONG,
+                       block_rows=SIMILARITY_BLOCK_ROWS, max_workers=None):
+    encoded = EncodedAnswers.from_frame(df_answers, question_cols)
+    matrices = similarity_matrices(encoded.codes, correct_values(correct, question_cols), len(encoded.options))
+    n_students = len(encoded.codes)
+
+    bands = [(start, min(start + block_rows, n_students)) for start in range(0, n_students, block_rows)]
+    max_workers = min(len(bands), max_workers or os.cpu_count() or 1) if bands else 1
+    task_args = [(start, stop, block_rows, top_k, z_threshold, min_shared_wrong) for start, stop in bands]
+    if max_workers == 1:
+        scanned = [scan_band(matrices, *args) for args in task_args]
+    else:
+        # Matriks indikator dikirim sekali per proses pekerja, bukan sekali per pita
+        with process_pool(max_workers, initializer=_init_worker, initargs=(matrices,)) as executor:
+            scanned = list(executor.map(_scan_band_worker, *zip(*task_args)))
+
+    parts = [candidates for candidates, _ in scanned if candidates is not None]
+    n_flagged = sum(count for _, count in scanned)
+    columns = ['Siswa A', 'Siswa B', 'Jawaban Sama', 'Salah Bersama', 'Jawaban Salah Sama',
+               'Harapan Salah Sama', 'Skor Z']
+    if parts:
+        merged = _keep_top({name: np.concatenate([part[name] for part in parts]) for name in parts[0]}, top_k)
+        names = df_answers[student_col].astype(str).to_numpy()
+        pairs = pd.DataFrame({
+            'Siswa A': names[merged['a']],
+            'Siswa B': names[merged['b']],
+            'Jawaban Sama': merged['agree'].astype(np.int64),
+            'Salah Bersama': merged['both_wrong'].astype(np.int64),
+            'Jawaban Salah Sama': merged['shared_wrong'].astype(np.int64),
+            'Harapan Salah Sama': merged['expected'].astype(np.float64),
+            'Skor Z': merged['z'].astype(np.float64),
+        }, columns=columns).sort_values(by='Skor Z', ascending=False, ignore_index=True)
+    else:
+        pairs = pd.DataFrame(columns=columns)
+
+    return {
+        'pairs': pairs,
+        'n_students': n_students,
+        'n_pairs': n_students * (n_students - 1) // 2,
+        'n_flagged': n_flagged,
+        'z_threshold': z_threshold,
+        'min_shared_wrong': min_shared_wrong,
+    }
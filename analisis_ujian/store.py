@@ -0,0 +1,157 @@
+import os
+import sqlite3
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+from .excel import CLASS_COL
+
+# Lokasi default basis data hasil ujian, bisa diatur lewat environment variable
+DEFAULT_STORE_PATH = os.environ.get("ANALISIS_STORE_PATH", "hasil_ujian.sqlite")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS exams (
+    exam_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL,
+    class_name TEXT NOT NULL DEFAULT '',
+    exam_date TEXT NOT NULL,
+    n_students INTEGER NOT NULL,
+    n_questions INTEGER NOT NULL,
+    avg_score REAL,
+    created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE (name, class_name, exam_date)
+);
+CREATE TABLE IF NOT EXISTS student_scores (
+    exam_id INTEGER NOT NULL REFERENCES exams(exam_id) ON DELETE CASCADE,
+    student TEXT NOT NULL,
+    class_name TEXT NOT NULL DEFAULT '',
+    total_correct INTEGER NOT NULL,
+    score REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS question_stats (
+    exam_id INTEGER NOT NULL REFERENCES exams(exam_id) ON DELETE CASCADE,
+    question TEXT NOT NULL,
+    correct_rate REAL NOT NULL,
+    difficulty_level TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_exams_date ON exams (exam_date);
+CREATE INDEX IF NOT EXISTS idx_student_scores_student ON student_scores (student, exam_id);
+CREATE INDEX IF NOT EXISTS idx_student_scores_exam ON student_scores (exam_id);
+CREATE INDEX IF NOT EXISTS idx_question_stats_question ON question_stats (question, exam_id);
+CREATE INDEX IF NOT EXISTS idx_question_stats_exam ON question_stats (exam_id);
+"""
+
+
+# Penyimpanan hasil ujian lintas semester di SQLite, terindeks per siswa, soal dan ujian
+class ResultStore:
+    def __init__(self, path=DEFAULT_STORE_PATH):
+        self.path = path
+        self._conn = sqlite3.connect(path)
+        self._conn.execute("PRAGMA foreign_keys = ON")
+        self._conn.execute("PRAGMA journal_mode = WAL")
+        self._conn.executescript(SCHEMA)
+
+    def close(self):
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # Simpan satu ujian; ujian dengan nama, kelas dan tanggal yang sama akan ditimpa
+    def save_exam(self, name, results, difficulty_data, student_col, exam_date=None, class_name=''):
+        exam_date = str(exam_date or date.today().isoformat())
+        question_rows = [
+            (str(question), float(data['correct_rate']), data['difficulty_level'])
+            for question, data in difficulty_data.items()
+        ]
+        student_classes = (
+            results[CLASS_COL].astype(str).to_numpy()
+            if CLASS_COL in results.columns else np.full(len(results), class_name)
+        )
+        student_rows = zip(
+            results[student_col].astype(str).to_numpy(),
+            student_classes,
+            results['total_correct'].astype(int).tolist(),
+            results['score'].astype(float).tolist(),
+        )
+
+        with self._conn:
+            self._conn.execute(
+                "DELETE FROM exams WHERE name = ? AND class_name = ? AND exam_date = ?",
+                (name, class_name, exam_date)
+            )
+            cursor = self._conn.execute(
+                "INSERT INTO exams (name, class_name, exam_date, n_students, n_questions, avg_score) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (name, class_name, exam_date, len(results), len(question_rows), float(results['score'].mean()))
+            )
+            exam_id = cursor.lastrowid
+            self._conn.executemany(
+                "INSERT INTO student_scores (exam_id, student, class_name, total_correct, score) "
+                "VALUES (?, ?, ?, ?, ?)",
+                ((exam_id, *row) for row in student_rows)
+            )
+            self._conn.executemany(
+                "INSERT INTO question_stats (exam_id, question, correct_rate, difficulty_level) "
+                "VALUES (?, ?, ?, ?)",
+                ((exam_id, *row) for row in question_rows)
+            )
+        return exam_id
+
+    def delete_exam(self, exam_id):
+        with self._conn:
+            self._conn.execute("DELETE FROM exams WHERE exam_id = ?", (exam_id,))
+
+    def _query(self, sql, params=()):
+        return pd.read_sql_query(sql, self._conn, params=params)
+
+    # Daftar ujian yang tersimpan, terbaru di atas
+    def list_exams(self):
+        return self._query(
+            "SELECT exam_id, name, class_name, exam_date, n_students, n_questions, avg_score "
+            "FROM exams ORDER BY exam_date DESC, exam_id DESC"
+        )
+
+    def list_students(self):
+        return self._query("SELECT DISTINCT student FROM student_scores ORDER BY student")['student'].tolist()
+
+    def list_questions(self):
+        return self._query("SELECT DISTINCT question FROM question_stats ORDER BY question")['question'].tolist()
+
+    # Tren nilai seorang siswa di semua ujian yang tersimpan
+    def student_trend(self, student):
+        return self._query(
+            "SELECT e.exam_date, e.name, s.class_name, s.total_correct, s.score "
+            "FROM student_scores s JOIN exams e ON e.exam_id = s.exam_id "
+            "WHERE s.student = ? ORDER BY e.exam_date, e.exam_id",
+            (student,)
+        )
+
+    # Tren tingkat kesulitan sebuah soal di semua ujian yang tersimpan
+    def question_trend(self, question):
+        return self._query(
+            "SELECT e.exam_date, e.name, e.class_name, q.correct_rate, q.difficulty_level "
+            "FROM question_stats q JOIN exams e ON e.exam_id = q.exam_id "
+            "WHERE q.question = ? ORDER BY e.exam_date, e.exam_id",
+            (question,)
+        )
+
+    # Tabel perbandingan persentase benar per soal (baris) untuk setiap ujian (kolom)
+    def difficulty_matrix(self, exam_ids=None):
+        sql = (
+            "SELECT q.question, e.exam_date || ' ' || e.name || CASE WHEN e.class_name != '' "
+            "THEN ' (' || e.class_name || ')' ELSE '' END AS exam, q.correct_rate "
+            "FROM question_stats q JOIN exams e ON e.exam_id = q.exam_id"
+        )
+        params = ()
+        if exam_ids:
+            sql += f" WHERE q.exam_id IN ({','.join('?' * len(exam_ids))})"
+            params = tuple(exam_ids)
+        rows = self._query(sql, params)
+        if rows.empty:
+            return rows
+        return rows.pivot_table(index='question', columns='exam', values='correct_rate')
@@ -0,0 +1,126 @@
+import numpy as np
+import pandas as pd
+
+from .core import (
+    SCORE_HIST_BINS,
+    get_difficulty_level,
+    get_question_cols,
+    preprocess_data,
+    score_histogram,
+)
+from .scoring import as_key_spec, score_frame
+
+# Jumlah baris per potongan dan jumlah baris pratinjau pada mode streaming CSV
+STREAM_CHUNK_ROWS = 50_000
+STREAM_PREVIEW_ROWS = 200
+
+
+# Akumulator statistik skor yang diperbarui per potongan data
+class StreamingScoreStats:
+    def __init__(self, question_cols):
+        self.question_cols = question_cols
+        self.correct_counts = np.zeros(len(question_cols), dtype=np.int64)
+        self.n_students = 0
+        self.score_sum = 0.0
+        self.min_score = np.inf
+        self.max_score = -np.inf
+        self.score_hist = np.zeros(SCORE_HIST_BINS, dtype=np.int64)
+    
+    def update(self, correct_matrix, scores):
+        if len(scores) == 0:
+            return
+        self.correct_counts += correct_matrix.sum(axis=0, dtype=np.int64)
+        self.n_students += len(scores)
+        self.score_sum += float(scores.sum())
+        self.min_score = min(self.min_score, float(scores.min()))
+        self.max_score = max(self.max_score, float(scores.max()))
+        # Histogram halus (lebar 0,1 poin) dipakai untuk median/kuantil dan grafik
+        self.score_hist += score_histogram(scores)
+    
+    def mean(self):
+        return self.score_sum / self.n_students if self.n_students else np.nan
+    
+    def quantile(self, q):
+        if not self.n_students:
+            return np.nan
+        cumulative = np.cumsum(self.score_hist)
+        target = q * self.n_students
+        idx = int(np.searchsorted(cumulative, target))
+        idx = min(idx, SCORE_HIST_BINS - 1)
+        # Interpolasi linear di dalam bin yang memuat kuantil
+        before = cumulative[idx - 1] if idx > 0 else 0
+        within = (target - before) / self.score_hist[idx] if self.score_hist[idx] else 0.5
+        value = (idx + within) * 100 / SCORE_HIST_BINS
+        return float(np.clip(value, self.min_score, self.max_score))
+    
+    def pass_rate(self, pass_threshold):
+        if not self.n_students:
+            return np.nan
+        edge = int(np.ceil(pass_threshold * SCORE_HIST_BINS / 100))
+        return self.score_hist[edge:].sum() / self.n_students * 100
+    
+    def stats(self):
+        return {
+            'avg_score': self.mean(),
+            'median_score': self.quantile(0.5),
+            'min_score': self.min_score,
+            'max_score': self.max_score,
+        }
+    
+    def difficulty_data(self):
+        correct_rates = self.correct_counts / max(self.n_students, 1) * 100
+        return {
+            col: {
+                'correct_rate': float(rate),
+                'difficulty_level': get_difficulty_level(rate)
+            }
+            for col, rate in zip(self.question_cols, correct_rates)
+        }
+
+
+# Fungsi untuk membaca dan menilai CSV besar per potongan dengan memori terbatas
+def stream_csv_analysis(source, student_col, has_key_column, df_key=None,
+                        chunksize=STREAM_CHUNK_ROWS, preview_rows=STREAM_PREVIEW_ROWS):
+    key_answers = None
+    question_cols = None
+    accumulator = None
+    preview = []
+    student_preview = []
+    preview_count = 0
+    
+    # Semua kolom dibaca sebagai teks agar tipe data konsisten antar potongan
+    for chunk in pd.read_csv(source, chunksize=chunksize, dtype=str):
+        if key_answers is None:
+            chunk, key_answers = preprocess_data(chunk, df_key, has_key_column)
+            if not key_answers:
+                break
+            question_cols = get_question_cols(chunk, student_col)
+            key_answers = as_key_spec(key_answers)
+            max_points = key_answers.max_points(question_cols)
+            accumulator = StreamingScoreStats(question_cols)
+        
+        points, correct_matrix = score_frame(chunk, key_answers, question_cols)
+        total_correct = correct_matrix.sum(axis=1, dtype=np.int64)
+        scores = points / max_points * 100
+        accumulator.update(correct_matrix, scores)
+        
+        # Hanya sebagian kecil data yang disimpan untuk ditampilkan
+        if preview_count < preview_rows:
+            take = preview_rows - preview_count
+            preview.append(chunk.iloc[:take])
+            student_preview.append(pd.DataFrame({
+                'Nama Siswa': chunk[student_col].iloc[:take].to_numpy(),
+                'Jumlah Benar': total_correct[:take],
+                'Nilai': scores[:take],
+            }))
+            preview_count += min(take, len(chunk))
+    
+    if not key_answers:
+        return None
+    return {
+        'key_answers': key_answers,
+        'question_cols': question_cols,
+        'accumulator': accumulator,
+        'preview': pd.concat(preview, ignore_index=True) if preview else pd.DataFrame(),
+        'student_preview': pd.concat(student_preview, ignore_index=True) if student_preview else pd.DataFrame(),
+    }
@@ -0,0 +1,86 @@
+
+import numpy as np
+import pandas as pd
+
+from .excel import CLASS_COL
+
+# Profil tingkat kesulitan soal: rata-rata dan sebaran parameter kesulitan (model Rasch)
+DIFFICULTY_PROFILES = {
+    'mudah': (-1.0, 0.7),
+    'sedang': (0.0, 1.0),
+    'sulit': (1.0, 0.7),
+    'campuran': (0.0, 1.8),
+}
+OPTION_LETTERS = 'ABCDEFGHIJ'
+
+
+# Fungsi untuk membangkitkan data ujian sintetis: lembar jawaban dan kunci jawaban.
+# Peluang benar mengikuti model Rasch: sigmoid(kemampuan siswa - kesulitan soal).
+def generate_exam(n_students, n_questions, n_options=4, difficulty='sedang', blank_rate=0.02,
+                  n_classes=0, student_col='Nama', seed=0):
+    if difficulty not in DIFFICULTY_PROFILES:
+        raise ValueError(f"Profil kesulitan tidak dikenal: {difficulty}. Pilihan: {', '.join(DIFFICULTY_PROFILES)}")
+    if not 2 <= n_options <= len(OPTION_LETTERS):
+        raise ValueError(f"Jumlah opsi harus antara 2 dan {len(OPTION_LETTERS)}.")
+
+    rng = np.random.default_rng(seed)
+    options = np.array(list(OPTION_LETTERS[:n_options]), dtype=object)
+    question_cols = [f"Soal_{i}" for i in range(1, n_questions + 1)]
+
+    key_codes = rng.integers(0, n_options, size=n_questions)
+    mean, spread = DIFFICULTY_PROFILES[difficulty]
+    item_difficulty = rng.normal(mean, spread, size=n_questions)
+    ability = rng.normal(0.0, 1.0, size=n_students)
+
+    # Semua jawaban dibangkitkan sekaligus sebagai kode opsi (uint8) lalu dipetakan ke huruf
+    p_correct = 1 / (1 + np.exp(item_difficulty[np.newaxis, :] - ability[:, np.newaxis]))
+    correct = rng.random((n_students, n_questions), dtype=np.float32) < p_correct
+    # Jawaban salah: geser kunci sebanyak 1..n_options-1 sehingga tidak pernah sama dengan kunci
+    wrong_shift = rng.integers(1, n_options, size=(n_students, n_questions), dtype=np.uint8)
+    codes = np.where(correct, key_codes, (key_codes + wrong_shift) % n_options).astype(np.uint8)
+
+    answers = options[codes]
+    if blank_rate > 0:
+        answers[rng.random((n_students, n_questions), dtype=np.float32) < blank_rate] = None
+
+    df_answers = pd.DataFrame(answers, columns=question_cols)
+    df_answers.insert(0, student_col, [f"Siswa {i}" for i in range(1, n_students + 1)])
+    if n_classes:
+        class_names = np.array([f"Kelas {i}" for i in range(1, n_classes + 1)], dtype=object)
+        df_answers.insert(1, CLASS_COL, class_names[np.arange(n_students) % n_classes])
+
+    df_key = pd.DataFrame([options[key_codes]], columns=question_cols)
+    df_key.insert(0, student_col, 'KUNCI')
+    return df_answers, df_key
+
+
+# Fungsi untuk membangkitkan spesifikasi kunci (kolom Soal, Kunci, Bobot, Tipe) dari kunci
+# sintetis: sebagian soal menerima dua kunci, berbobot 1-3, atau dinilai parsial.
+def generate_key_spec(df_key, student_col='Nama', double_key_every=5, partial_every=7, seed=0):
+    rng = np.random.default_rng(seed)
+    question_cols = [col for col in df_key.columns if col not in (student_col, CLASS_COL)]
+    keys = [str(df_key[col].iloc[0]) for col in question_cols]
+    rows = []
+    for idx, (col, key) in enumerate(zip(question_cols, keys), start=1):
+        rule = 'parsial' if partial_every and idx % partial_every == 0 else 'satu'
+        if double_key_every and idx % double_key_every == 0:
+            other = OPTION_LETTERS[(OPTION_LETTERS.index(key) + 1) % len(OPTION_LETTERS)]
+            key = f"{key}|{other}" if rule == 'satu' else f"{key},{other}"
+        rows.append({'Soal': col, 'Kunci': key, 'Bobot': int(rng.integers(1, 4)), 'Tipe': rule})
+    return pd.DataFrame(rows, columns=['Soal', 'Kunci', 'Bobot', 'Tipe'])
+
+
+# Fungsi untuk menulis data sintetis ke CSV atau XLSX (ditentukan dari ekstensi).
+# Bila key_in_first_row, kunci ditulis sebagai baris pertama file jawaban.
+def write_exam(df_answers, df_key, path, key_in_first_row=True):
+    df = df_answers
+    if key_in_first_row:
+        df = pd.concat([df_key, df_answers], ignore_index=True)[df_answers.columns]
+
+    from .export import build_xlsx, write_csv
+
+    with open(path, 'wb') as f:
+        if path.lower().endswith('.xlsx'):
+            f.write(build_xlsx({'Sheet1': df}))
+        else:
+            write_csv(df, f)
@@ -0,0 +1,125 @@
+# Penguasaan topik/kompetensi per siswa dan per kelas dari pemetaan soal -> topik.
+#
+# Pemetaan disimpan sebagai matriks insidensi soal x topik (satu soal boleh
+# masuk beberapa topik). Jumlah jawaban benar per topik untuk semua siswa
+# adalah satu perkalian matriks: benar/salah (siswa x soal) @ insidensi
+# (soal x topik). Insidensi disimpan sebagai matriks sparse bila scipy tersedia,
+# sehingga biayanya mengikuti jumlah pasangan soal-topik, bukan soal x topik.
+import re
+
+import numpy as np
+import pandas as pd
+
+from .core import correct_values
+from .excel import CLASS_COL
+
+# scipy (opsional) untuk matriks insidensi sparse; tanpa scipy dipakai matriks padat
+try:
+    from scipy import sparse
+except ImportError:
+    sparse = None
+
+# Kolom file pemetaan: satu baris per soal (atau per pasangan soal-topik)
+TOPIC_MAPPING_COLUMNS = ('Soal', 'Topik')
+# Pemisah beberapa topik dalam satu sel, misalnya "Aljabar; Persamaan Linear"
+TOPIC_SEPARATORS = re.compile(r'\s*[;|]\s*')
+# Topik dengan penguasaan kelas di bawah batas ini direkomendasikan untuk remedial
+TOPIC_REMEDIAL_THRESHOLD = 50
+# Nama kolom penguasaan seluruh siswa pada tabel per kelas
+ALL_STUDENTS_COL = 'Semua Siswa'
+
+
+# Fungsi untuk membaca tabel pemetaan (kolom Soal, Topik) menjadi {soal: [topik, ...]}
+def read_topic_mapping(df_mapping):
+    missing = [col for col in TOPIC_MAPPING_COLUMNS if col not in df_mapping.columns]
+    if missing:
+        raise ValueError(f"File pemetaan topik harus memiliki kolom: {', '.join(TOPIC_MAPPING_COLUMNS)}")
+
+    topic_mapping = {}
+    for question, cell in zip(df_mapping['Soal'], df_mapping['Topik']):
+        if pd.isna(question) or pd.isna(cell):
+            continue
+        topics = topic_mapping.setdefault(str(question).strip(), [])
+        for topic in TOPIC_SEPARATORS.split(str(cell).strip()):
+            if topic and topic not in topics:
+                topics.append(topic)
+    return topic_mapping
+
+
+# Fungsi untuk menyusun matriks insidensi soal x topik (sparse CSR bila scipy tersedia)
+def topic_incidence(question_cols, topic_mapping):
+    topics = sorted({
+        topic for col in question_cols for topic in topic_mapping.get(str(col), [])
+    })
+    index = {topic: idx for idx, topic in enumerate(topics)}
+    pairs = [
+        (row, index[topic])
+        for row, col in enumerate(question_cols)
+        for topic in topic_mapping.get(str(col), [])
+    ]
+    rows = np.array([row for row, _ in pairs], dtype=np.int64)
+    cols = np.array([col for _, col in pairs], dtype=np.int64)
+    shape = (len(question_cols), len(topics))
+
+    if sparse is not None:
+        incidence = sparse.csr_matrix((np.ones(len(pairs), dtype=np.float32), (rows, cols)), shape=shape)
+    else:
+        incidence = np.zeros(shape, dtype=np.float32)
+        incidence[rows, cols] = 1
+    return incidence, topics
+
+
+# Fungsi untuk menghitung penguasaan topik (persentase soal topik yang dijawab benar).
+# correct berupa CorrectMatrix dari score_answers atau hasil evaluate_answers.
+def topic_mastery(results, correct, question_cols, topic_mapping, student_col):
+    incidence, topics = topic_incidence(question_cols, topic_mapping)
+    unmapped = [col for col in question_cols if not topic_mapping.get(str(col))]
+    if not topics:
+        raise ValueError("Tidak ada soal pada file jawaban yang cocok dengan pemetaan topik.")
+
+    # Satu perkalian matriks untuk semua siswa dan semua topik: (soal x topik)^T @ (siswa x soal)^T
+    X = correct_values(correct, question_cols).astype(np.float32)
+    topic_counts = np.asarray(incidence.T @ X.T).T
+    topic_sizes = np.asarray(incidence.sum(axis=0), dtype=np.float64).ravel()
+    mastery = (topic_counts / topic_sizes[np.newaxis, :] * 100).astype(np.float32)
+
+    id_cols = [student_col] + ([CLASS_COL] if CLASS_COL in results.columns else [])
+    student_mastery = pd.concat([
+        results[id_cols].reset_index(drop=True),
+        pd.DataFrame(mastery, columns=topics),
+    ], axis=1)
+
+    # Rata-rata penguasaan per kelas (bila ada kolom Kelas) dan untuk seluruh siswa
+    class_mastery = pd.DataFrame(index=pd.Index(topics, name='Topik'))
+    if CLASS_COL in results.columns:
+        class_means = student_mastery.groupby(CLASS_COL, sort=True)[topics].mean()
+        class_mastery = class_mastery.join(class_means.T)
+    class_mastery[ALL_STUDENTS_COL] = mastery.mean(axis=0, dtype=np.float64) if len(mastery) else np.nan
+    class_mastery['Jumlah Soal'] = topic_sizes.astype(np.int64)
+    topic_questions = {topic: [] for topic in topics}
+    for col in question_cols:
+        for topic in topic_mapping.get(str(col), []):
+            topic_questions[topic].append(str(col))
+    class_mastery['Soal'] = [', '.join(topic_questions[topic]) for topic in topics]
+
+    return {
+        'topics': topics,
+        'student_mastery': student_mastery,
+        'class_mastery': class_mastery.sort_values(by=ALL_STUDENTS_COL),
+        'unmapped': unmapped,
+    }
+
+
+# Fungsi untuk membuat rekomendasi remedial per topik dari penguasaan kelas.
+# Formatnya sama dengan generate_topic_recommendations (kolom question berisi daftar soal).
+def topic_recommendations(class_mastery, threshold=TOPIC_REMEDIAL_THRESHOLD):
+    weak = class_mastery[class_mastery[ALL_STUDENTS_COL] < threshold]
+    return [
+        {
+            'question': row['Soal'],
+            'topic': topic,
+            'correct_rate': float(row[ALL_STUDENTS_COL]),
+            'recommendation': f"Perlu review pada topik '{topic}'"
+        }
+        for topic, row in weak.iterrows()
+    ]
@@ -0,0 +1,44 @@
+# Membuat file hasil ujian sintetis (CSV atau XLSX) untuk uji coba dan benchmark.
+#
+#   python benchmarks/generate_exam.py ujian.csv --siswa 100000 --soal 50 --kesulitan campuran
+#   python benchmarks/generate_exam.py ujian.xlsx --kunci-terpisah kunci.xlsx
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from analisis_ujian.synthetic import DIFFICULTY_PROFILES, generate_exam, write_exam  # noqa: E402
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Membuat file hasil ujian sintetis.")
+    parser.add_argument('output', help="File tujuan (.csv atau .xlsx)")
+    parser.add_argument('--siswa', type=int, default=1000, help="Jumlah siswa (default: 1000)")
+    parser.add_argument('--soal', type=int, default=50, help="Jumlah soal (default: 50)")
+    parser.add_argument('--opsi', type=int, default=4, help="Jumlah opsi jawaban (default: 4)")
+    parser.add_argument('--kesulitan', choices=sorted(DIFFICULTY_PROFILES), default='sedang',
+                        help="Profil kesulitan soal (default: sedang)")
+    parser.add_argument('--kosong', type=float, default=0.02, help="Proporsi jawaban kosong (default: 0.02)")
+    parser.add_argument('--kelas', type=int, default=0, help="Jumlah kelas; menambah kolom Kelas (default: 0)")
+    parser.add_argument('--kunci-terpisah', metavar='FILE_KUNCI',
+                        help="Tulis kunci ke file terpisah, bukan sebagai baris pertama")
+    parser.add_argument('--seed', type=int, default=0, help="Seed generator acak (default: 0)")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    df_answers, df_key = generate_exam(
+        args.siswa, args.soal, args.opsi, args.kesulitan,
+        blank_rate=args.kosong, n_classes=args.kelas, seed=args.seed
+    )
+    write_exam(df_answers, df_key, args.output, key_in_first_row=args.kunci_terpisah is None)
+    if args.kunci_terpisah:
+        write_exam(df_key, df_key, args.kunci_terpisah, key_in_first_row=False)
+    print(f"{args.siswa} siswa x {args.soal} soal ditulis ke: {os.path.abspath(args.output)}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
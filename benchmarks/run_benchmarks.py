@@ -0,0 +1,254 @@
+# Benchmark pipeline analisis hasil ujian pada data sintetis berbagai ukuran.
+#
+# Setiap tahap diukur waktu (detik, minimum dari beberapa ulangan setelah satu
+# putaran pemanasan yang tidak diukur) dan puncak memori (tracemalloc, pada
+# putaran terpisah agar tidak memperlambat pengukuran waktu). Hasil ditulis
+# sebagai JSON dan dapat dibandingkan dengan baseline.
+#
+#   python benchmarks/run_benchmarks.py --skala 1000 10000 100000 1000000 --output benchmarks/baseline.json
+#   python benchmarks/run_benchmarks.py --bandingkan benchmarks/baseline.json
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+
+from analisis_ujian.charts import difficulty_figure, figure_to_png, score_distribution_figure  # noqa: E402
+from analisis_ujian.core import (  # noqa: E402
+    analyze_difficulty,
+    evaluate_answers,
+    generate_topic_recommendations,
+    get_question_cols,
+    memory_report,
+    normalize_answers,
+    preprocess_data,
+    read_table,
+    score_answers,
+    score_histogram,
+)
+from analisis_ujian.export import build_csv, build_xlsx  # noqa: E402
+from analisis_ujian.item_analysis import analyze_items  # noqa: E402
+from analisis_ujian.report import add_pass_status, build_student_table  # noqa: E402
+from analisis_ujian.streaming import stream_csv_analysis  # noqa: E402
+from analisis_ujian.scoring import KeySpec  # noqa: E402
+from analisis_ujian.similarity import analyze_similarity  # noqa: E402
+from analisis_ujian.synthetic import DIFFICULTY_PROFILES, generate_exam, generate_key_spec, write_exam  # noqa: E402
+
+STUDENT_COL = 'Nama'
+PASS_THRESHOLD = 70
+
+
+# Fungsi untuk menyusun daftar tahap benchmark. Setiap tahap menerima dan
+# mengisi dict ctx sehingga tahap berikutnya memakai keluaran tahap sebelumnya.
+def build_stages(workdir, include_xlsx, include_similarity):
+    csv_path = os.path.join(workdir, 'ujian.csv')
+    xlsx_path = os.path.join(workdir, 'ujian.xlsx')
+
+    def read_bytes(path):
+        with open(path, 'rb') as f:
+            return f.read()
+
+    stages = [
+        ('generate_exam', lambda ctx: ctx.update(zip(
+            ('df_answers', 'df_key'),
+            generate_exam(ctx['n_students'], ctx['n_questions'], ctx['n_options'], ctx['difficulty'])
+        ))),
+        ('write_csv', lambda ctx: write_exam(ctx['df_answers'], ctx['df_key'], csv_path)),
+        ('read_table_csv', lambda ctx: ctx.update(raw=read_table(read_bytes(csv_path), csv_path))),
+    ]
+    if include_xlsx:
+        stages += [
+            ('write_xlsx', lambda ctx: write_exam(ctx['df_answers'], ctx['df_key'], xlsx_path)),
+            ('read_table_xlsx', lambda ctx: read_table(read_bytes(xlsx_path), xlsx_path, key_in_first_row=True)),
+        ]
+    stages += [
+        ('normalize_answers', lambda ctx: ctx.update(raw=normalize_answers(ctx['raw']))),
+        ('preprocess_data', lambda ctx: ctx.update(zip(
+            ('answers', 'key_answers'), preprocess_data(ctx['raw'], None, True)
+        ))),
+        ('evaluate_answers', lambda ctx: ctx.update(
+            results=evaluate_answers(ctx['answers'], ctx['key_answers'], STUDENT_COL),
+            question_cols=get_question_cols(ctx['answers'], STUDENT_COL),
+        )),
+        ('score_answers', lambda ctx: ctx.update(zip(
+            ('results', 'correct'), score_answers(ctx['answers'], ctx['key_answers'], STUDENT_COL)
+        ))),
+        # Kunci ganda, bobot dan nilai parsial: dibandingkan dengan score_answers (kunci biasa)
+        ('score_answers_key_spec', lambda ctx: score_answers(
+            ctx['answers'], KeySpec.from_frame(generate_key_spec(ctx['df_key'])), STUDENT_COL
+        )),
+        ('memory_report', lambda ctx: memory_report(ctx['answers'], ctx['correct'], ctx['question_cols'])),
+        ('analyze_difficulty', lambda ctx: ctx.update(
+            difficulty_data=analyze_difficulty(ctx['correct'], ctx['question_cols'])
+        )),
+        ('generate_topic_recommendations', lambda ctx: generate_topic_recommendations(ctx['difficulty_data'])),
+        ('analyze_items', lambda ctx: analyze_items(
+            ctx['correct'], ctx['question_cols'], ctx['answers'], ctx['key_answers']
+        )),
+    ]
+    if include_similarity:
+        stages.append(('analyze_similarity', lambda ctx: analyze_similarity(
+            ctx['answers'], ctx['correct'], ctx['question_cols'], STUDENT_COL
+        )))
+    stages += [
+        ('student_table', lambda ctx: ctx.update(student_results=add_pass_status(
+            build_student_table(ctx['results'], STUDENT_COL), PASS_THRESHOLD
+        ))),
+        ('chart_distribution', lambda ctx: figure_to_png(
+            score_distribution_figure(score_histogram(ctx['results']['score']), PASS_THRESHOLD)
+        )),
+        ('chart_difficulty', lambda ctx: figure_to_png(difficulty_figure(ctx['difficulty_data']))),
+        ('export_csv', lambda ctx: build_csv(ctx['student_results'])),
+    ]
+    if include_xlsx:
+        stages.append(('export_xlsx', lambda ctx: build_xlsx({'hasil_siswa': ctx['student_results']})))
+    stages.append(('stream_csv_analysis', lambda ctx: stream_csv_analysis(csv_path, STUDENT_COL, True)))
+    return stages
+
+
+# Fungsi untuk menjalankan semua tahap sekali; mengembalikan {tahap: detik atau MB puncak}.
+# Dengan warmup, semua tahap lebih dulu dijalankan sekali tanpa diukur (impor malas,
+# alokasi pertama pustaka, file sementara), sehingga --ulang 1 tidak mengukur biaya awal.
+def run_pipeline(stages, params, measure_memory, warmup=False):
+    if warmup:
+        run_pipeline(stages, params, measure_memory=False)
+    ctx = dict(params)
+    measurements = {}
+    for name, stage in stages:
+        if measure_memory:
+            tracemalloc.start()
+            stage(ctx)
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            measurements[name] = peak / 1024 ** 2
+        else:
+            start = time.perf_counter()
+            stage(ctx)
+            measurements[name] = time.perf_counter() - start
+    return measurements
+
+
+# Fungsi untuk menjalankan benchmark satu skala data
+def benchmark_scale(n_students, args):
+    params = {
+        'n_students': n_students,
+        'n_questions': args.soal,
+        'n_options': args.opsi,
+        'difficulty': args.kesulitan,
+    }
+    include_xlsx = n_students <= args.maks_xlsx
+    include_similarity = n_students <= args.maks_kemiripan
+    with tempfile.TemporaryDirectory() as workdir:
+        stages = build_stages(workdir, include_xlsx, include_similarity)
+        timings = [
+            run_pipeline(stages, params, measure_memory=False, warmup=(repeat == 0))
+            for repeat in range(args.ulang)
+        ]
+        peaks = run_pipeline(stages, params, measure_memory=True) if not args.tanpa_memori else {}
+
+    return [
+        {
+            'n_students': n_students,
+            'n_questions': args.soal,
+            'stage': name,
+            'seconds': round(min(timing[name] for timing in timings), 6),
+            'peak_mb': round(peaks[name], 3) if name in peaks else None,
+        }
+        for name, _ in stages
+    ]
+
+
+# Fungsi untuk membandingkan hasil dengan baseline; mengembalikan daftar tahap yang melambat
+def find_regressions(results, baseline, tolerance, min_seconds):
+    previous = {(row['n_students'], row['n_questions'], row['stage']): row for row in baseline['results']}
+    regressions = []
+    for row in results:
+        before = previous.get((row['n_students'], row['n_questions'], row['stage']))
+        if before is None or before['seconds'] < min_seconds:
+            continue
+        ratio = row['seconds'] / before['seconds']
+        if ratio > 1 + tolerance:
+            regressions.append((row, before, ratio))
+    return regressions
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Benchmark pipeline analisis hasil ujian pada data sintetis.")
+    parser.add_argument('--skala', type=int, nargs='+', default=[1_000, 10_000, 100_000],
+                        help="Jumlah siswa per skala (default: 1000 10000 100000; tambahkan 1000000 untuk skala penuh)")
+    parser.add_argument('--soal', type=int, default=50, help="Jumlah soal (default: 50)")
+    parser.add_argument('--opsi', type=int, default=4, help="Jumlah opsi jawaban (default: 4)")
+    parser.add_argument('--kesulitan', choices=sorted(DIFFICULTY_PROFILES), default='sedang',
+                        help="Profil kesulitan soal (default: sedang)")
+    parser.add_argument('--ulang', type=int, default=3, help="Jumlah ulangan pengukuran waktu; diambil yang tercepat (default: 3)")
+    parser.add_argument('--maks-xlsx', type=int, default=20_000,
+                        help="Tahap XLSX hanya dijalankan sampai jumlah siswa ini (default: 20000)")
+    parser.add_argument('--maks-kemiripan', type=int, default=10_000,
+                        help="Tahap deteksi kemiripan (berpasangan, O(n^2)) hanya dijalankan sampai jumlah siswa ini (default: 10000)")
+    parser.add_argument('--tanpa-memori', action='store_true', help="Lewati pengukuran memori (tracemalloc)")
+    parser.add_argument('--output', '-o', help="Simpan hasil sebagai JSON ke file ini")
+    parser.add_argument('--bandingkan', metavar='BASELINE', help="Bandingkan hasil dengan file baseline JSON")
+    parser.add_argument('--toleransi', type=float, default=0.25,
+                        help="Perlambatan relatif yang masih diterima saat membandingkan (default: 0.25)")
+    parser.add_argument('--min-detik', type=float, default=0.05,
+                        help="Tahap yang di baseline lebih cepat dari ini tidak dibandingkan (default: 0.05)")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+
+    results = []
+    for n_students in args.skala:
+        rows = benchmark_scale(n_students, args)
+        results.extend(rows)
+        for row in rows:
+            peak = f"{row['peak_mb']:10.1f} MB" if row['peak_mb'] is not None else ''
+            print(f"{n_students:>9} siswa  {row['stage']:<32}{row['seconds']:10.4f} s{peak}")
+
+    report = {
+        'created_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'environment': {
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'pandas': pd.__version__,
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+        },
+        'parameters': {
+            'n_questions': args.soal,
+            'n_options': args.opsi,
+            'difficulty': args.kesulitan,
+            'repeats': args.ulang,
+        },
+        'results': results,
+    }
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Hasil ditulis ke: {os.path.abspath(args.output)}")
+
+    if args.bandingkan:
+        with open(args.bandingkan) as f:
+            baseline = json.load(f)
+        regressions = find_regressions(results, baseline, args.toleransi, args.min_detik)
+        for row, before, ratio in regressions:
+            print(f"MELAMBAT: {row['n_students']} siswa {row['stage']}: "
+                  f"{before['seconds']:.4f} s -> {row['seconds']:.4f} s ({ratio:.2f}x)", file=sys.stderr)
+        if regressions:
+            return 1
+        print("Tidak ada tahap yang melambat dibanding baseline.")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,11 +1,51 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
 import io
+import os
+import functools
+import hashlib
+import uuid
 from io import BytesIO
-import base64 
+
+from analisis_ujian.core import (
+    generate_topic_recommendations,
+    normalize_answers,
+    preprocess_data,
+    read_table,
+    score_answers,
+)
+from analisis_ujian.batch import compare_difficulty, expand_batch_files, run_batch
+from analisis_ujian.cache import AnalysisCache
+from analisis_ujian.diagnostics import Diagnostics, configure_logging, diagnostics_enabled_by_default
+from analisis_ujian.charts import (
+    CHART_DPI,
+    class_heatmap_figure,
+    difficulty_figure,
+    figure_to_png,
+    score_distribution_figure,
+)
+from analisis_ujian.export import (
+    MIME_CSV,
+    MIME_XLSX,
+    MIME_ZIP,
+    PARQUET_AVAILABLE,
+    build_csv,
+    build_parquet_bundle,
+    build_xlsx,
+)
+from analisis_ujian.jobs import STATUS_CANCELLED, STATUS_DONE, STATUS_FAILED, JobManager
+from analisis_ujian.report import (
+    ExamAnalysis,
+    add_pass_status,
+    build_difficulty_table,
+    build_recommendation_table,
+    format_memory_report,
+)
+from analisis_ujian.scoring import key_usecols
+from analisis_ujian.store import DEFAULT_STORE_PATH, ResultStore
+from analisis_ujian.streaming import stream_csv_analysis
+from analisis_ujian.topics import read_topic_mapping
 
 # Set page config
 st.set_page_config(
@@ -52,114 +92,971 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-# Fungsi untuk download dataframe sebagai CSV
-def download_link(df, filename, text):
-    csv = df.to_csv(index=False)
-    b64 = base64.b64encode(csv.encode()).decode()
-    href = f'<a href="data:file/csv;base64,{b64}" download="{filename}">{text}</a>'
-    return href
-
-# Fungsi untuk preprocessing data
-def preprocess_data(df_answers, df_key=None, has_key_column=False):
-    # Jika key ada dalam dataframe jawaban siswa (kolom pertama)
-    if has_key_column and df_key is None:
-        key_row = df_answers.iloc[0].copy()
-        df_answers = df_answers.iloc[1:].copy()
-        # Konversi key_row menjadi DataFrame untuk format yang konsisten
-        df_key = pd.DataFrame([key_row.values], columns=key_row.index)
-    
-    # Bersihkan nama kolom jika diperlukan
-    if df_key is not None:
-        # Pastikan kolom pertama adalah nama siswa
-        student_col = df_answers.columns[0]
-        question_cols = [col for col in df_answers.columns if col != student_col]
+# Fungsi untuk tombol unduh. Isi file baru dibangun ketika tombol diklik,
+# bukan pada setiap rerun halaman.
+def download_button(label, build_file, file_name, mime):
+    diagnostics = get_diagnostics()
+    if diagnostics.enabled:
+        # File dibangun saat tombol diklik (di luar jalannya skrip); waktunya hanya tercatat di log
+        build = build_file
+        def build_file():
+            with diagnostics.stage(f'download:{file_name}'):
+                return build()
+    st.download_button(
+        label, data=build_file, file_name=file_name, mime=mime,
+        key=f"download:{file_name}", on_click='ignore'
+    )
+
+# Fungsi untuk tombol unduh dataframe sebagai CSV
+def download_csv(df, file_name, label):
+    download_button(label, lambda: build_csv(df), file_name, MIME_CSV)
+
+# Fungsi untuk tombol unduh beberapa tabel sekaligus (XLSX multi-sheet dan Parquet)
+def download_bundle(tables, base_name):
+    download_button(
+        'Download Semua Tabel (XLSX)', lambda: build_xlsx(tables), f'{base_name}.xlsx', MIME_XLSX
+    )
+    if PARQUET_AVAILABLE:
+        download_button(
+            'Download Semua Tabel (Parquet, .zip)', lambda: build_parquet_bundle(tables),
+            f'{base_name}_parquet.zip', MIME_ZIP
+        )
+
+# Batas memori cache analisis bersama untuk seluruh sesi (MB), bisa diatur lewat environment variable
+CACHE_MAX_MB = float(os.environ.get("ANALISIS_CACHE_MB", "1024"))
+
+# Fungsi untuk mengambil cache analisis bersama. Satu objek per proses server,
+# dipakai semua sesi sehingga unggahan yang sama dianalisis sekali saja.
+@st.cache_resource
+def get_analysis_cache():
+    return AnalysisCache(int(CACHE_MAX_MB * 1024 * 1024))
+
+# Penanda hasil pekerjaan yang sudah dibuang dari cache bersama
+_EVICTED = object()
+# Jumlah thread pekerja analisis latar belakang dan jeda pemeriksaan kemajuan (detik)
+JOB_WORKERS = int(os.environ.get("ANALISIS_JOB_WORKERS", "2"))
+JOB_POLL_SECONDS = 0.5
+# Label tahap pekerjaan analisis pada indikator kemajuan
+JOB_STAGE_LABELS = {
+    'parse': 'Membaca file',
+    'score': 'Penilaian',
+}
+
+# Fungsi untuk mengambil id sesi ini; pembatalan pekerjaan bersama dicatat per sesi
+def get_session_id():
+    return st.session_state.setdefault('session_id', uuid.uuid4().hex)
+
+# Fungsi untuk mengambil pengelola pekerjaan latar belakang (satu per proses server).
+# Pekerjaan disimpan per id, sehingga rerun halaman mengambil hasil yang sudah ada.
+@st.cache_resource
+def get_job_manager():
+    return JobManager(max_workers=JOB_WORKERS)
+
+# Diagnostik nonaktif dipakai di luar main() (misalnya saat fungsi dipanggil dari tes)
+DISABLED_DIAGNOSTICS = Diagnostics(enabled=False)
+
+# Fungsi untuk mengambil pencatat diagnostik untuk jalannya skrip saat ini
+def get_diagnostics():
+    return st.session_state.get('diagnostics', DISABLED_DIAGNOSTICS)
+
+# Dekorator untuk mencatat waktu render sebuah bagian laporan pada panel diagnostik
+def instrumented(func):
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with get_diagnostics().stage(f"render:{func.__name__.removeprefix('render_')}"):
+            return func(*args, **kwargs)
+    return wrapper
+
+# Fungsi untuk menampilkan panel diagnostik: waktu, memori dan ukuran data per tahap
+def render_diagnostics_panel(diagnostics):
+    st.markdown(f"**Total waktu tahap**: {diagnostics.total_seconds():.3f} detik")
+    cache_stats = get_analysis_cache().stats()
+    st.markdown(
+        f"**Cache bersama**: {cache_stats['entries']} entri, "
+        f"{cache_stats['total_bytes'] / 1024 ** 2:.1f} / {cache_stats['max_bytes'] / 1024 ** 2:.0f} MB; "
+        f"hit {cache_stats['hits']}, miss {cache_stats['misses']}, menunggu sesi lain {cache_stats['shared']}"
+    )
+    job_stats = get_job_manager().stats()
+    if job_stats:
+        st.markdown("**Pekerjaan latar belakang**: " + ", ".join(f"{count} {status}" for status, count in sorted(job_stats.items())))
+    if diagnostics.records:
+        records = pd.DataFrame(diagnostics.records)
+        records['stage'] = ['↳ ' * depth + stage for depth, stage in zip(records['depth'], records['stage'])]
+        st.dataframe(records.drop(columns='depth'), use_container_width=True, hide_index=True)
+    st.download_button(
+        'Download Diagnostik (JSON)', data=diagnostics.to_json(), file_name='diagnostik.json',
+        mime='application/json', key='download:diagnostik.json', on_click='ignore'
+    )
+
+# Fungsi untuk membuat hash dari isi file dan pengaturan yang mempengaruhi hasil
+def content_hash(*parts):
+    digest = hashlib.sha256()
+    for part in parts:
+        if part is None:
+            part = b"\x00"
+        elif not isinstance(part, bytes):
+            part = repr(part).encode()
+        digest.update(len(part).to_bytes(8, "little"))
+        digest.update(part)
+    return digest.hexdigest()
+
+# Fungsi untuk menjalankan satu tahap pipeline analisis.
+# Kunci tahap diturunkan dari kunci tahap-tahap inputnya, sehingga tahap
+# hanya dihitung ulang bila salah satu inputnya berubah.
+# Bila sesi lain sedang menghitung tahap yang sama, hasilnya ditunggu (status 'shared').
+# Tahap yang berjalan di pekerjaan latar belakang mencatat ke diagnostics milik pekerjaan itu.
+def run_stage(cache, name, inputs, compute, diagnostics=None):
+    stage_key = content_hash(name, *inputs)
+    with (diagnostics or get_diagnostics()).stage(name) as record:
+        value, status = cache.get_or_compute(stage_key, compute)
+        if record is not None:
+            record['cache'] = status
+        Diagnostics.set_shape(record, value)
+    return stage_key, value
+
+# Fungsi untuk mendapatkan hash isi file unggahan (dihitung sekali per unggahan)
+def file_digest(uploaded_file):
+    if uploaded_file is None:
+        return None
+    file_id = getattr(uploaded_file, 'file_id', None)
+    digests = st.session_state.setdefault('file_digests', {})
+    if file_id is not None and file_id in digests:
+        return digests[file_id]
+    digest = content_hash(uploaded_file.getvalue(), uploaded_file.name)
+    if file_id is not None:
+        digests[file_id] = digest
+    return digest
+
+# Fungsi untuk mengambil PNG grafik dari cache. Figure hanya dibangun bila
+# kombinasi (jenis grafik, hash data, pengaturan, ukuran) belum pernah dirender.
+def chart_png(name, inputs, build_figure, diagnostics=None):
+    _, png = run_stage(
+        get_analysis_cache(), f'chart:{name}', list(inputs) + [CHART_DPI],
+        lambda: figure_to_png(build_figure()), diagnostics
+    )
+    return png
+
+# Fungsi untuk menampilkan grafik dari cache PNG
+@instrumented
+def show_chart(name, inputs, build_figure):
+    st.image(chart_png(name, inputs, build_figure), use_container_width=True)
+
+# Fungsi untuk membuat heatmap penguasaan topik terlemah (tabel sudah terurut naik);
+# ratusan topik tidak terbaca dalam satu grafik
+def topic_heatmap_figure(class_mastery):
+    mastery_cols = [col for col in class_mastery.columns if col not in ('Jumlah Soal', 'Soal')]
+    return class_heatmap_figure(
+        class_mastery.head(TOPIC_HEATMAP_ROWS), mastery_cols,
+        xlabel='Kelas', ylabel='Topik', value_label='Penguasaan Topik (%)'
+    )
+
+# Fungsi untuk menilai jawaban. Bagian laporan lain diturunkan belakangan, saat dibuka.
+def score_stage(df_answers, key_answers, student_col, check_cancelled=None):
+    if not key_answers:
+        return None
+    results, correct = score_answers(df_answers, key_answers, student_col, check_cancelled)
+    return {'results': results, 'correct': correct}
+
+# Fungsi untuk menyusun tahap-tahap pekerjaan analisis latar belakang: parse
+# (jawaban, kunci, pemetaan topik) dan score. Hanya dua tahap ini yang dibutuhkan
+# untuk tampilan pertama; bagian laporan lain dihitung oleh ExamAnalysis saat dibuka.
+# Di dalamnya setiap sub-tahap memakai cache bersama, sehingga pekerjaan baru
+# hanya menghitung ulang bagian yang inputnya berubah. Fungsi ini dipanggil di
+# thread skrip; tahap-tahapnya berjalan di thread pekerja dan tidak memanggil st.*.
+# Hasil tahap hanya berupa kunci cache: data tetap berada di cache bersama (dan
+# dibatasi ANALISIS_CACHE_MB), bukan ditahan oleh pekerjaan yang sudah selesai.
+def analysis_job_stages(uploaded_file, key_file, student_col, has_key_column, topic_file, diagnostics):
+    cache = get_analysis_cache()
+    answers_digest, key_digest, topics_digest = (file_digest(f) for f in (uploaded_file, key_file, topic_file))
+    stage = functools.partial(run_stage, cache, diagnostics=diagnostics)
+    # Data antar tahap selama pekerjaan berjalan; dilepas bersama fungsi tahap setelah selesai
+    parsed = {}
+    
+    def parse(_, check_cancelled):
+        answers_key, raw_answers = stage(
+            'parse_answers', [answers_digest, has_key_column],
+            lambda: normalize_answers(read_table(
+                uploaded_file.getvalue(), uploaded_file.name, key_in_first_row=has_key_column,
+                check_cancelled=check_cancelled
+            ))
+        )
+        check_cancelled()
+        # Dari file kunci hanya kolom yang juga ada di file jawaban (atau kolom spesifikasi kunci) yang dikonversi
+        df_key_key, df_key = stage(
+            'parse_key', [key_digest, answers_key],
+            lambda: read_table(
+                key_file.getvalue(), key_file.name, usecols=key_usecols(raw_answers.columns), all_sheets=False
+            ) if key_file is not None else None
+        )
+        check_cancelled()
+        preprocess_key, (df_answers, key_answers) = stage(
+            'preprocess', [answers_key, df_key_key, has_key_column],
+            lambda: preprocess_data(raw_answers, df_key, has_key_column)
+        )
+        topics_key, topic_mapping = stage(
+            'parse_topics', [topics_digest],
+            lambda: read_topic_mapping(
+                read_table(topic_file.getvalue(), topic_file.name, all_sheets=False)
+            ) if topic_file is not None else None
+        )
+        parsed.update(df_answers=df_answers, key_answers=key_answers)
+        return {
+            'answers_key': answers_key,
+            'df_key_key': df_key_key,
+            'preprocess_key': preprocess_key,
+            'topics_key': topics_key,
+        }
+    
+    def score(results, check_cancelled):
+        score_key, _ = stage(
+            'score', [results['parse']['preprocess_key'], student_col],
+            lambda: score_stage(parsed['df_answers'], parsed['key_answers'], student_col, check_cancelled)
+        )
+        return {'score_key': score_key}
+    
+    return [('parse', parse), ('score', score)]
+
+# Fungsi untuk mengirim (atau mengambil kembali) pekerjaan analisis satu file.
+# Id pekerjaan adalah hash isi file dan pengaturan, sehingga rerun halaman dan sesi lain
+# dengan input yang sama memakai pekerjaan yang sama. Sesi ini dicatat sebagai
+# penonton pekerjaan, kecuali sesi ini sudah membatalkannya.
+def submit_analysis_job(uploaded_file, key_file, student_col, has_key_column, topic_file, restart=False):
+    jobs = get_job_manager()
+    job_id = content_hash(
+        'analysis', file_digest(uploaded_file), file_digest(key_file), file_digest(topic_file),
+        student_col, has_key_column
+    )
+    job = jobs.get(job_id)
+    if job is None or restart:
+        session_diagnostics = get_diagnostics()
+        diagnostics = Diagnostics(enabled=session_diagnostics.enabled, trace_memory=session_diagnostics.trace_memory)
+        stages = analysis_job_stages(uploaded_file, key_file, student_col, has_key_column, topic_file, diagnostics)
+        job = jobs.submit(job_id, stages, restart=restart, diagnostics=diagnostics)
+    
+    left_jobs = st.session_state.setdefault('left_jobs', set())
+    if restart:
+        left_jobs.discard(job_id)
+    if job_id not in left_jobs:
+        job.subscribe(get_session_id())
+    return job
+
+# Fungsi untuk mengambil hasil tahap-tahap yang sudah selesai dari cache bersama
+# menjadi satu dict analisis. Mengembalikan None bila ada hasil yang sudah dibuang
+# dari cache; pekerjaan lalu perlu dijalankan ulang.
+def job_analysis(job, completed):
+    cache = get_analysis_cache()
+    keys = {}
+    for name in completed:
+        keys.update(job.results[name])
+    values = {name: cache.get(key, _EVICTED) for name, key in keys.items()}
+    if any(value is _EVICTED for value in values.values()):
+        return None
+    
+    analysis = dict(keys)
+    if 'answers_key' in values:
+        analysis['raw_answers'] = values['answers_key']
+        analysis['df_key'] = values['df_key_key']
+        analysis['df_answers'], analysis['key_answers'] = values['preprocess_key']
+        analysis['topic_mapping'] = values['topics_key']
+    if 'score_key' in values:
+        analysis['scored'] = values['score_key']
+    return analysis
+
+# Fungsi untuk membuat memo bagian laporan: setiap bagian disimpan di cache bersama
+# dengan kunci laporan (hash hasil penilaian dan pemetaan topik) dan input bagian itu
+def report_memo(report_key, diagnostics=None):
+    cache = get_analysis_cache()
+    
+    def memo(name, inputs, compute):
+        return run_stage(cache, f'report:{name}', [report_key] + inputs, compute, diagnostics)[1]
+    
+    return memo
+
+# Fungsi untuk membuat objek hasil analisis dari hasil penilaian. Bagian laporan
+# dihitung saat pertama kali dibuka dan disimpan di cache bersama.
+def build_exam_analysis(analysis, student_col):
+    report_key = content_hash(analysis['score_key'], analysis['topics_key'])
+    scored = analysis['scored']
+    report = ExamAnalysis(
+        analysis['df_answers'], analysis['key_answers'], scored['results'], scored['correct'],
+        student_col, analysis['topic_mapping'], memo=report_memo(report_key)
+    )
+    return report, report_key
+
+# Fungsi untuk menampilkan kemajuan pekerjaan per tahap beserta tombol batal
+def render_job_progress(job):
+    progress = job.progress()
+    st.progress(progress, text=f"Analisis {job.status}: {progress * 100:.0f}%")
+    st.caption(" · ".join(
+        f"{JOB_STAGE_LABELS.get(name, name)}: {stage['status']}"
+        + (f" ({stage['seconds']:.1f} dtk)" if stage['seconds'] is not None else "")
+        for name, stage in job.stages.items()
+    ))
+    left_jobs = st.session_state.setdefault('left_jobs', set())
+    if job.finished or job.id in left_jobs:
+        return
+    if st.button("Batalkan analisis", key=f"cancel:{job.id}", disabled=job.cancel_requested):
+        # Pekerjaan dipakai bersama sesi lain dengan input yang sama; pekerjaan baru
+        # dihentikan bila tidak ada sesi lain yang masih menampilkannya
+        get_job_manager().cancel(job.id, get_session_id())
+        left_jobs.add(job.id)
+        st.rerun()
+
+# Fungsi untuk menyiapkan satu bagian laporan lewat pekerjaan latar belakang, agar
+# perhitungan berat (analisis butir, kemiripan, render grafik) tidak berjalan di thread
+# skrip. Id pekerjaan adalah hash (laporan, bagian, input), sehingga rerun dan sesi lain
+# memakai pekerjaan yang sama. prepare(laporan, diagnostik) menghitung isi bagian lewat
+# memo laporan (tersimpan di cache bersama) dan merender grafiknya ke PNG.
+# Mengembalikan True bila bagian siap dirender dari cache; selama belum siap,
+# kemajuan (atau kesalahan) pekerjaannya yang ditampilkan.
+def section_job_ready(report, report_key, section, prepare, *inputs):
+    jobs = get_job_manager()
+    job_id = content_hash('report', report_key, section, *inputs)
+    left_jobs = st.session_state.setdefault('left_jobs', set())
+    
+    def submit(restart=False):
+        session_diagnostics = get_diagnostics()
+        diagnostics = Diagnostics(enabled=session_diagnostics.enabled, trace_memory=session_diagnostics.trace_memory)
+        # Salinan laporan dengan pencatat diagnostik pekerjaan (thread pekerja tidak punya sesi)
+        job_report = report.with_memo(report_memo(report_key, diagnostics))
+        
+        # Hasil bagian hanya disimpan di cache bersama, tidak ditahan oleh pekerjaan
+        def run(results, check_cancelled):
+            prepare(job_report, diagnostics)
+        
+        return jobs.submit(job_id, [(section, run)], restart=restart, diagnostics=diagnostics)
+    
+    job = jobs.get(job_id) or submit()
+    if job_id not in left_jobs:
+        job.subscribe(get_session_id())
+    if job.diagnostics is not None:
+        get_diagnostics().records.extend(job.diagnostics.records)
+    if job.status == STATUS_DONE:
+        return True
+    
+    left_job = job_id in left_jobs and not job.finished
+    if not job.finished and not left_job:
+        poll_analysis_job(job.id, 0)
+        return False
+    render_job_progress(job)
+    if job.status == STATUS_FAILED:
+        st.error(f"Terjadi kesalahan: {job.error}")
+    else:
+        st.warning("Perhitungan bagian ini dibatalkan.")
+    if st.button("Hitung ulang", key=f"restart:{job_id}"):
+        left_jobs.discard(job_id)
+        submit(restart=True)
+        st.rerun()
+    return False
+
+# Fragment yang memeriksa kemajuan pekerjaan secara berkala tanpa menjalankan ulang
+# seluruh halaman. Halaman penuh baru dirender ulang ketika ada tahap baru yang selesai,
+# sehingga hasil parsial langsung tampil.
+@st.fragment(run_every=JOB_POLL_SECONDS)
+def poll_analysis_job(job_id, shown_stages):
+    job = get_job_manager().get(job_id)
+    if job is None:
+        return
+    render_job_progress(job)
+    if job.finished or len(job.completed_stages()) != shown_stages:
+        st.rerun()
+
+# Fungsi untuk menjalankan analisis streaming dengan cache berdasarkan hash file
+def load_stream_analysis(uploaded_file, key_file, student_col, has_key_column):
+    cache = get_analysis_cache()
+    
+    def compute():
+        df_key = None
+        if key_file is not None:
+            df_key = pd.read_csv(BytesIO(key_file.getvalue()), dtype=str)
+        uploaded_file.seek(0)
+        return stream_csv_analysis(uploaded_file, student_col, has_key_column, df_key)
+    
+    _, streamed = run_stage(
+        cache, 'stream_csv',
+        [file_digest(uploaded_file), file_digest(key_file), student_col, has_key_column],
+        compute
+    )
+    return streamed
+
+# Fungsi untuk menampilkan laporan dari hasil analisis streaming
+@instrumented
+def render_streaming_report(streamed, pass_threshold):
+    accumulator = streamed['accumulator']
+    
+    st.markdown('<div class="sub-header">Data Hasil Ujian (Pratinjau)</div>', unsafe_allow_html=True)
+    st.caption(f"Menampilkan {len(streamed['preview'])} dari {accumulator.n_students} baris siswa.")
+    st.dataframe(streamed['preview'], use_container_width=True)
+    
+    st.markdown('<div class="sub-header">Hasil Analisis</div>', unsafe_allow_html=True)
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        render_score_stats(accumulator.stats(), accumulator.pass_rate(pass_threshold), pass_threshold)
+        st.caption("Nilai tengah dihitung secara aproksimasi (resolusi 0,1 poin).")
+        
+        # Grafik distribusi nilai dari bin yang sudah diakumulasi
+        st.markdown("### Distribusi Nilai")
+        show_chart(
+            'distribution', [content_hash(accumulator.score_hist.tobytes()), pass_threshold],
+            lambda: score_distribution_figure(accumulator.score_hist, pass_threshold)
+        )
+    
+    with col2:
+        difficulty_data = accumulator.difficulty_data()
+        # Jumlah benar per soal saja tidak cukup sebagai kunci: persentase dan label soal
+        # juga bergantung pada jumlah siswa dan nama kolom soal
+        difficulty_key = content_hash(
+            accumulator.correct_counts.tobytes(), accumulator.n_students, tuple(streamed['question_cols'])
+        )
+        difficulty_df = render_difficulty_section(difficulty_data, difficulty_key)
+    
+    recommendations, recom_df = render_recommendations(
+        generate_topic_recommendations(difficulty_data), len(streamed['question_cols'])
+    )
+    
+    st.markdown('<div class="sub-header">Hasil Per Siswa (Pratinjau)</div>', unsafe_allow_html=True)
+    student_preview = add_pass_status(streamed['student_preview'], pass_threshold)
+    st.dataframe(style_status(student_preview), use_container_width=True)
+    
+    st.markdown('<div class="sub-header">Download Hasil Analisis</div>', unsafe_allow_html=True)
+    download_csv(difficulty_df, 'analisis_soal.csv', 'Download Analisis Soal (CSV)')
+    report_tables = {'analisis_soal': difficulty_df}
+    if recommendations:
+        download_csv(recom_df, 'rekomendasi_remedial.csv', 'Download Rekomendasi Remedial (CSV)')
+        report_tables['rekomendasi_remedial'] = recom_df
+    download_bundle(report_tables, 'hasil_analisis')
+
+# Fungsi untuk menjalankan analisis batch dengan progres per file dan cache hasil
+def load_batch_analysis(batch_files, key_file, student_col, has_key_column):
+    cache = get_analysis_cache()
+    
+    def compute():
+        sources = expand_batch_files([(f.name, f.getvalue()) for f in batch_files])
+        if not sources:
+            return []
+        key_name = key_file.name if key_file is not None else None
+        key_data = key_file.getvalue() if key_file is not None else None
         
-        # Ekstrak kunci jawaban
-        key_answers = {}
-        for col in question_cols:
-            key_answers[col] = df_key[col].iloc[0]
-    
-    return df_answers, key_answers if df_key is not None else None
-
-# Fungsi untuk menilai jawaban
-def evaluate_answers(df_answers, key_answers, student_col):
-    question_cols = [col for col in df_answers.columns if col != student_col]
-    
-    # Inisialisasi dataframe hasil
-    results = pd.DataFrame(index=df_answers.index)
-    results[student_col] = df_answers[student_col]
-    
-    # Hitung jawaban benar/salah
-    for col in question_cols:
-        results[f"{col}_correct"] = (df_answers[col] == key_answers[col]).astype(int)
-    
-    # Hitung nilai total siswa
-    score_columns = [col for col in results.columns if col.endswith('_correct')]
-    results['total_correct'] = results[score_columns].sum(axis=1)
-    results['score'] = (results['total_correct'] / len(question_cols)) * 100
-    
-    return results
-
-# Fungsi untuk menganalisis kesulitan soal
-def analyze_difficulty(results, question_cols):
-    difficulty = {}
-    for col in question_cols:
-        col_result = f"{col}_correct"
-        if col_result in results.columns:
-            correct_rate = results[col_result].mean() * 100
-            difficulty[col] = {
-                'correct_rate': correct_rate,
-                'difficulty_level': get_difficulty_level(correct_rate)
-            }
-    return difficulty
-
-# Fungsi untuk menentukan level kesulitan
-def get_difficulty_level(correct_rate):
-    if correct_rate < 30:
-        return "Sangat Sulit"
-    elif correct_rate < 50:
-        return "Sulit"
-    elif correct_rate < 70:
-        return "Sedang"
-    elif correct_rate < 90:
-        return "Mudah"
+        # Progres ditampilkan setiap kali satu file selesai dianalisis
+        progress = st.progress(0.0, text=f"Menganalisis {len(sources)} file...")
+        reports = []
+        for report in run_batch(sources, student_col, has_key_column, key_name, key_data):
+            reports.append(report)
+            progress.progress(
+                len(reports) / len(sources),
+                text=f"Selesai: {report['name']} ({len(reports)}/{len(sources)})"
+            )
+        progress.empty()
+        return sorted(reports, key=lambda report: report['name'])
+    
+    # Kunci tahap ikut dikembalikan sebagai kunci tabel per file (tanpa hash ulang isi tabel)
+    return run_stage(
+        cache, 'batch',
+        [tuple(file_digest(f) for f in batch_files), file_digest(key_file), student_col, has_key_column],
+        compute
+    )
+
+# Fungsi untuk menampilkan laporan per file dan perbandingan antar kelas
+@instrumented
+def render_batch_report(reports, pass_threshold, batch_key):
+    failed = [report for report in reports if report['error'] is not None]
+    succeeded = [report for report in reports if report['error'] is None]
+    
+    for report in failed:
+        st.error(f"{report['name']}: {report['error']}")
+    if not succeeded:
+        st.warning("Tidak ada file yang berhasil dianalisis.")
+        return
+    
+    # Ringkasan nilai per file
+    st.markdown('<div class="sub-header">Ringkasan Batch</div>', unsafe_allow_html=True)
+    summary_df = pd.DataFrame([
+        {
+            'File': report['name'],
+            'Jumlah Siswa': report['n_students'],
+            'Nilai Rata-rata': report['stats']['avg_score'],
+            'Nilai Tengah': report['stats']['median_score'],
+            'Nilai Minimum': report['stats']['min_score'],
+            'Nilai Maksimum': report['stats']['max_score'],
+            'Persentase Kelulusan': report['student_table']['Nilai'].ge(pass_threshold).mean() * 100,
+        }
+        for report in succeeded
+    ])
+    st.dataframe(summary_df, use_container_width=True)
+    
+    # Perbandingan tingkat kesulitan soal antar kelas
+    st.markdown('<div class="sub-header">Perbandingan Kesulitan Soal Antar Kelas</div>', unsafe_allow_html=True)
+    comparison = compare_difficulty(succeeded)
+    st.dataframe(comparison.round(2), use_container_width=True)
+    
+    file_cols = [report['name'] for report in succeeded]
+    show_chart(
+        'class_heatmap', [content_hash(comparison[file_cols].to_numpy().tobytes(), file_cols, list(comparison.index))],
+        lambda: class_heatmap_figure(comparison, file_cols)
+    )
+    
+    download_csv(summary_df, 'ringkasan_batch.csv', 'Download Ringkasan Batch (CSV)')
+    download_csv(comparison.reset_index(), 'perbandingan_soal.csv', 'Download Perbandingan Soal (CSV)')
+    download_bundle(
+        {'ringkasan_batch': summary_df, 'perbandingan_soal': comparison.reset_index()}, 'hasil_batch'
+    )
+    
+    # Laporan lengkap per file
+    st.markdown('<div class="sub-header">Laporan Per File</div>', unsafe_allow_html=True)
+    for report in succeeded:
+        with st.expander(f"{report['name']} ({report['n_students']} siswa)"):
+            student_results = add_pass_status(report['student_table'], pass_threshold)
+            pass_rate = (student_results['Status'] == 'Lulus').mean() * 100
+            render_score_stats(report['stats'], pass_rate, pass_threshold)
+            
+            difficulty_df = build_difficulty_table(report['difficulty_data'])
+            st.dataframe(difficulty_df, use_container_width=True)
+            render_paged_table(
+                student_results, key=f"batch:{report['name']}",
+                table_key=content_hash(batch_key, report['name'], pass_threshold), status_col='Status'
+            )
+            
+            base_name = os.path.splitext(report['name'])[0].replace('/', '_')
+            download_csv(student_results, f'hasil_siswa_{base_name}.csv', 'Download Hasil Per Siswa (CSV)')
+            download_csv(difficulty_df, f'analisis_soal_{base_name}.csv', 'Download Analisis Soal (CSV)')
+
+# Keterangan format file kunci, termasuk spesifikasi kunci berbobot/parsial
+KEY_FILE_HELP = (
+    "Satu baris kunci dengan kolom yang sama seperti file jawaban, atau spesifikasi kunci "
+    "dengan kolom Soal, Kunci, Bobot dan Tipe (satu/semua/parsial). Pada spesifikasi kunci, "
+    "beberapa kunci yang diterima untuk soal tipe satu dipisah dengan |, misalnya B|D."
+)
+# Keterangan format file pemetaan soal ke topik/kompetensi
+TOPIC_FILE_HELP = (
+    "Tabel dengan kolom Soal dan Topik. Satu soal boleh masuk beberapa topik, "
+    "ditulis dengan pemisah ; atau |, atau dalam beberapa baris."
+)
+# Jumlah topik terlemah yang ditampilkan pada heatmap penguasaan topik
+TOPIC_HEATMAP_ROWS = 60
+# Bagian laporan satu ujian. Hanya bagian yang sedang dibuka yang dihitung dan dirender;
+# bagian pertama (hanya butuh hasil penilaian) tampil lebih dulu.
+REPORT_SECTIONS = (
+    "Hasil Per Siswa",
+    "Statistik Kelas",
+    "Kesulitan Soal",
+    "Rekomendasi Remedial",
+    "Penguasaan Topik",
+    "Analisis Butir",
+    "Kemiripan Jawaban",
+    "Download",
+)
+# Pilihan jumlah baris per halaman untuk tabel besar
+TABLE_PAGE_SIZES = (25, 50, 100, 500)
+# Warna latar baris berdasarkan status kelulusan
+STATUS_STYLES = {'Lulus': 'background-color: #E8F5E9', 'Tidak Lulus': 'background-color: #FFEBEE'}
+
+# Fungsi untuk mewarnai baris berdasarkan status. Warna dihitung sekali sebagai
+# mask vektor untuk seluruh halaman, bukan lewat callback Python per baris.
+def style_status(page, status_col='Status'):
+    passed = (page[status_col] == 'Lulus').to_numpy()
+    css = np.where(passed, STATUS_STYLES['Lulus'], STATUS_STYLES['Tidak Lulus'])
+    styles = pd.DataFrame(
+        np.repeat(css[:, np.newaxis], page.shape[1], axis=1), index=page.index, columns=page.columns
+    )
+    return page.style.apply(lambda _: styles, axis=None)
+
+# Fungsi untuk memfilter dan mengurutkan tabel di sisi server; hasilnya posisi baris
+def query_table(df, search='', search_cols=(), status=None, status_col='Status', sort_by=None, ascending=True):
+    mask = np.ones(len(df), dtype=bool)
+    if search:
+        found = np.zeros(len(df), dtype=bool)
+        for col in search_cols:
+            found |= df[col].astype(str).str.contains(search, case=False, regex=False).to_numpy()
+        mask &= found
+    if status:
+        mask &= df[status_col].isin(status).to_numpy()
+    
+    positions = np.flatnonzero(mask)
+    if sort_by is not None and len(positions):
+        values = df[sort_by].iloc[positions]
+        order = np.argsort(values.to_numpy(), kind='stable') if values.dtype.kind in 'iufb' \
+            else np.argsort(values.astype(str).to_numpy(), kind='stable')
+        if not ascending:
+            order = order[::-1]
+        positions = positions[order]
+    return positions
+
+# Fungsi untuk menampilkan tabel besar per halaman. Filter, urutan dan potongan
+# halaman dihitung di server; hanya baris halaman aktif yang dikirim ke browser.
+@instrumented
+def render_paged_table(df, key, table_key=None, search_cols=None, status_col=None):
+    if search_cols is None:
+        search_cols = [col for col in df.columns[:2] if not pd.api.types.is_numeric_dtype(df[col])]
+    
+    col_search, col_sort, col_order, col_size = st.columns([3, 2, 1, 1])
+    search = col_search.text_input("Cari", key=f"{key}:search", placeholder="Ketik untuk memfilter...")
+    sort_options = ['(urutan asli)'] + [str(col) for col in df.columns]
+    sort_label = col_sort.selectbox("Urutkan berdasarkan", sort_options, key=f"{key}:sort")
+    ascending = col_order.selectbox("Arah", ("Naik", "Turun"), key=f"{key}:order") == "Naik"
+    page_size = col_size.selectbox("Baris", TABLE_PAGE_SIZES, index=1, key=f"{key}:size")
+    
+    status = None
+    if status_col is not None:
+        status = st.multiselect("Status", sorted(STATUS_STYLES), key=f"{key}:status")
+    
+    sort_by = None
+    if sort_label != '(urutan asli)':
+        sort_by = df.columns[sort_options.index(sort_label) - 1]
+    
+    # Posisi baris hasil filter/urutan disimpan di cache agar pindah halaman instan
+    if table_key is None:
+        table_key = content_hash(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    _, positions = run_stage(
+        get_analysis_cache(), 'table_query',
+        [table_key, search, tuple(search_cols), tuple(status or ()), status_col, str(sort_by), ascending],
+        lambda: query_table(df, search, search_cols, status, status_col, sort_by, ascending)
+    )
+    
+    n_rows = len(positions)
+    n_pages = max(1, -(-n_rows // page_size))
+    page_key = f"{key}:page"
+    if st.session_state.get(page_key, 1) > n_pages:
+        st.session_state[page_key] = n_pages
+    page = st.number_input("Halaman", min_value=1, max_value=n_pages, step=1, key=page_key)
+    
+    start = (page - 1) * page_size
+    page_df = df.iloc[positions[start:start + page_size]]
+    st.caption(f"Menampilkan baris {min(start + 1, n_rows)}–{min(start + page_size, n_rows)} dari {n_rows} (total {len(df)}).")
+    
+    if status_col is not None and len(page_df):
+        st.dataframe(style_status(page_df, status_col), use_container_width=True)
+    else:
+        st.dataframe(page_df, use_container_width=True)
+
+# Fungsi untuk menampilkan kartu statistik nilai kelas
+@instrumented
+def render_score_stats(stats, pass_rate, pass_threshold):
+    st.markdown('<div class="insight-card">', unsafe_allow_html=True)
+    st.markdown(f"### Statistik Nilai Kelas")
+    st.markdown(f"**Nilai Rata-rata**: {stats['avg_score']:.2f}")
+    st.markdown(f"**Nilai Tengah**: {stats['median_score']:.2f}")
+    st.markdown(f"**Nilai Minimum**: {stats['min_score']:.2f}")
+    st.markdown(f"**Nilai Maksimum**: {stats['max_score']:.2f}")
+    st.markdown(f"**Persentase Kelulusan**: {pass_rate:.2f}% (Batas {pass_threshold})")
+    st.markdown('</div>', unsafe_allow_html=True)
+
+# Fungsi untuk menampilkan tabel dan grafik tingkat kesulitan soal
+@instrumented
+def render_difficulty_section(difficulty_data, data_key=None, difficulty_df=None):
+    # Soal tersulit
+    st.markdown("### Analisis Tingkat Kesulitan Soal")
+    
+    if difficulty_df is None:
+        difficulty_df = build_difficulty_table(difficulty_data)
+    
+    # Tampilkan tabel
+    st.dataframe(difficulty_df, use_container_width=True)
+    
+    # Grafik tingkat kesulitan soal
+    st.markdown("### Grafik Tingkat Kesulitan Soal")
+    if data_key is None:
+        data_key = content_hash(sorted((str(q), data['correct_rate']) for q, data in difficulty_data.items()))
+    show_chart('difficulty', [data_key], lambda: difficulty_figure(difficulty_data))
+    
+    return difficulty_df
+
+# Fungsi untuk menampilkan rekomendasi topik remedial beserta kesimpulannya.
+# unit 'topik' dipakai untuk rekomendasi per topik (dari pemetaan soal → topik).
+@instrumented
+def render_recommendations(recommendations, total_questions, unit='soal'):
+    st.markdown('<div class="sub-header">Rekomendasi Topik Remedial</div>', unsafe_allow_html=True)
+    if unit == 'topik':
+        shown_cols = ['topic', 'question', 'correct_rate', 'recommendation']
     else:
-        return "Sangat Mudah"
+        shown_cols = ['question', 'correct_rate', 'recommendation']
+    recom_df = None
+    
+    if recommendations:
+        recom_df = build_recommendation_table(recommendations)
+        st.dataframe(recom_df[shown_cols], use_container_width=True)
+        
+        st.markdown('<div class="insight-card">', unsafe_allow_html=True)
+        st.markdown("### Kesimpulan AI")
+        
+        # Hitung jumlah topik yang perlu remedial
+        remedial_count = len(recommendations)
+        remedial_percentage = (remedial_count / total_questions) * 100
+        
+        if remedial_percentage > 50:
+            st.markdown(f"<p><span class='highlight'>⚠️ {remedial_percentage:.1f}% {unit} memiliki tingkat keberhasilan rendah.</span> Sebaiknya lakukan remedial komprehensif untuk materi pada bab ini.</p>", unsafe_allow_html=True)
+        elif remedial_percentage > 30:
+            st.markdown(f"<p><span class='highlight'>⚠️ {remedial_percentage:.1f}% {unit} memiliki tingkat keberhasilan rendah.</span> Fokus pada topik-topik yang diidentifikasi di atas untuk remedial.</p>", unsafe_allow_html=True)
+        elif remedial_percentage > 0:
+            st.markdown(f"<p>🔍 {remedial_percentage:.1f}% {unit} memiliki tingkat keberhasilan rendah. Berikan penekanan lebih pada topik-topik tersebut pada pertemuan berikutnya.</p>", unsafe_allow_html=True)
+        else:
+            st.markdown(f"<p><span class='success'>✅ Semua {unit} memiliki tingkat keberhasilan yang baik.</span> Lanjutkan ke materi berikutnya.</p>", unsafe_allow_html=True)
         
-# Fungsi mengambil status
-def highlight_status(row):
-    if row['Status'] == 'Lulus':
-        return ['background-color: #E8F5E9'] * len(row)
+        st.markdown('</div>', unsafe_allow_html=True)
     else:
-        return ['background-color: #FFEBEE'] * len(row)
-
-# Fungsi untuk membuat rekomendasi topik
-def generate_topic_recommendations(difficulty_data, topic_mapping=None):
-    recommendations = []
-    
-    # Jika tidak ada pemetaan topik, gunakan soal secara langsung
-    if topic_mapping is None:
-        topic_mapping = {q: f"Materi pada {q}" for q in difficulty_data.keys()}
-    
-    for question, data in difficulty_data.items():
-        if data['correct_rate'] < 50:
-            if question in topic_mapping:
-                topic = topic_mapping[question]
-                recommendations.append({
-                    'question': question,
-                    'topic': topic,
-                    'correct_rate': data['correct_rate'],
-                    'recommendation': f"Perlu review pada topik '{topic}'"
-                })
-            else:
-                recommendations.append({
-                    'question': question,
-                    'topic': f"Materi pada {question}",
-                    'correct_rate': data['correct_rate'],
-                    'recommendation': f"Perlu review pada materi di {question}"
-                })
+        st.markdown('<div class="insight-card">', unsafe_allow_html=True)
+        st.markdown("<p><span class='success'>✅ Tidak ada topik yang perlu remedial. Siswa telah menguasai semua materi dengan baik.</span></p>", unsafe_allow_html=True)
+        st.markdown('</div>', unsafe_allow_html=True)
+    
+    return recommendations, recom_df
+
+# Fungsi untuk menampilkan penguasaan topik per kelas dan per siswa
+@instrumented
+def render_topic_mastery(topics, topics_key):
+    st.markdown('<div class="sub-header">Penguasaan Topik</div>', unsafe_allow_html=True)
+    if topics['unmapped']:
+        st.warning(f"{len(topics['unmapped'])} soal tidak memiliki topik: {', '.join(map(str, topics['unmapped']))}")
+    
+    class_mastery = topics['class_mastery']
+    st.dataframe(class_mastery.round(2), use_container_width=True)
+    
+    if len(class_mastery) > TOPIC_HEATMAP_ROWS:
+        st.caption(f"Grafik menampilkan {TOPIC_HEATMAP_ROWS} topik dengan penguasaan terendah.")
+    show_chart('topic_heatmap', [topics_key, TOPIC_HEATMAP_ROWS], lambda: topic_heatmap_figure(class_mastery))
     
-    return recommendations
+    with st.expander("Penguasaan topik per siswa"):
+        student_mastery = topics['student_mastery']
+        render_paged_table(student_mastery.round(1), key='topic_students', table_key=topics_key)
+        download_csv(student_mastery, 'penguasaan_topik_siswa.csv', 'Download Penguasaan Topik Per Siswa (CSV)')
+    download_csv(class_mastery.reset_index(), 'penguasaan_topik_kelas.csv', 'Download Penguasaan Topik Kelas (CSV)')
+
+# Fungsi untuk menampilkan analisis butir soal: reliabilitas, daya beda dan distraktor
+@instrumented
+def render_item_analysis(item_result):
+    st.markdown('<div class="sub-header">Analisis Butir Soal</div>', unsafe_allow_html=True)
+    reliability = item_result['reliability']
+    
+    st.markdown('<div class="insight-card">', unsafe_allow_html=True)
+    st.markdown("### Reliabilitas Tes")
+    st.markdown(f"**KR-20 / Cronbach's Alpha**: {reliability['kr20']:.3f}")
+    st.markdown(f"**Standard Error of Measurement**: {reliability['sem']:.2f} (skor mentah)")
+    st.markdown(f"**Jumlah Soal / Siswa**: {reliability['n_items']} / {reliability['n_students']}")
+    st.markdown('</div>', unsafe_allow_html=True)
+    
+    items = item_result['items']
+    st.markdown("### Statistik Butir")
+    st.dataframe(items.round(3), use_container_width=True)
+    download_csv(items, 'analisis_butir.csv', 'Download Analisis Butir (CSV)')
+    
+    distractors = item_result['distractors']
+    if distractors is not None:
+        with st.expander("Tabel Distraktor (sebaran pilihan jawaban per soal)"):
+            render_paged_table(distractors.round(2), key='distractors', search_cols=['Soal', 'Keterangan'])
+            download_csv(distractors, 'analisis_distraktor.csv', 'Download Analisis Distraktor (CSV)')
+
+# Fungsi untuk menampilkan pasangan siswa dengan jawaban salah identik yang mencurigakan.
+# Perhitungan pasangan mahal untuk kelas besar, sehingga baru dijalankan (di latar belakang) bila diminta.
+@instrumented
+def render_similarity(report, report_key):
+    st.markdown('<div class="sub-header">Deteksi Kemiripan Jawaban</div>', unsafe_allow_html=True)
+    if not st.checkbox(
+        "Hitung kemiripan jawaban antar siswa", key="similarity:run",
+        help="Membandingkan semua pasangan siswa dan menandai pasangan yang memiliki terlalu banyak jawaban salah yang sama."
+    ):
+        return
+    if not section_job_ready(report, report_key, "Kemiripan Jawaban", lambda job_report, _: job_report.similarity()):
+        return
+    
+    similarity = report.similarity()
+    st.markdown(
+        f"**{similarity['n_flagged']}** dari {similarity['n_pairs']} pasangan siswa memiliki jawaban salah yang sama "
+        f"jauh di atas harapan (Skor Z ≥ {similarity['z_threshold']:g}, minimal {similarity['min_shared_wrong']} soal)."
+    )
+    pairs = similarity['pairs']
+    if pairs.empty:
+        st.success("Tidak ada pasangan dengan pola jawaban yang mencurigakan.")
+        return
+    st.caption("Skor Z tinggi adalah indikasi statistik, bukan bukti; periksa kembali lembar jawaban dan posisi duduk.")
+    st.dataframe(pairs.round(2), use_container_width=True)
+    download_csv(pairs, 'kemiripan_jawaban.csv', 'Download Kemiripan Jawaban (CSV)')
+
+# Fungsi untuk menyimpan hasil analisis saat ini ke riwayat ujian (SQLite)
+def render_save_exam(results, difficulty_data, student_col, default_name):
+    st.markdown('<div class="sub-header">Simpan ke Riwayat Ujian</div>', unsafe_allow_html=True)
+    with st.form("save_exam"):
+        col1, col2, col3 = st.columns(3)
+        exam_name = col1.text_input("Nama ujian", default_name)
+        class_name = col2.text_input("Kelas (opsional)", "")
+        exam_date = col3.date_input("Tanggal ujian")
+        submitted = st.form_submit_button("Simpan")
+    
+    if submitted:
+        if not exam_name.strip():
+            st.warning("Nama ujian wajib diisi.")
+            return
+        with ResultStore(DEFAULT_STORE_PATH) as store:
+            store.save_exam(
+                exam_name.strip(), results, difficulty_data, student_col,
+                exam_date=exam_date.isoformat(), class_name=class_name.strip()
+            )
+        st.success(f"Hasil ujian '{exam_name}' tersimpan. Buka menu Riwayat Ujian untuk melihat tren.")
+
+# Fungsi untuk menampilkan laporan satu ujian dari objek ExamAnalysis. Bagian dipilih
+# lewat kontrol seperti tab; bagian yang tidak dibuka tidak dihitung sama sekali.
+# exam_name diisi bila hasil boleh disimpan ke riwayat ujian.
+@instrumented
+def render_report(report, pass_threshold, report_key, exam_name=None, key_prefix='report'):
+    sections = [
+        section for section in REPORT_SECTIONS
+        if section != "Penguasaan Topik" or report.topic_mapping is not None
+    ]
+    section = st.segmented_control(
+        "Bagian laporan", sections, default=sections[0], key=f"{key_prefix}:section"
+    ) or sections[0]
+    
+    if section == "Hasil Per Siswa":
+        if not section_job_ready(
+            report, report_key, section, lambda job_report, _: job_report.student_results(pass_threshold), pass_threshold
+        ):
+            return
+        st.markdown('<div class="sub-header">Hasil Per Siswa</div>', unsafe_allow_html=True)
+        student_results = report.student_results(pass_threshold)
+        render_paged_table(
+            student_results, key=f'{key_prefix}:student_results',
+            table_key=content_hash(report_key, pass_threshold), status_col='Status'
+        )
+        download_csv(student_results, 'hasil_siswa.csv', 'Download Hasil Per Siswa (CSV)')
+    
+    elif section == "Statistik Kelas":
+        def prepare(job_report, diagnostics):
+            job_report.prepare('memory', 'stats')
+            job_report.pass_rate(pass_threshold)
+            chart_png(
+                'distribution', [report_key, pass_threshold],
+                lambda: score_distribution_figure(job_report.score_hist, pass_threshold), diagnostics
+            )
+        
+        if not section_job_ready(report, report_key, section, prepare, pass_threshold):
+            return
+        st.caption(f"Memori jawaban (kode opsi 1 byte, benar/salah 1 bit): {format_memory_report(report.memory)}")
+        render_score_stats(report.stats, report.pass_rate(pass_threshold), pass_threshold)
+        
+        # Grafik distribusi nilai
+        st.markdown("### Distribusi Nilai")
+        show_chart(
+            'distribution', [report_key, pass_threshold],
+            lambda: score_distribution_figure(report.score_hist, pass_threshold)
+        )
+    
+    elif section == "Kesulitan Soal":
+        def prepare(job_report, diagnostics):
+            job_report.prepare('difficulty_table')
+            chart_png('difficulty', [report_key], lambda: difficulty_figure(job_report.difficulty_data), diagnostics)
+        
+        if not section_job_ready(report, report_key, section, prepare):
+            return
+        render_difficulty_section(report.difficulty_data, report_key, report.difficulty_table)
+    
+    elif section == "Rekomendasi Remedial":
+        if not section_job_ready(report, report_key, section, lambda job_report, _: job_report.prepare('recommendation_table')):
+            return
+        if report.topics is not None:
+            render_recommendations(report.recommendations, len(report.topics['topics']), unit='topik')
+        else:
+            render_recommendations(report.recommendations, len(report.question_cols))
+    
+    elif section == "Penguasaan Topik":
+        def prepare(job_report, diagnostics):
+            chart_png(
+                'topic_heatmap', [report_key, TOPIC_HEATMAP_ROWS],
+                lambda: topic_heatmap_figure(job_report.topics['class_mastery']), diagnostics
+            )
+        
+        if not section_job_ready(report, report_key, section, prepare):
+            return
+        render_topic_mastery(report.topics, report_key)
+    
+    elif section == "Analisis Butir":
+        if not section_job_ready(report, report_key, section, lambda job_report, _: job_report.prepare('item_analysis')):
+            return
+        render_item_analysis(report.item_analysis)
+    
+    elif section == "Kemiripan Jawaban":
+        render_similarity(report, report_key)
+    
+    elif section == "Download":
+        def prepare(job_report, _):
+            job_report.student_results(pass_threshold)
+            job_report.prepare('difficulty_table', 'recommendation_table', 'topics')
+        
+        if not section_job_ready(report, report_key, section, prepare, pass_threshold):
+            return
+        st.markdown('<div class="sub-header">Download Hasil Analisis</div>', unsafe_allow_html=True)
+        student_results = report.student_results(pass_threshold)
+        difficulty_df = report.difficulty_table
+        recommendations = report.recommendations
+        
+        download_csv(student_results, 'hasil_siswa.csv', 'Download Hasil Per Siswa (CSV)')
+        download_csv(difficulty_df, 'analisis_soal.csv', 'Download Analisis Soal (CSV)')
+        if recommendations:
+            download_csv(report.recommendation_table, 'rekomendasi_remedial.csv', 'Download Rekomendasi Remedial (CSV)')
+        
+        # Semua tabel dalam satu file
+        report_tables = {'hasil_siswa': student_results, 'analisis_soal': difficulty_df}
+        if recommendations:
+            report_tables['rekomendasi_remedial'] = report.recommendation_table
+        if report.topics is not None:
+            report_tables['penguasaan_topik_kelas'] = report.topics['class_mastery'].reset_index()
+            report_tables['penguasaan_topik_siswa'] = report.topics['student_mastery']
+        download_bundle(report_tables, 'hasil_analisis')
+        
+        # Simpan ke riwayat untuk analisis lintas ujian
+        if exam_name is not None:
+            render_save_exam(report.results, report.difficulty_data, report.student_col, exam_name)
+
+# Fungsi untuk menampilkan riwayat ujian: tren nilai siswa dan tren kesulitan soal
+@instrumented
+def render_history():
+    st.markdown('<div class="sub-header">Riwayat Ujian</div>', unsafe_allow_html=True)
+    with ResultStore(DEFAULT_STORE_PATH) as store:
+        exams = store.list_exams()
+        if exams.empty:
+            st.info("Belum ada ujian tersimpan. Analisis file hasil ujian lalu klik Simpan pada bagian Simpan ke Riwayat Ujian.")
+            return
+        
+        st.markdown("### Ujian Tersimpan")
+        st.dataframe(exams.round(2), use_container_width=True)
+        
+        col1, col2 = st.columns(2)
+        with col1:
+            st.markdown("### Tren Nilai Siswa")
+            student = st.selectbox("Pilih siswa", store.list_students(), key="history:student")
+            if student is not None:
+                trend = store.student_trend(student)
+                st.line_chart(trend, x='exam_date', y='score')
+                st.dataframe(trend, use_container_width=True)
+        
+        with col2:
+            st.markdown("### Tren Kesulitan Soal")
+            question = st.selectbox("Pilih soal", store.list_questions(), key="history:question")
+            if question is not None:
+                trend = store.question_trend(question)
+                st.line_chart(trend, x='exam_date', y='correct_rate')
+                st.dataframe(trend.round(2), use_container_width=True)
+        
+        st.markdown("### Persentase Benar per Soal Antar Ujian")
+        matrix = store.difficulty_matrix()
+    st.dataframe(matrix.round(2), use_container_width=True)
+    download_csv(matrix.reset_index(), 'riwayat_kesulitan_soal.csv', 'Download Riwayat Kesulitan Soal (CSV)')
+
+# Data contoh untuk panduan dan demo; baris pertama adalah kunci jawaban
+EXAMPLE_DATA = {
+    'Nama': ['KUNCI', 'Siswa 1', 'Siswa 2', 'Siswa 3', 'Siswa 4', 'Siswa 5'],
+    'Soal 1': ['A', 'A', 'B', 'A', 'C', 'A'],
+    'Soal 2': ['B', 'B', 'B', 'A', 'B', 'C'],
+    'Soal 3': ['C', 'C', 'A', 'C', 'B', 'C'],
+    'Soal 4': ['A', 'D', 'A', 'A', 'A', 'B'],
+    'Soal 5': ['D', 'D', 'D', 'C', 'D', 'D']
+}
+DEMO_PASS_THRESHOLD = 70
+DEMO_REPORT_KEY = content_hash('demo', EXAMPLE_DATA)
+
+# Fungsi untuk menganalisis data contoh. Dihitung sekali per proses server
+# (saat aplikasi pertama kali dibuka) lalu dipakai bersama oleh semua sesi.
+# Bagian laporan lain dihitung saat dibuka, sama seperti analisis file unggahan.
+@st.cache_resource
+def get_demo_analysis():
+    return ExamAnalysis.from_answers(pd.DataFrame(EXAMPLE_DATA), None, True, 'Nama', memo=report_memo(DEMO_REPORT_KEY))
 
 # Halaman Utama
 def main():
@@ -180,14 +1077,20 @@ def main():
         # Pilihan cara input data
         input_method = st.radio(
             "Pilih cara input data:",
-            ("Unggah File Excel", "Unggah File CSV", "Input Manual (Coming Soon)")
+            ("Unggah File Excel", "Unggah File CSV", "Batch (Banyak File)", "Riwayat Ujian", "Input Manual (Coming Soon)")
         )
         
         uploaded_file = None
         key_file = None
+        topic_file = None
+        streaming_mode = False
+        batch_files = None
         
         if input_method == "Unggah File Excel":
-            uploaded_file = st.file_uploader("Unggah file hasil ujian (.xlsx)", type=["xlsx"])
+            uploaded_file = st.file_uploader(
+                "Unggah file hasil ujian (.xlsx)", type=["xlsx"],
+                help="Workbook boleh berisi beberapa sheet; setiap sheet dianggap satu kelas."
+            )
             
             # Opsi untuk kunci jawaban
             key_option = st.radio(
@@ -196,12 +1099,20 @@ def main():
             )
             
             if key_option == "Unggah file kunci terpisah":
-                key_file = st.file_uploader("Unggah file kunci jawaban (.xlsx)", type=["xlsx"])
+                key_file = st.file_uploader("Unggah file kunci jawaban (.xlsx)", type=["xlsx"], help=KEY_FILE_HELP)
             elif key_option == "Input manual":
                 st.info("Fitur input manual kunci jawaban akan segera hadir.")
+            
+            topic_file = st.file_uploader(
+                "Unggah pemetaan soal → topik (opsional)", type=["xlsx", "csv"], help=TOPIC_FILE_HELP
+            )
                 
         elif input_method == "Unggah File CSV":
             uploaded_file = st.file_uploader("Unggah file hasil ujian (.csv)", type=["csv"])
+            streaming_mode = st.checkbox(
+                "Mode streaming (CSV sangat besar)",
+                help="Membaca file per potongan sehingga memori tetap kecil. Hanya pratinjau data yang ditampilkan."
+            )
             
             # Opsi untuk kunci jawaban
             key_option = st.radio(
@@ -210,182 +1121,153 @@ def main():
             )
             
             if key_option == "Unggah file kunci terpisah":
-                key_file = st.file_uploader("Unggah file kunci jawaban (.csv)", type=["csv"])
+                key_file = st.file_uploader("Unggah file kunci jawaban (.csv)", type=["csv"], help=KEY_FILE_HELP)
             elif key_option == "Input manual":
                 st.info("Fitur input manual kunci jawaban akan segera hadir.")
+            
+            if not streaming_mode:
+                topic_file = st.file_uploader(
+                    "Unggah pemetaan soal → topik (opsional)", type=["xlsx", "csv"], help=TOPIC_FILE_HELP
+                )
+                
+        elif input_method == "Batch (Banyak File)":
+            batch_files = st.file_uploader(
+                "Unggah banyak file hasil ujian (.xlsx/.csv) atau arsip .zip",
+                type=["xlsx", "csv", "zip"],
+                accept_multiple_files=True
+            )
+            
+            # Satu kunci jawaban berlaku untuk semua file
+            key_option = st.radio(
+                "Kunci jawaban:",
+                ("Baris pertama adalah kunci", "Unggah file kunci terpisah")
+            )
+            
+            if key_option == "Unggah file kunci terpisah":
+                key_file = st.file_uploader("Unggah file kunci jawaban (.xlsx/.csv)", type=["xlsx", "csv"], help=KEY_FILE_HELP)
         
         # Konfigurasi tambahan
         st.header("Konfigurasi")
         student_col_name = st.text_input("Nama kolom untuk nama siswa:", "Nama")
         pass_threshold = st.slider("Batas nilai kelulusan:", 0, 100, 70)
         
+        # Diagnostik kinerja per tahap (waktu, memori, ukuran data)
+        st.header("Diagnostik")
+        diagnostics_on = st.checkbox(
+            "Tampilkan diagnostik kinerja", value=diagnostics_enabled_by_default(),
+            help="Mencatat waktu, memori dan jumlah baris/kolom setiap tahap analisis."
+        )
+        trace_memory = diagnostics_on and st.checkbox(
+            "Lacak memori per tahap (lebih lambat)",
+            help="Memakai tracemalloc untuk mengukur puncak memori setiap tahap."
+        )
+        diagnostics_panel = st.container()
+    
+    # Analisis demo disiapkan di awal agar tombol demo langsung menampilkan hasil
+    get_demo_analysis()
+    
+    # Pencatat baru untuk setiap jalannya skrip
+    diagnostics = Diagnostics(enabled=diagnostics_on, trace_memory=trace_memory)
+    st.session_state['diagnostics'] = diagnostics
+    if diagnostics_on:
+        configure_logging()
+        
     # Main Content
-    if uploaded_file is not None:
-        # Baca file yang diunggah
+    if input_method == "Riwayat Ujian":
+        try:
+            render_history()
+        except Exception as e:
+            st.error(f"Terjadi kesalahan: {e}")
+            st.info(f"Pastikan file riwayat ujian ({DEFAULT_STORE_PATH}) dapat dibaca dan ditulis.")
+    elif batch_files:
+        # Mode batch: setiap file dianalisis di proses pekerja terpisah
+        try:
+            has_key_column = key_option == "Baris pertama adalah kunci"
+            batch_key, reports = load_batch_analysis(batch_files, key_file, student_col_name, has_key_column)
+            render_batch_report(reports, pass_threshold, batch_key)
+        except Exception as e:
+            st.error(f"Terjadi kesalahan: {e}")
+            st.info("Pastikan format file sesuai. File harus memiliki kolom untuk nama siswa dan kolom untuk setiap soal ujian.")
+    elif uploaded_file is not None and streaming_mode:
+        # Mode streaming: file dibaca per potongan, hanya ringkasan yang disimpan
         try:
-            if uploaded_file.name.endswith('.xlsx'):
-                df_answers = pd.read_excel(uploaded_file)
+            has_key_column = key_option == "Baris pertama adalah kunci"
+            streamed = load_stream_analysis(uploaded_file, key_file, student_col_name, has_key_column)
+            if streamed is not None:
+                render_streaming_report(streamed, pass_threshold)
             else:
-                df_answers = pd.read_csv(uploaded_file)
-                
-            # Tampilkan data yang diunggah
-            st.markdown('<div class="sub-header">Data Hasil Ujian</div>', unsafe_allow_html=True)
-            st.dataframe(df_answers, use_container_width=True)
+                st.error("Terjadi masalah dalam memproses kunci jawaban. Pastikan format kunci jawaban sesuai.")
+        except Exception as e:
+            st.error(f"Terjadi kesalahan: {e}")
+            st.info("Pastikan format file sesuai. File harus memiliki kolom untuk nama siswa dan kolom untuk setiap soal ujian.")
+    elif uploaded_file is not None:
+        # Analisis berjalan sebagai pekerjaan latar belakang; halaman menampilkan
+        # hasil setiap tahap yang sudah selesai dan memeriksa kemajuan secara berkala
+        try:
+            has_key_column = key_option == "Baris pertama adalah kunci"
+            job = submit_analysis_job(uploaded_file, key_file, student_col_name, has_key_column, topic_file)
+            completed = job.completed_stages()
+            analysis = job_analysis(job, completed)
+            if analysis is None:
+                # Hasil pekerjaan lama sudah dibuang dari cache: hitung ulang (sekali per sesi,
+                # agar hasil yang lebih besar dari batas cache tidak dihitung berulang-ulang)
+                restarted = st.session_state.setdefault('restarted_jobs', set())
+                if job.id in restarted:
+                    raise MemoryError(
+                        "Hasil analisis tidak muat di cache bersama. Naikkan ANALISIS_CACHE_MB lalu muat ulang."
+                    )
+                restarted.add(job.id)
+                job = submit_analysis_job(
+                    uploaded_file, key_file, student_col_name, has_key_column, topic_file, restart=True
+                )
+                completed = job.completed_stages()
+                analysis = {}
+            if job.diagnostics is not None:
+                diagnostics.records.extend(job.diagnostics.records)
             
-            # Baca file kunci jawaban jika ada
-            df_key = None
-            if key_file is not None:
-                if key_file.name.endswith('.xlsx'):
-                    df_key = pd.read_excel(key_file)
+            # Dibatalkan oleh sesi ini, tetapi pekerjaan masih berjalan untuk sesi lain
+            left_job = job.id in st.session_state['left_jobs'] and not job.finished
+            if not job.finished and not left_job:
+                poll_analysis_job(job.id, len(completed))
+            elif job.status in (STATUS_FAILED, STATUS_CANCELLED) or left_job:
+                # Pekerjaan gagal/dibatalkan tetap tersimpan per id; unggahan ulang file yang sama
+                # menampilkan pesan yang sama sampai analisis dijalankan ulang
+                render_job_progress(job)
+                if job.status == STATUS_FAILED:
+                    st.error(f"Terjadi kesalahan: {job.error}")
+                    st.info("Pastikan format file sesuai. File harus memiliki kolom untuk nama siswa dan kolom untuk setiap soal ujian.")
+                elif left_job:
+                    st.warning(
+                        "Analisis dibatalkan untuk sesi ini; sesi lain yang membuka file yang sama masih "
+                        "menjalankannya. Hasil tahap yang sudah selesai tetap ditampilkan."
+                    )
                 else:
-                    df_key = pd.read_csv(key_file)
-                st.markdown('<div class="sub-header">Data Kunci Jawaban</div>', unsafe_allow_html=True)
-                st.dataframe(df_key, use_container_width=True)
-            
-            # Preprocessing data
-            has_key_column = key_option == "Baris pertama adalah kunci"
-            df_answers, key_answers = preprocess_data(df_answers, df_key, has_key_column)
+                    st.warning("Analisis dibatalkan. Hasil tahap yang sudah selesai tetap ditampilkan.")
+                if st.button("Jalankan ulang analisis"):
+                    submit_analysis_job(
+                        uploaded_file, key_file, student_col_name, has_key_column, topic_file, restart=True
+                    )
+                    st.rerun()
             
-            if key_answers:
-                # Analisis hasil
-                results = evaluate_answers(df_answers, key_answers, student_col_name)
-                
-                # Dapatkan kolom soal
-                question_cols = [col for col in df_answers.columns if col != student_col_name]
+            # Tampilkan data yang diunggah
+            if 'raw_answers' in analysis:
+                st.markdown('<div class="sub-header">Data Hasil Ujian</div>', unsafe_allow_html=True)
+                render_paged_table(analysis['raw_answers'], key='raw_answers', table_key=analysis['answers_key'])
                 
-                # Analisis kesulitan soal
-                difficulty_data = analyze_difficulty(results, question_cols)
+                # Tampilkan file kunci jawaban jika ada
+                df_key = analysis['df_key']
+                if df_key is not None:
+                    st.markdown('<div class="sub-header">Data Kunci Jawaban</div>', unsafe_allow_html=True)
+                    st.dataframe(df_key, use_container_width=True)
                 
-                # Tampilkan hasil analisis
+                if not analysis['key_answers']:
+                    st.error("Terjadi masalah dalam memproses kunci jawaban. Pastikan format kunci jawaban sesuai.")
+            
+            if analysis.get('scored') is not None:
+                # Laporan dibangun dari hasil penilaian; bagian lain dihitung saat dibuka
+                report, report_key = build_exam_analysis(analysis, student_col_name)
                 st.markdown('<div class="sub-header">Hasil Analisis</div>', unsafe_allow_html=True)
-                
-                # Layout dengan kolom
-                col1, col2 = st.columns(2)
-                
-                with col1:
-                    # Menampilkan statistik dasar
-                    avg_score = results['score'].mean()
-                    median_score = results['score'].median()
-                    min_score = results['score'].min()
-                    max_score = results['score'].max()
-                    pass_rate = (results['score'] >= pass_threshold).mean() * 100
-                    
-                    st.markdown('<div class="insight-card">', unsafe_allow_html=True)
-                    st.markdown(f"### Statistik Nilai Kelas")
-                    st.markdown(f"**Nilai Rata-rata**: {avg_score:.2f}")
-                    st.markdown(f"**Nilai Tengah**: {median_score:.2f}")
-                    st.markdown(f"**Nilai Minimum**: {min_score:.2f}")
-                    st.markdown(f"**Nilai Maksimum**: {max_score:.2f}")
-                    st.markdown(f"**Persentase Kelulusan**: {pass_rate:.2f}% (Batas {pass_threshold})")
-                    st.markdown('</div>', unsafe_allow_html=True)
-                    
-                    # Grafik distribusi nilai
-                    st.markdown("### Distribusi Nilai")
-                    fig, ax = plt.subplots(figsize=(10, 6))
-                    sns.histplot(results['score'], bins=10, kde=True, ax=ax)
-                    ax.axvline(x=pass_threshold, color='red', linestyle='--', label=f'Batas Lulus ({pass_threshold})')
-                    ax.set_xlabel('Nilai')
-                    ax.set_ylabel('Jumlah Siswa')
-                    ax.legend()
-                    st.pyplot(fig)
-                    
-                with col2:
-                    # Soal tersulit
-                    st.markdown("### Analisis Tingkat Kesulitan Soal")
-                    
-                    # Konversi difficulty_data ke DataFrame untuk tampilan yang lebih baik
-                    difficulty_df = pd.DataFrame([
-                        {
-                            'Soal': q,
-                            'Persentase Benar': f"{data['correct_rate']:.2f}%",
-                            'Tingkat Kesulitan': data['difficulty_level']
-                        }
-                        for q, data in difficulty_data.items()
-                    ])
-                    
-                    # Urutkan berdasarkan tingkat kesulitan (persentase benar paling rendah)
-                    difficulty_df = difficulty_df.sort_values(by='Persentase Benar')
-                    
-                    # Tampilkan tabel
-                    st.dataframe(difficulty_df, use_container_width=True)
-                    
-                    # Grafik tingkat kesulitan soal
-                    st.markdown("### Grafik Tingkat Kesulitan Soal")
-                    difficulty_data_sorted = {k: v for k, v in sorted(difficulty_data.items(), key=lambda item: item[1]['correct_rate'])}
-                    
-                    fig, ax = plt.subplots(figsize=(10, 6))
-                    questions = list(difficulty_data_sorted.keys())
-                    correct_rates = [data['correct_rate'] for data in difficulty_data_sorted.values()]
-                    
-                    colors = ['#D32F2F' if rate < 50 else '#388E3C' for rate in correct_rates]
-                    
-                    bars = ax.bar(questions, correct_rates, color=colors)
-                    ax.set_ylabel('Persentase Jawaban Benar (%)')
-                    ax.set_xlabel('Soal')
-                    ax.set_ylim(0, 100)
-                    ax.axhline(y=50, color='gray', linestyle='--', alpha=0.7)
-                    
-                    # Rotasi label sumbu x jika terlalu banyak soal
-                    if len(questions) > 5:
-                        plt.xticks(rotation=45, ha='right')
-                    
-                    plt.tight_layout()
-                    st.pyplot(fig)
-                
-                # Rekomendasi topik remedial
-                st.markdown('<div class="sub-header">Rekomendasi Topik Remedial</div>', unsafe_allow_html=True)
-                recommendations = generate_topic_recommendations(difficulty_data)
-                
-                if recommendations:
-                    recom_df = pd.DataFrame(recommendations)
-                    st.dataframe(recom_df[['question', 'correct_rate', 'recommendation']], use_container_width=True)
-                    
-                    st.markdown('<div class="insight-card">', unsafe_allow_html=True)
-                    st.markdown("### Kesimpulan AI")
-                    
-                    # Hitung jumlah topik yang perlu remedial
-                    remedial_count = len(recommendations)
-                    total_questions = len(question_cols)
-                    remedial_percentage = (remedial_count / total_questions) * 100
-                    
-                    if remedial_percentage > 50:
-                        st.markdown(f"<p><span class='highlight'>⚠️ {remedial_percentage:.1f}% soal memiliki tingkat keberhasilan rendah.</span> Sebaiknya lakukan remedial komprehensif untuk materi pada bab ini.</p>", unsafe_allow_html=True)
-                    elif remedial_percentage > 30:
-                        st.markdown(f"<p><span class='highlight'>⚠️ {remedial_percentage:.1f}% soal memiliki tingkat keberhasilan rendah.</span> Fokus pada topik-topik yang diidentifikasi di atas untuk remedial.</p>", unsafe_allow_html=True)
-                    elif remedial_percentage > 0:
-                        st.markdown(f"<p>🔍 {remedial_percentage:.1f}% soal memiliki tingkat keberhasilan rendah. Berikan penekanan lebih pada topik-topik tersebut pada pertemuan berikutnya.</p>", unsafe_allow_html=True)
-                    else:
-                        st.markdown(f"<p><span class='success'>✅ Semua soal memiliki tingkat keberhasilan yang baik.</span> Lanjutkan ke materi berikutnya.</p>", unsafe_allow_html=True)
-                    
-                    st.markdown('</div>', unsafe_allow_html=True)
-                else:
-                    st.markdown('<div class="insight-card">', unsafe_allow_html=True)
-                    st.markdown("<p><span class='success'>✅ Tidak ada topik yang perlu remedial. Siswa telah menguasai semua materi dengan baik.</span></p>", unsafe_allow_html=True)
-                    st.markdown('</div>', unsafe_allow_html=True)
-                
-                # Hasil per siswa
-                st.markdown('<div class="sub-header">Hasil Per Siswa</div>', unsafe_allow_html=True)
-                student_results = results[[student_col_name, 'total_correct', 'score']].copy()
-                student_results.columns = ['Nama Siswa', 'Jumlah Benar', 'Nilai']
-                student_results['Status'] = student_results['Nilai'].apply(lambda x: 'Lulus' if x >= pass_threshold else 'Tidak Lulus')
-                student_results = student_results.sort_values(by='Nilai', ascending=False)
-                
-                st.dataframe(
-                    student_results.style.apply(highlight_status, axis=1),
-                    use_container_width=True
-                )
-                
-                # Download hasil analisis
-                st.markdown('<div class="sub-header">Download Hasil Analisis</div>', unsafe_allow_html=True)
-                
-                st.markdown(download_link(student_results, 'hasil_siswa.csv', 'Download Hasil Per Siswa (CSV)'), unsafe_allow_html=True)
-                st.markdown(download_link(difficulty_df, 'analisis_soal.csv', 'Download Analisis Soal (CSV)'), unsafe_allow_html=True)
-                
-                if recommendations:
-                    st.markdown(download_link(recom_df, 'rekomendasi_remedial.csv', 'Download Rekomendasi Remedial (CSV)'), unsafe_allow_html=True)
-                
-            else:
-                st.error("Terjadi masalah dalam memproses kunci jawaban. Pastikan format kunci jawaban sesuai.")
+                render_report(report, pass_threshold, report_key, os.path.splitext(uploaded_file.name)[0])
                 
         except Exception as e:
             st.error(f"Terjadi kesalahan: {e}")
@@ -417,121 +1299,29 @@ def main():
         
         st.markdown("### Contoh Format Data")
         
-        # Contoh data
-        example_data = {
-            'Nama': ['KUNCI', 'Siswa 1', 'Siswa 2', 'Siswa 3', 'Siswa 4', 'Siswa 5'],
-            'Soal 1': ['A', 'A', 'B', 'A', 'C', 'A'],
-            'Soal 2': ['B', 'B', 'B', 'A', 'B', 'C'],
-            'Soal 3': ['C', 'C', 'A', 'C', 'B', 'C'],
-            'Soal 4': ['A', 'D', 'A', 'A', 'A', 'B'],
-            'Soal 5': ['D', 'D', 'D', 'C', 'D', 'D']
-        }
-        
-        example_df = pd.DataFrame(example_data)
-        st.dataframe(example_df, use_container_width=True)
+        st.dataframe(pd.DataFrame(EXAMPLE_DATA), use_container_width=True)
         st.markdown("*Catatan: Dalam contoh di atas, baris pertama adalah kunci jawaban.*")
         st.markdown('</div>', unsafe_allow_html=True)
         
-        # Demo dengan data contoh
+        # Demo dengan data contoh (hasil analisis sudah dihitung sekali untuk semua sesi)
         st.markdown('<div class="sub-header">Coba Demo</div>', unsafe_allow_html=True)
         if st.button("Lihat Demo dengan Data Contoh"):
-            # Convert example dataframe to CSV for demo
-            demo_file = BytesIO()
-            example_df.to_csv(demo_file, index=False)
-            demo_file.seek(0)
-            
-            # Use the demo file
-            df_answers = pd.read_csv(demo_file)
+            st.session_state['show_demo'] = True
+        if st.session_state.get('show_demo'):
+            demo = get_demo_analysis()
             
             # Tampilkan data contoh
             st.markdown('<div class="sub-header">Data Hasil Ujian Demo</div>', unsafe_allow_html=True)
-            st.dataframe(df_answers, use_container_width=True)
-            
-            # Preprocessing data demo
-            df_answers, key_answers = preprocess_data(df_answers, None, True)
-            
-            # Lakukan analisis
-            student_col_name = "Nama"
-            results = evaluate_answers(df_answers, key_answers, student_col_name)
-            
-            # Dapatkan kolom soal
-            question_cols = [col for col in df_answers.columns if col != student_col_name]
-            
-            # Analisis kesulitan soal
-            difficulty_data = analyze_difficulty(results, question_cols)
+            st.dataframe(pd.DataFrame(EXAMPLE_DATA).iloc[1:], use_container_width=True)
             
-            # Tampilkan hasil analisis demo
+            # Tampilkan hasil analisis demo (bagian laporan yang sama dengan file unggahan)
             st.markdown('<div class="sub-header">Hasil Analisis Demo</div>', unsafe_allow_html=True)
-            
-            # Layout dengan kolom
-            col1, col2 = st.columns(2)
-            
-            with col1:
-                # Menampilkan statistik dasar
-                avg_score = results['score'].mean()
-                median_score = results['score'].median()
-                min_score = results['score'].min()
-                max_score = results['score'].max()
-                pass_threshold = 70
-                pass_rate = (results['score'] >= pass_threshold).mean() * 100
-                
-                st.markdown('<div class="insight-card">', unsafe_allow_html=True)
-                st.markdown(f"### Statistik Nilai Kelas")
-                st.markdown(f"**Nilai Rata-rata**: {avg_score:.2f}")
-                st.markdown(f"**Nilai Tengah**: {median_score:.2f}")
-                st.markdown(f"**Nilai Minimum**: {min_score:.2f}")
-                st.markdown(f"**Nilai Maksimum**: {max_score:.2f}")
-                st.markdown(f"**Persentase Kelulusan**: {pass_rate:.2f}% (Batas {pass_threshold})")
-                st.markdown('</div>', unsafe_allow_html=True)
-                
-                # Grafik distribusi nilai
-                st.markdown("### Distribusi Nilai")
-                fig, ax = plt.subplots(figsize=(10, 6))
-                sns.histplot(results['score'], bins=10, kde=True, ax=ax)
-                ax.axvline(x=pass_threshold, color='red', linestyle='--', label=f'Batas Lulus ({pass_threshold})')
-                ax.set_xlabel('Nilai')
-                ax.set_ylabel('Jumlah Siswa')
-                ax.legend()
-                st.pyplot(fig)
-                
-            with col2:
-                # Soal tersulit
-                st.markdown("### Analisis Tingkat Kesulitan Soal")
-                
-                # Konversi difficulty_data ke DataFrame untuk tampilan yang lebih baik
-                difficulty_df = pd.DataFrame([
-                    {
-                        'Soal': q,
-                        'Persentase Benar': f"{data['correct_rate']:.2f}%",
-                        'Tingkat Kesulitan': data['difficulty_level']
-                    }
-                    for q, data in difficulty_data.items()
-                ])
-                
-                # Urutkan berdasarkan tingkat kesulitan (persentase benar paling rendah)
-                difficulty_df = difficulty_df.sort_values(by='Persentase Benar')
-                
-                # Tampilkan tabel
-                st.dataframe(difficulty_df, use_container_width=True)
-                
-                # Grafik tingkat kesulitan soal
-                st.markdown("### Grafik Tingkat Kesulitan Soal")
-                difficulty_data_sorted = {k: v for k, v in sorted(difficulty_data.items(), key=lambda item: item[1]['correct_rate'])}
-                
-                fig, ax = plt.subplots(figsize=(10, 6))
-                questions = list(difficulty_data_sorted.keys())
-                correct_rates = [data['correct_rate'] for data in difficulty_data_sorted.values()]
-                
-                colors = ['#D32F2F' if rate < 50 else '#388E3C' for rate in correct_rates]
-                
-                bars = ax.bar(questions, correct_rates, color=colors)
-                ax.set_ylabel('Persentase Jawaban Benar (%)')
-                ax.set_xlabel('Soal')
-                ax.set_ylim(0, 100)
-                ax.axhline(y=50, color='gray', linestyle='--', alpha=0.7)
-                
-                plt.tight_layout()
-                st.pyplot(fig)
+            render_report(demo, DEMO_PASS_THRESHOLD, DEMO_REPORT_KEY, key_prefix='demo')
+    
+    # Panel diagnostik diisi terakhir agar memuat semua tahap pada jalannya skrip ini
+    if diagnostics.enabled:
+        with diagnostics_panel:
+            render_diagnostics_panel(diagnostics)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,124 @@
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from analisis_ujian.cache import AnalysisCache
+
+
+# Seperti kontrol rerun/stop skrip Streamlit: bukan kesalahan perhitungan
+class SessionStopped(BaseException):
+    pass
+
+
+def array(n_bytes):
+    return np.zeros(n_bytes, dtype=np.uint8)
+
+
+# Jalankan get_or_compute dari thread lain; hasil/kesalahan dicatat di outcome
+def compute_in_thread(cache, key, compute, outcome):
+    def target():
+        try:
+            outcome.append(cache.get_or_compute(key, compute))
+        except BaseException as e:
+            outcome.append(e)
+    thread = threading.Thread(target=target)
+    thread.start()
+    return thread
+
+
+# Perhitungan yang menahan diri sampai `release` diset
+def blocking_compute(started, release, calls, result=None, error=None):
+    def compute():
+        calls.append(1)
+        started.set()
+        assert release.wait(5)
+        if error is not None:
+            raise error
+        return result
+    return compute
+
+
+# Tunggu sampai sesi kedua terdaftar sebagai penunggu future kunci yang sedang dihitung
+def wait_for_waiter(cache, key):
+    future = cache._pending[key]
+    for _ in range(500):
+        if future._condition._waiters:
+            return
+        time.sleep(0.01)
+    raise AssertionError("sesi kedua tidak menunggu hasil")
+
+
+def test_concurrent_requests_compute_once_and_share_the_result():
+    cache = AnalysisCache(max_bytes=10_000)
+    started, release, calls, outcome = threading.Event(), threading.Event(), [], []
+    value = array(100)
+
+    owner = compute_in_thread(cache, 'k', blocking_compute(started, release, calls, result=value), outcome)
+    assert started.wait(5)
+    waiter = compute_in_thread(cache, 'k', lambda: pytest.fail("dihitung dua kali"), outcome)
+    wait_for_waiter(cache, 'k')
+    release.set()
+    owner.join(5)
+    waiter.join(5)
+
+    assert calls == [1]
+    assert sorted(status for _, status in outcome) == ['miss', 'shared']
+    assert all(result is value for result, _ in outcome)
+    assert cache.get_or_compute('k', lambda: pytest.fail("dihitung ulang")) == (value, 'hit')
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['shared'], stats['in_flight']) == (1, 1, 1, 0)
+
+
+def test_least_recently_used_entries_are_evicted_to_fit_the_byte_budget():
+    cache = AnalysisCache(max_bytes=250)
+    cache.put('a', array(100))
+    cache.put('b', array(100))
+    cache.get('a')
+    cache.put('c', array(100))
+
+    assert 'a' in cache and 'c' in cache
+    assert 'b' not in cache
+    assert cache.total_bytes == 200
+
+    # Entri yang lebih besar dari seluruh batas tidak disimpan dan tidak membuang yang lain
+    cache.put('besar', array(300))
+    assert 'besar' not in cache
+    assert len(cache) == 2
+
+
+def test_errors_reach_every_waiting_session_and_are_not_cached():
+    cache = AnalysisCache(max_bytes=10_000)
+    started, release, calls, outcome = threading.Event(), threading.Event(), [], []
+    error = ValueError("format salah")
+
+    owner = compute_in_thread(cache, 'k', blocking_compute(started, release, calls, error=error), outcome)
+    assert started.wait(5)
+    waiter = compute_in_thread(cache, 'k', lambda: pytest.fail("dihitung dua kali"), outcome)
+    wait_for_waiter(cache, 'k')
+    release.set()
+    owner.join(5)
+    waiter.join(5)
+
+    assert calls == [1]
+    assert outcome == [error, error]
+    assert 'k' not in cache
+    assert cache.get_or_compute('k', lambda: 1) == (1, 'miss')
+
+
+def test_stopped_computation_lets_the_waiting_session_compute_itself():
+    cache = AnalysisCache(max_bytes=10_000)
+    started, release, calls, outcome = threading.Event(), threading.Event(), [], []
+
+    owner = compute_in_thread(cache, 'k', blocking_compute(started, release, calls, error=SessionStopped()), outcome)
+    assert started.wait(5)
+    waiter = compute_in_thread(cache, 'k', lambda: 'dihitung sendiri', outcome)
+    wait_for_waiter(cache, 'k')
+    release.set()
+    owner.join(5)
+    waiter.join(5)
+
+    assert isinstance(outcome[0], SessionStopped)
+    assert outcome[1] == ('dihitung sendiri', 'miss')
+    assert cache.get('k') == 'dihitung sendiri'
@@ -0,0 +1,42 @@
+import tracemalloc
+
+from analisis_ujian.diagnostics import Diagnostics
+
+
+def test_nested_stages_each_get_a_tracemalloc_peak():
+    diagnostics = Diagnostics(enabled=True, trace_memory=True)
+    with diagnostics.stage('outer'):
+        with diagnostics.stage('inner'):
+            block = bytearray(4 * 1024 * 1024)
+            del block
+        small = bytearray(1024)
+        del small
+
+    records = {record['stage']: record for record in diagnostics.records}
+    assert records['inner']['peak_mb'] >= 4
+    assert records['outer']['peak_mb'] >= records['inner']['peak_mb']
+    assert not tracemalloc.is_tracing()
+
+
+def test_peak_before_a_stage_is_not_counted():
+    diagnostics = Diagnostics(enabled=True, trace_memory=True)
+    with diagnostics.stage('outer'):
+        block = bytearray(4 * 1024 * 1024)
+        del block
+        with diagnostics.stage('inner'):
+            pass
+
+    records = {record['stage']: record for record in diagnostics.records}
+    assert records['inner']['peak_mb'] < 1
+    assert records['outer']['peak_mb'] >= 4
+
+
+def test_stage_records_rss_delta_and_process_peak():
+    diagnostics = Diagnostics(enabled=True)
+    with diagnostics.stage('tahap'):
+        pass
+
+    record = diagnostics.records[0]
+    assert 'rss_delta_mb' in record
+    assert 'process_rss_peak_mb' in record
+    assert 'peak_mb' not in record
@@ -0,0 +1,50 @@
+import io
+import zipfile
+
+import pandas as pd
+import pytest
+
+from analisis_ujian.export import PARQUET_AVAILABLE, build_csv, build_parquet_bundle, build_xlsx
+
+download_data_util = pytest.importorskip('streamlit.runtime.download_data_util')
+from streamlit.errors import StreamlitAPIException  # noqa: E402
+
+TABLE = pd.DataFrame({
+    'Nama': ['Siswa 1', 'Siswa 2', 'Siswa 3'],
+    'Nilai': [80.0, 55.5, None],
+    'Jawaban': ['A', 1, 'C'],
+})
+
+
+# Isi file harus bisa diterima st.download_button apa adanya
+def as_download_data(data):
+    converted, _ = download_data_util.convert_data_to_bytes_and_infer_mime(
+        data, StreamlitAPIException("Tipe data unduhan tidak didukung.")
+    )
+    return converted
+
+
+def test_build_csv_is_accepted_by_download_button():
+    data = as_download_data(build_csv(TABLE, chunk_rows=2))
+
+    df = pd.read_csv(io.BytesIO(data))
+    assert df['Nama'].tolist() == TABLE['Nama'].tolist()
+    assert df['Nilai'].iloc[:2].tolist() == [80.0, 55.5]
+
+
+def test_build_xlsx_is_accepted_by_download_button():
+    data = as_download_data(build_xlsx({'hasil_siswa': TABLE, 'kosong': TABLE.iloc[:0]}))
+
+    sheets = pd.read_excel(io.BytesIO(data), sheet_name=None)
+    assert list(sheets) == ['hasil_siswa', 'kosong']
+    assert sheets['hasil_siswa']['Nama'].tolist() == TABLE['Nama'].tolist()
+
+
+@pytest.mark.skipif(not PARQUET_AVAILABLE, reason="pyarrow tidak terpasang")
+def test_build_parquet_bundle_is_accepted_by_download_button():
+    data = as_download_data(build_parquet_bundle({'hasil_siswa': TABLE}))
+
+    with zipfile.ZipFile(io.BytesIO(data)) as archive:
+        assert archive.namelist() == ['hasil_siswa.parquet']
+        df = pd.read_parquet(io.BytesIO(archive.read('hasil_siswa.parquet')))
+    assert df['Jawaban'].tolist() == ['A', '1', 'C']
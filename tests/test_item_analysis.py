@@ -0,0 +1,77 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from analisis_ujian.item_analysis import item_statistics
+from analisis_ujian.report import analyze_exam
+
+# Pola Guttman 5 siswa x 4 soal: skor total 4, 3, 2, 1, 0
+CORRECT = np.array([
+    [1, 1, 1, 1],
+    [1, 1, 1, 0],
+    [1, 1, 0, 0],
+    [1, 0, 0, 0],
+    [0, 0, 0, 0],
+], dtype=bool)
+QUESTION_COLS = ['Soal 1', 'Soal 2', 'Soal 3', 'Soal 4']
+
+
+def test_item_statistics_match_hand_computed_values():
+    items, reliability, (lower, upper) = item_statistics(CORRECT, QUESTION_COLS)
+    items = items.set_index('Soal')
+
+    # p = 0,8 0,6 0,4 0,2; jumlah pq = 0,8; varians skor total = 2
+    # KR-20 = 4/3 * (1 - 0,8/2) = 0,8; SEM = sqrt(2 * (1 - 0,8))
+    assert items['Tingkat Kesukaran (p)'].tolist() == pytest.approx([0.8, 0.6, 0.4, 0.2])
+    assert reliability['total_variance'] == pytest.approx(2.0)
+    assert reliability['kr20'] == pytest.approx(0.8)
+    assert reliability['cronbach_alpha'] == pytest.approx(0.8)
+    assert reliability['sem'] == pytest.approx(np.sqrt(0.4))
+
+    # Point-biserial terhadap skor sisa, mis. Soal 1: cov = 0,24, var skor sisa = 1,36
+    # -> 0,24 / sqrt(0,16 * 1,36); Soal 2: 0,36 / sqrt(0,24 * 1,04)
+    expected_rpb = [0.24 / np.sqrt(0.16 * 1.36), 0.36 / np.sqrt(0.24 * 1.04)]
+    assert items['Korelasi Point-Biserial'].tolist() == pytest.approx(expected_rpb + expected_rpb[::-1])
+
+    # Tanpa Soal 1: jumlah pq = 0,64, varians skor = 1,36 -> 3/2 * (1 - 0,64/1,36) = 27/34
+    assert items.loc['Soal 1', 'Alpha Jika Soal Dihapus'] == pytest.approx(27 / 34)
+
+    # Kelompok 27% = 2 siswa: atas {1, 2}, bawah {4, 5}
+    assert sorted(upper) == [0, 1] and sorted(lower) == [3, 4]
+    assert items['Daya Beda (D)'].tolist() == pytest.approx([0.5, 1.0, 1.0, 0.5])
+    assert items['Kategori Daya Beda'].tolist() == ['Sangat Baik'] * 4
+
+
+def test_item_statistics_agree_with_pearson_correlation_on_random_data():
+    rng = np.random.default_rng(2)
+    correct = rng.random((200, 12)) < np.linspace(0.2, 0.9, 12)
+    question_cols = [f'Soal {i + 1}' for i in range(12)]
+
+    items, reliability, _ = item_statistics(correct, question_cols)
+
+    X = correct.astype(float)
+    totals = X.sum(axis=1)
+    rest_corr = [np.corrcoef(X[:, i], totals - X[:, i])[0, 1] for i in range(12)]
+    kr20 = 12 / 11 * (1 - (X.mean(0) * (1 - X.mean(0))).sum() / totals.var())
+    assert items['Korelasi Point-Biserial'].tolist() == pytest.approx(rest_corr)
+    assert reliability['kr20'] == pytest.approx(kr20)
+
+
+def test_distractors_mark_every_accepted_answer_as_key():
+    df_answers = pd.DataFrame({
+        'Nama': ['Siswa 1', 'Siswa 2', 'Siswa 3', 'Siswa 4'],
+        'Soal 1': ['A', 'D', 'B', 'C'],
+        'Soal 2': ['B', 'B', 'A', 'B'],
+    })
+    df_key = pd.DataFrame({
+        'Soal': ['Soal 1', 'Soal 2'],
+        'Kunci': ['A|D', 'B'],
+        'Bobot': [1, 1],
+        'Tipe': ['satu', 'satu'],
+    })
+
+    distractors = analyze_exam(df_answers, df_key)['item_analysis']['distractors']
+    soal_1 = distractors[distractors['Soal'] == 'Soal 1'].set_index('Opsi')
+
+    assert soal_1['Kunci'].to_dict() == {'A': True, 'B': False, 'C': False, 'D': True}
+    assert soal_1.loc['A', 'Keterangan'] == 'Kunci'
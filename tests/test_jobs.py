@@ -0,0 +1,140 @@
+import threading
+import time
+
+from analisis_ujian.jobs import (
+    STATUS_CANCELLED,
+    STATUS_DONE,
+    STATUS_FAILED,
+    JobManager,
+)
+
+
+def wait_finished(job, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not job.finished:
+        assert time.monotonic() < deadline, "pekerjaan tidak selesai"
+        time.sleep(0.01)
+
+
+# Tahap yang berjalan per potongan sampai dibatalkan (atau sampai `released` diset)
+def chunked_stage(started, released, chunks):
+    def stage(results, check_cancelled):
+        started.set()
+        while not released.is_set():
+            check_cancelled()
+            chunks.append(1)
+            time.sleep(0.005)
+        return 'selesai'
+    return stage
+
+
+def test_job_runs_stages_in_order_with_previous_results():
+    jobs = JobManager(max_workers=1)
+    job = jobs.submit('a', [
+        ('parse', lambda results, check_cancelled: 2),
+        ('score', lambda results, check_cancelled: results['parse'] * 10),
+    ])
+    wait_finished(job)
+
+    assert job.status == STATUS_DONE
+    assert job.results == {'parse': 2, 'score': 20}
+    assert job.progress() == 1.0
+    assert job.completed_stages() == ['parse', 'score']
+
+
+def test_cancel_stops_a_running_stage_between_chunks():
+    jobs = JobManager(max_workers=1)
+    started, released, chunks = threading.Event(), threading.Event(), []
+    job = jobs.submit('a', [
+        ('parse', chunked_stage(started, released, chunks)),
+        ('score', lambda results, check_cancelled: 'tidak dijalankan'),
+    ])
+    assert started.wait(5)
+
+    assert jobs.cancel('a')
+    wait_finished(job)
+
+    assert job.status == STATUS_CANCELLED
+    assert [stage['status'] for stage in job.stages.values()] == [STATUS_CANCELLED, STATUS_CANCELLED]
+    assert job.results == {}
+    assert job.error is None
+
+
+def test_cancel_waits_for_every_subscribed_session():
+    jobs = JobManager(max_workers=1)
+    started, released, chunks = threading.Event(), threading.Event(), []
+    job = jobs.submit('a', [('parse', chunked_stage(started, released, chunks))])
+    job.subscribe('sesi-1')
+    job.subscribe('sesi-2')
+    assert started.wait(5)
+
+    # Sesi pertama membatalkan, sesi kedua masih menampilkan pekerjaan
+    assert not jobs.cancel('a', 'sesi-1')
+    assert not job.cancel_requested
+    released.set()
+    wait_finished(job)
+    assert job.status == STATUS_DONE
+
+    started.clear()
+    released.clear()
+    job = jobs.submit('b', [('parse', chunked_stage(started, released, chunks))])
+    job.subscribe('sesi-1')
+    job.subscribe('sesi-2')
+    assert started.wait(5)
+    assert not jobs.cancel('b', 'sesi-1')
+    assert jobs.cancel('b', 'sesi-2')
+    wait_finished(job)
+    assert job.status == STATUS_CANCELLED
+
+
+def test_failed_stage_records_error_and_cancels_the_rest():
+    jobs = JobManager(max_workers=1)
+
+    def fail(results, check_cancelled):
+        raise ValueError("format salah")
+
+    job = jobs.submit('a', [('parse', fail), ('score', lambda results, check_cancelled: 1)])
+    wait_finished(job)
+
+    assert job.status == STATUS_FAILED
+    assert str(job.error) == "format salah"
+    assert job.error.__traceback__ is None
+    assert job.stages['score']['status'] == STATUS_CANCELLED
+
+
+def test_submit_reuses_jobs_and_restarts_only_finished_ones():
+    jobs = JobManager(max_workers=1)
+    calls = []
+
+    def stage(results, check_cancelled):
+        calls.append(1)
+        return len(calls)
+
+    job = jobs.submit('a', [('parse', stage)])
+    wait_finished(job)
+    assert jobs.submit('a', [('parse', stage)]) is job
+    assert calls == [1]
+
+    restarted = jobs.submit('a', [('parse', stage)], restart=True)
+    wait_finished(restarted)
+    assert restarted is not job
+    assert restarted.results == {'parse': 2}
+    assert jobs.get('a') is restarted
+
+    # Pekerjaan yang masih berjalan tidak diulang meski restart=True
+    started, released, chunks = threading.Event(), threading.Event(), []
+    running = jobs.submit('b', [('parse', chunked_stage(started, released, chunks))])
+    assert started.wait(5)
+    assert jobs.submit('b', [('parse', stage)], restart=True) is running
+    released.set()
+    wait_finished(running)
+
+
+def test_history_keeps_only_the_most_recent_finished_jobs():
+    jobs = JobManager(max_workers=1, history=2)
+    for job_id in 'abc':
+        wait_finished(jobs.submit(job_id, [('parse', lambda results, check_cancelled: job_id)]))
+    jobs.submit('d', [('parse', lambda results, check_cancelled: 'd')])
+
+    assert jobs.get('a') is None
+    assert jobs.get('c') is not None
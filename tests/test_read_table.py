@@ -0,0 +1,47 @@
+import io
+
+import pandas as pd
+import pytest
+
+from analisis_ujian.core import read_table
+from analisis_ujian.excel import CLASS_COL
+from analisis_ujian.report import analyze_exam
+
+ANSWERS = pd.DataFrame({
+    'Nama': ['KUNCI', 'Siswa 1', 'Siswa 2'],
+    'Soal 1': ['A', 'A', 'A'],
+    'Soal 2': ['B', 'B', 'C'],
+})
+
+
+def xlsx_bytes(sheets):
+    buffer = io.BytesIO()
+    with pd.ExcelWriter(buffer, engine='openpyxl') as writer:
+        for sheet_name, df in sheets.items():
+            df.to_excel(writer, sheet_name=sheet_name, index=False)
+    return buffer.getvalue()
+
+
+def test_read_table_reads_single_sheet_xlsx():
+    df = read_table(xlsx_bytes({'Kelas A': ANSWERS}), 'hasil.xlsx', all_sheets=False)
+
+    assert list(df.columns) == ['Nama', 'Soal 1', 'Soal 2']
+    assert df['Nama'].tolist() == ['KUNCI', 'Siswa 1', 'Siswa 2']
+
+
+def test_read_table_tags_each_sheet_with_its_class():
+    data = xlsx_bytes({'Kelas A': ANSWERS, 'Kelas B': ANSWERS})
+    df = read_table(data, 'hasil.xlsx', key_in_first_row=True, max_workers=1)
+
+    assert df.columns[1] == CLASS_COL
+    # Baris kunci yang diulang di sheet kedua dibuang
+    assert (df['Nama'] == 'KUNCI').sum() == 1
+    assert df[CLASS_COL].tolist() == ['Kelas A', 'Kelas A', 'Kelas A', 'Kelas B', 'Kelas B']
+
+
+def test_analyze_exam_scores_xlsx_upload():
+    df = read_table(xlsx_bytes({'Kelas A': ANSWERS}), 'hasil.xlsx', key_in_first_row=True)
+    analysis = analyze_exam(df, has_key_column=True)
+
+    scores = dict(zip(analysis['results']['Nama'], analysis['results']['score']))
+    assert scores == {'Siswa 1': pytest.approx(100.0), 'Siswa 2': pytest.approx(50.0)}
@@ -0,0 +1,80 @@
+import pandas as pd
+import pytest
+
+from analisis_ujian.report import analyze_exam
+from analisis_ujian.scoring import KeySpec
+
+
+def scores_by_student(analysis):
+    return dict(zip(analysis['results']['Nama'], analysis['results']['score']))
+
+
+def test_plain_key_matches_whole_answer():
+    df_answers = pd.DataFrame({
+        'Nama': ['Siswa 1', 'Siswa 2'],
+        'Q1': ['2,5', '5'],
+        'Q2': ['A', 'A'],
+        'Q3': ['Jawa Barat', 'Barat'],
+    })
+    df_key = pd.DataFrame({'Nama': ['KUNCI'], 'Q1': ['2,5'], 'Q2': ['A'], 'Q3': ['Jawa Barat']})
+
+    scores = scores_by_student(analyze_exam(df_answers, df_key))
+
+    assert scores['Siswa 1'] == pytest.approx(100.0)
+    assert scores['Siswa 2'] == pytest.approx(100 / 3)
+
+
+def test_plain_key_does_not_split_on_pipe():
+    spec = KeySpec.from_key_answers({'Q1': 'A|B'})
+
+    assert spec.accepted['Q1'] == ('A|B',)
+
+
+def test_key_spec_rules_and_weights():
+    df_answers = pd.DataFrame({
+        'Nama': ['Siswa 1', 'Siswa 2', 'Siswa 3'],
+        'Soal 1': ['A', 'B', 'D'],
+        'Soal 2': ['AC', 'A', 'A,C'],
+        'Soal 3': ['ACD', 'AC', 'AB'],
+        'Soal 4': ['2,5', '5', '2,5'],
+    })
+    df_key = pd.DataFrame({
+        'Soal': ['Soal 1', 'Soal 2', 'Soal 3', 'Soal 4'],
+        'Kunci': ['A|D', 'A,C', 'A,C,D', '2,5'],
+        'Bobot': [1, 2, 3, 1],
+        'Tipe': ['satu', 'semua', 'parsial', 'satu'],
+    })
+
+    analysis = analyze_exam(df_answers, df_key)
+    results = analysis['results'].set_index('Nama')
+
+    # satu: salah satu kunci yang diterima; semua: tepat semua pilihan kunci;
+    # parsial: (tepat - salah) / jumlah kunci, minimal 0
+    assert results.loc['Siswa 1', 'total_points'] == pytest.approx(7.0)
+    assert results.loc['Siswa 2', 'total_points'] == pytest.approx(2.0)
+    assert results.loc['Siswa 3', 'total_points'] == pytest.approx(1 + 2 + 0 + 1)
+    assert results.loc['Siswa 1', 'score'] == pytest.approx(100.0)
+    assert results.loc['Siswa 2', 'score'] == pytest.approx(2 / 7 * 100)
+    assert results['total_correct'].tolist() == [4, 0, 3]
+
+
+def test_key_spec_satu_rule_keeps_commas_and_spaces():
+    df_key = pd.DataFrame({'Soal': ['Q1', 'Q2'], 'Kunci': ['2,5', 'Jawa Barat'], 'Tipe': ['satu', 'satu']})
+
+    spec = KeySpec.from_frame(df_key)
+
+    assert spec.accepted == {'Q1': ('2,5',), 'Q2': ('JAWA BARAT',)}
+
+
+def test_key_spec_rejects_zero_total_weight():
+    df_key = pd.DataFrame({'Soal': ['Q1', 'Q2'], 'Kunci': ['A', 'B'], 'Bobot': [0, 0]})
+
+    with pytest.raises(ValueError):
+        KeySpec.from_frame(df_key)
+
+
+def test_key_spec_rejects_zero_weight_for_scored_questions():
+    spec = KeySpec({'Q1': ('A',), 'Q2': ('B',)}, weights={'Q1': 0, 'Q2': 1})
+
+    with pytest.raises(ValueError):
+        spec.max_points(['Q1'])
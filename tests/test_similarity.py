@@ -0,0 +1,63 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from analisis_ujian.core import score_answers
+from analisis_ujian.similarity import analyze_similarity
+
+N_STUDENTS = 60
+N_ITEMS = 40
+
+
+# Kelas acak (kunci selalu A, jawaban salah tersebar rata di B/C/D) dengan satu
+# siswa yang menyalin seluruh lembar jawaban siswa lain yang banyak salahnya
+@pytest.fixture(scope='module')
+def planted_exam():
+    rng = np.random.default_rng(0)
+    question_cols = [f'Soal {i + 1}' for i in range(N_ITEMS)]
+    answers = np.where(rng.random((N_STUDENTS, N_ITEMS)) < 0.5, 'A', rng.choice(['B', 'C', 'D'], (N_STUDENTS, N_ITEMS)))
+    answers[0, :30] = rng.choice(['B', 'C', 'D'], 30)
+    answers[0, 30:] = 'A'
+    answers[1] = answers[0]
+
+    df = pd.DataFrame(answers, columns=question_cols)
+    df.insert(0, 'Nama', ['Sumber', 'Penyontek'] + [f'Siswa {i}' for i in range(2, N_STUDENTS)])
+    _, correct = score_answers(df, {col: 'A' for col in question_cols}, 'Nama')
+    return df, correct, question_cols
+
+
+def test_planted_copier_is_the_top_pair(planted_exam):
+    df, correct, question_cols = planted_exam
+
+    similarity = analyze_similarity(df, correct, question_cols, 'Nama', block_rows=16, max_workers=1)
+
+    top = similarity['pairs'].iloc[0]
+    assert {top['Siswa A'], top['Siswa B']} == {'Sumber', 'Penyontek'}
+    assert top['Jawaban Sama'] == N_ITEMS
+    assert top['Salah Bersama'] == 30
+    assert top['Jawaban Salah Sama'] == 30
+    assert top['Harapan Salah Sama'] == pytest.approx(10, rel=0.2)
+    assert top['Skor Z'] >= 5
+    assert similarity['n_pairs'] == N_STUDENTS * (N_STUDENTS - 1) // 2
+    assert similarity['n_flagged'] >= 1
+
+
+def test_blank_answers_do_not_count_as_agreement(planted_exam):
+    df, correct, question_cols = planted_exam
+    df = df.copy()
+    df.loc[[0, 1], question_cols[-5:]] = None
+    _, correct = score_answers(df, {col: 'A' for col in question_cols}, 'Nama')
+
+    pairs = analyze_similarity(df, correct, question_cols, 'Nama', max_workers=1)['pairs']
+
+    assert pairs.iloc[0]['Jawaban Sama'] == N_ITEMS - 5
+
+
+def test_process_pool_matches_sequential_scan(planted_exam):
+    df, correct, question_cols = planted_exam
+
+    sequential = analyze_similarity(df, correct, question_cols, 'Nama', block_rows=16, max_workers=1)
+    pooled = analyze_similarity(df, correct, question_cols, 'Nama', block_rows=16, max_workers=2)
+
+    pd.testing.assert_frame_equal(sequential['pairs'], pooled['pairs'])
+    assert sequential['n_flagged'] == pooled['n_flagged']
@@ -0,0 +1,54 @@
+import pandas as pd
+import pytest
+
+from analisis_ujian.store import ResultStore
+
+
+def exam_results(scores):
+    return pd.DataFrame({
+        'Nama': list(scores),
+        'total_correct': [int(score) // 10 for score in scores.values()],
+        'score': list(scores.values()),
+    })
+
+
+def difficulty(**rates):
+    return {question: {'correct_rate': rate, 'difficulty_level': 'Sedang'} for question, rate in rates.items()}
+
+
+@pytest.fixture
+def store(tmp_path):
+    with ResultStore(str(tmp_path / 'hasil.sqlite')) as store:
+        yield store
+
+
+def test_trends_follow_exam_dates(store):
+    store.save_exam('UTS', exam_results({'Siswa 1': 60.0, 'Siswa 2': 80.0}), difficulty(Q1=50.0, Q2=70.0),
+                    'Nama', exam_date='2024-03-01')
+    store.save_exam('UAS', exam_results({'Siswa 1': 90.0}), difficulty(Q1=100.0),
+                    'Nama', exam_date='2024-06-01', class_name='7A')
+
+    assert store.list_exams()['name'].tolist() == ['UAS', 'UTS']
+    assert store.list_students() == ['Siswa 1', 'Siswa 2']
+    assert store.student_trend('Siswa 1')['score'].tolist() == [60.0, 90.0]
+    assert store.question_trend('Q1')['correct_rate'].tolist() == [50.0, 100.0]
+
+    matrix = store.difficulty_matrix()
+    assert list(matrix.columns) == ['2024-03-01 UTS', '2024-06-01 UAS (7A)']
+    assert matrix.loc['Q1'].tolist() == [50.0, 100.0]
+    assert pd.isna(matrix.loc['Q2', '2024-06-01 UAS (7A)'])
+
+
+def test_saving_the_same_exam_again_replaces_it(store):
+    store.save_exam('UTS', exam_results({'Siswa 1': 60.0}), difficulty(Q1=50.0), 'Nama', exam_date='2024-03-01')
+    exam_id = store.save_exam('UTS', exam_results({'Siswa 1': 70.0}), difficulty(Q1=80.0), 'Nama',
+                              exam_date='2024-03-01')
+
+    exams = store.list_exams()
+    assert exams['exam_id'].tolist() == [exam_id]
+    assert store.student_trend('Siswa 1')['score'].tolist() == [70.0]
+
+    # Baris siswa dan soal ikut terhapus bersama ujiannya
+    store.delete_exam(exam_id)
+    assert store.list_students() == []
+    assert store.difficulty_matrix().empty
@@ -0,0 +1,52 @@
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from analisis_ujian.report import analyze_exam
+from analisis_ujian.streaming import stream_csv_analysis
+
+N_STUDENTS = 103
+N_ITEMS = 40
+
+
+# CSV dengan baris kunci di baris pertama dan jawaban acak (termasuk kosong dan huruf kecil)
+@pytest.fixture(scope='module')
+def exam_csv():
+    rng = np.random.default_rng(1)
+    question_cols = [f'Soal {i + 1}' for i in range(N_ITEMS)]
+    key = rng.choice(list('ABCD'), N_ITEMS)
+    answers = np.where(rng.random((N_STUDENTS, N_ITEMS)) < 0.6, key, rng.choice(list('ABCDabcd'), (N_STUDENTS, N_ITEMS)))
+    answers[rng.random((N_STUDENTS, N_ITEMS)) < 0.05] = ''
+
+    df = pd.DataFrame(np.vstack([key, answers]), columns=question_cols)
+    df.insert(0, 'Nama', ['KUNCI'] + [f'Siswa {i + 1}' for i in range(N_STUDENTS)])
+    return df.to_csv(index=False)
+
+
+@pytest.mark.parametrize('chunksize', [10, 1000])
+def test_streaming_matches_in_memory_difficulty_and_pass_rate(exam_csv, chunksize):
+    df = pd.read_csv(io.StringIO(exam_csv), dtype=str)
+    in_memory = analyze_exam(df, has_key_column=True)
+
+    streamed = stream_csv_analysis(io.StringIO(exam_csv), 'Nama', True, chunksize=chunksize)
+    accumulator = streamed['accumulator']
+
+    assert accumulator.n_students == N_STUDENTS
+    assert streamed['question_cols'] == in_memory['question_cols']
+    difficulty = accumulator.difficulty_data()
+    for col, expected in in_memory['difficulty_data'].items():
+        assert difficulty[col]['correct_rate'] == pytest.approx(expected['correct_rate'])
+        assert difficulty[col]['difficulty_level'] == expected['difficulty_level']
+
+    scores = in_memory['results']['score']
+    # Ambang yang tepat jatuh pada nilai siswa (kelipatan 2,5) harus dihitung lulus
+    for threshold in [50, 60, 70, float(np.median(scores))]:
+        expected = scores.ge(threshold).mean() * 100
+        assert accumulator.pass_rate(threshold) == pytest.approx(expected)
+
+    stats = accumulator.stats()
+    assert stats['avg_score'] == pytest.approx(scores.mean())
+    assert stats['min_score'] == pytest.approx(scores.min())
+    assert stats['max_score'] == pytest.approx(scores.max())
@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from analisis_ujian.core import CorrectMatrix
+from analisis_ujian.topics import read_topic_mapping, topic_mastery, topic_recommendations
+
+QUESTION_COLS = ['Soal 1', 'Soal 2', 'Soal 3', 'Soal 4']
+CORRECT = np.array([
+    [1, 1, 0, 1],
+    [1, 0, 0, 0],
+    [0, 1, 1, 1],
+], dtype=bool)
+RESULTS = pd.DataFrame({'Nama': ['Siswa 1', 'Siswa 2', 'Siswa 3'], 'Kelas': ['7A', '7A', '7B']})
+
+
+def test_read_topic_mapping_splits_cells_and_merges_rows():
+    df_mapping = pd.DataFrame({
+        'Soal': ['Soal 1', 'Soal 2', 'Soal 2', 'Soal 3', None],
+        'Topik': ['Aljabar', 'Aljabar; Geometri', 'Geometri', None, 'Statistika'],
+    })
+
+    assert read_topic_mapping(df_mapping) == {'Soal 1': ['Aljabar'], 'Soal 2': ['Aljabar', 'Geometri']}
+
+    with pytest.raises(ValueError):
+        read_topic_mapping(pd.DataFrame({'Soal': ['Soal 1']}))
+
+
+def test_topic_mastery_per_student_and_per_class():
+    topic_mapping = {'Soal 1': ['Aljabar'], 'Soal 2': ['Aljabar', 'Geometri'], 'Soal 3': ['Geometri']}
+
+    mastery = topic_mastery(RESULTS, CorrectMatrix.pack(CORRECT, QUESTION_COLS), QUESTION_COLS, topic_mapping, 'Nama')
+
+    assert mastery['topics'] == ['Aljabar', 'Geometri']
+    assert mastery['unmapped'] == ['Soal 4']
+    student = mastery['student_mastery'].set_index('Nama')
+    assert student['Aljabar'].tolist() == pytest.approx([100, 50, 50])
+    assert student['Geometri'].tolist() == pytest.approx([50, 0, 100])
+
+    by_class = mastery['class_mastery']
+    assert by_class.loc['Aljabar', '7A'] == pytest.approx(75)
+    assert by_class.loc['Geometri', '7B'] == pytest.approx(100)
+    assert by_class.loc['Aljabar', 'Semua Siswa'] == pytest.approx(200 / 3)
+    assert by_class.loc['Geometri', 'Soal'] == 'Soal 2, Soal 3'
+    assert by_class['Jumlah Soal'].to_dict() == {'Aljabar': 2, 'Geometri': 2}
+
+    recommendations = topic_recommendations(by_class, threshold=60)
+    assert [r['topic'] for r in recommendations] == ['Geometri']
+    assert recommendations[0]['question'] == 'Soal 2, Soal 3'
+
+
+def test_topic_mastery_requires_a_matching_question():
+    with pytest.raises(ValueError):
+        topic_mastery(RESULTS, CorrectMatrix.pack(CORRECT, QUESTION_COLS), QUESTION_COLS, {'Soal 9': ['Aljabar']}, 'Nama')